@@ -1,17 +1,17 @@
 # filename: 02_create_collection.py
-import json
 import chromadb
 from tqdm import tqdm
 
+from embedding_store import load_store
+
 def create_chroma_collection():
-    """Create new ChromaDB collection from JSON file"""
+    """Create new ChromaDB collection from the embedding store"""
     
-    # Load your JSON data
-    print("Loading JSON data...")
-    with open('quran_embeddings.json', 'r', encoding='utf-8') as f:
-        verses = json.load(f)
+    # Load the embedding store (converted from quran_embeddings.json on first use)
+    print("Loading embeddings...")
+    store = load_store('quran_embeddings')
     
-    print(f"Loaded {len(verses)} verses")
+    print(f"Loaded {len(store)} verses")
     
     # Initialize Chroma client
     client = chromadb.PersistentClient(path="quran_chroma")
@@ -30,19 +30,19 @@ def create_chroma_collection():
     
     # Add data in batches (for better performance)
     batch_size = 100
-    total_batches = (len(verses) + batch_size - 1) // batch_size
+    total_batches = (len(store) + batch_size - 1) // batch_size
     
-    print(f"\nAdding {len(verses)} verses in batches of {batch_size}...")
+    print(f"\nAdding {len(store)} verses in batches of {batch_size}...")
     
     for batch_num in tqdm(range(total_batches), desc="Processing batches"):
         start_idx = batch_num * batch_size
-        end_idx = min(start_idx + batch_size, len(verses))
+        end_idx = min(start_idx + batch_size, len(store))
         
-        batch_verses = verses[start_idx:end_idx]
+        batch_verses = [store.record(i) for i in range(start_idx, end_idx)]
         
         ids = [str(verse['key']) for verse in batch_verses]
         documents = [verse['arabic'] for verse in batch_verses]
-        embeddings = [verse['embedding'] for verse in batch_verses]
+        embeddings = store.vectors[start_idx:end_idx].astype('float32').tolist()
         
         # Add metadata if available
         metadatas = []
@@ -1,15 +1,15 @@
 # filename: 04_test_queries.py
-import chromadb
 from sentence_transformers import SentenceTransformer
 
+from vector_index import open_collection
+
 def test_queries():
     """Test semantic search queries on the collection"""
     
     print("Testing semantic search queries...")
     
-    # Connect to Chroma
-    client = chromadb.PersistentClient(path="quran_chroma")
-    collection = client.get_collection("quran_verses")
+    # Load the verse index (in memory, no database)
+    collection = open_collection("quran_embeddings")
     
     # Load the same model used for embeddings
     print("Loading embedding model...")
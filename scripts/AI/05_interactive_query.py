@@ -1,16 +1,16 @@
 # filename: 05_interactive_query.py
-import chromadb
 from sentence_transformers import SentenceTransformer
 
+from vector_index import open_collection
+
 def interactive_query():
     """Interactive query interface"""
     
     print("Quran Semantic Search - Interactive Mode")
     print("="*50)
     
-    # Connect to Chroma
-    client = chromadb.PersistentClient(path="quran_chroma")
-    collection = client.get_collection("quran_verses")
+    # Load the verse index (in memory, no database)
+    collection = open_collection("quran_embeddings")
     
     # Load the model
     print("Loading embedding model...")
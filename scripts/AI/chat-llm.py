@@ -1,23 +1,25 @@
 # filename: quran_chat_llm.py
-import chromadb
 from sentence_transformers import SentenceTransformer
 from openai import OpenAI
 import os
 from typing import List, Dict
 import sys
 
+from query_cache import DEFAULT_CACHE_FILE, DEFAULT_MODEL_ID, shared_cache
+from vector_index import open_collection
+
 class QuranChatWithLLM:
     def __init__(self, use_openai: bool = False):
         """Initialize Quran Chat with optional LLM enhancement"""
         print("🕋 Initializing Advanced Quran Chat...")
         
         # Load embedding model
-        self.model = SentenceTransformer('intfloat/multilingual-e5-large')
+        self.model = SentenceTransformer(DEFAULT_MODEL_ID)
+        self.query_cache = shared_cache(self.model, DEFAULT_MODEL_ID, path=DEFAULT_CACHE_FILE)
         print("✓ Embedding model loaded")
         
-        # Connect to ChromaDB
-        self.client = chromadb.PersistentClient(path="quran_chroma")
-        self.collection = self.client.get_collection("quran_verses")
+        # Load the verse index (in memory, no database)
+        self.collection = open_collection("quran_embeddings")
         print(f"✓ Connected to Quran database ({self.collection.count()} verses)")
         
         # Optional: OpenAI integration for better responses
@@ -47,7 +49,7 @@ class QuranChatWithLLM:
     
     def search_verses(self, query: str, n_results: int = 7) -> List[Dict]:
         """Search for relevant Quran verses"""
-        query_embedding = self.model.encode([query], normalize_embeddings=True)[0].tolist()
+        query_embedding = self.query_cache.encode(query).tolist()
         
         results = self.collection.query(
             query_embeddings=[query_embedding],
@@ -1,14 +1,16 @@
-import json
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import chromadb
 from tqdm import tqdm
 
-# Load your existing embeddings
-with open('quran_embeddings.json', 'r', encoding='utf-8') as f:
-    verses = json.load(f)
+from embedding_store import load_store
 
-print(f"Loaded {len(verses)} verses from JSON file")
+# Load your existing embeddings (memory-mapped; converted from
+# quran_embeddings.json on first use)
+store = load_store('quran_embeddings')
+arabic_texts = store.column('arabic')
+
+print(f"Loaded {len(store)} verses from the embedding store")
 
 # Initialize the model (same one used for embeddings)
 model = SentenceTransformer('intfloat/multilingual-e5-large')
@@ -68,10 +70,7 @@ def test_semantic_search():
     print("COMPREHENSIVE SEMANTIC SEARCH TEST")
     print("="*80)
     
-    # Convert verses to numpy arrays for efficient computation
-    print("\nPreparing embeddings...")
-    arabic_texts = [verse['arabic'] for verse in verses]
-    embeddings = np.array([verse['embedding'] for verse in verses])
+    embeddings = store.vectors
     
     print(f"Embeddings shape: {embeddings.shape}")
     print(f"Sample embedding length: {len(embeddings[0])}")
@@ -90,8 +89,8 @@ def test_semantic_search():
         # Encode query
         query_embedding = model.encode([query], normalize_embeddings=True)
         
-        # Calculate similarities
-        similarities = np.dot(embeddings, query_embedding.T).flatten()
+        # Calculate similarities (directly on the memory map)
+        similarities = store.similarities(query_embedding[0])
         
         # Get top 10 results
         top_indices = np.argsort(similarities)[::-1][:10]
@@ -226,7 +225,7 @@ def analyze_embeddings():
     print("EMBEDDING QUALITY ANALYSIS")
     print("="*80)
     
-    embeddings = np.array([verse['embedding'] for verse in verses])
+    embeddings = np.asarray(store.vectors, dtype=np.float32)
     
     # Check embedding statistics
     print(f"\nEmbedding Statistics:")
@@ -248,10 +247,10 @@ def analyze_embeddings():
     print(f"\nSimilarity Analysis (first 50 verses):")
     
     # Sample some verses to check intra-similarity
-    sample_size = min(50, len(verses))
+    sample_size = min(50, len(store))
     sample_indices = list(range(0, sample_size))
     sample_embeddings = embeddings[sample_indices]
-    sample_texts = [verses[i]['arabic'] for i in sample_indices]
+    sample_texts = [arabic_texts[i] for i in sample_indices]
     
     # Compute similarity matrix
     similarity_matrix = np.dot(sample_embeddings, sample_embeddings.T)
@@ -1,20 +1,22 @@
-import json
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
-# Load your embeddings
-with open('quran_embeddings.json', 'r', encoding='utf-8') as f:
-    verses = json.load(f)
+from embedding_store import load_store
 
-print(f"Loaded {len(verses)} verses")
+# Load your embeddings (memory-mapped; converted from quran_embeddings.json
+# on first use)
+store = load_store('quran_embeddings')
+arabic_texts = store.column('arabic')
+
+print(f"Loaded {len(store)} verses")
 
 # Get a sample verse
-sample_verse = verses[0]
-print(f"\nSample verse: {sample_verse['arabic']}")
-print(f"Embedding length: {len(sample_verse['embedding'])}")
+print(f"\nSample verse: {arabic_texts[0]}")
+print(f"Embedding length: {store.dim}")
+print(f"Stored as {store.vectors.dtype}, normalized: {store.normalized}")
 
 # Check if embeddings are normalized
-embeddings = np.array([v['embedding'] for v in verses[:100]])  # First 100
+embeddings = np.asarray(store.vectors[:100], dtype=np.float32)  # First 100
 norms = np.linalg.norm(embeddings, axis=1)
 
 print(f"\nEmbedding Norm Analysis (first 100):")
@@ -50,14 +52,14 @@ for query, target in test_cases:
     
     # 1. Find target in your embeddings
     target_idx = None
-    for i, v in enumerate(verses):
-        if target in v['arabic']:
+    for i, text in enumerate(arabic_texts):
+        if target in text:
             target_idx = i
             break
     
     if target_idx is not None:
         # Use your stored embedding
-        target_embedding_yours = np.array([verses[target_idx]['embedding']])
+        target_embedding_yours = np.asarray(store.vectors[target_idx:target_idx + 1], dtype=np.float32)
         
         # 2. Create fresh embedding of query
         query_embedding_fresh = model.encode([query], normalize_embeddings=True)
@@ -88,8 +90,7 @@ from collections import defaultdict
 
 # Group by text
 text_to_embeddings = defaultdict(list)
-for i, verse in enumerate(verses[:500]):  # Check first 500
-    text = verse['arabic']
+for i, text in enumerate(arabic_texts[:500]):  # Check first 500
     text_to_embeddings[text].append(i)
 
 # Check duplicates
@@ -100,8 +101,8 @@ for text, indices in text_to_embeddings.items():
         print(f"  Found at indices: {indices}")
         
         # Compare embeddings
-        emb1 = np.array(verses[indices[0]]['embedding'])
-        emb2 = np.array(verses[indices[1]]['embedding'])
+        emb1 = np.asarray(store.vectors[indices[0]], dtype=np.float32)
+        emb2 = np.asarray(store.vectors[indices[1]], dtype=np.float32)
         similarity = float(np.dot(emb1, emb2.T))
         
         print(f"  Embedding similarity: {similarity:.4f}")
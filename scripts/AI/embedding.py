@@ -1,34 +1,159 @@
+"""
+Verse Embedding Generation
+Encodes every verse of combined_quran.json with a sentence-transformers
+model in real batches: verses are sorted by length so each batch pads to
+similar sizes, progress is checkpointed every few batches so an
+interrupted run resumes where it stopped, and throughput is reported.
+The result is written as an embedding store (see embedding_store.py).
+
+Usage:
+    python3 embedding.py
+    python3 embedding.py --model intfloat/multilingual-e5-base --threads 8 --batch-size 128
+    python3 embedding.py --dtype float16 --json   # half-size store, plus the old JSON
+"""
+
+import argparse
+import hashlib
 import json
+import os
+import time
+
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm  # optional, for progress bar
 
-# --- Load your current combined_quran JSON ---
-with open("../src/json/combined_quran.json", "r", encoding="utf-8") as f:
-    verses = json.load(f)
+from embedding_store import DTYPES, save_store
+
+DEFAULT_MODEL = "intfloat/multilingual-e5-large"
+INPUT_FILE = "../src/json/combined_quran.json"
+OUTPUT_STORE = "../src/json/quran_verse_embeddings"
+
+
+def corpus_id(model_name: str, texts) -> str:
+    """Identifies a run: a checkpoint is only reused for the same model and texts"""
+    sha1 = hashlib.sha1(model_name.encode("utf-8"))
+    for text in texts:
+        sha1.update(b"\0" + text.encode("utf-8"))
+    return sha1.hexdigest()
+
+
+def length_buckets(texts, batch_size: int):
+    """Batches of text indices, longest first, so each batch holds similar lengths"""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+# --- Checkpoints: vectors so far plus a mask of finished verses ---
+
+def load_checkpoint(path: str, run_id: str, count: int):
+    try:
+        with np.load(path) as checkpoint:
+            if str(checkpoint["run_id"]) != run_id or len(checkpoint["done"]) != count:
+                print(f"Ignoring {path}: written for another model or corpus")
+                return None, None
+            return checkpoint["embeddings"], checkpoint["done"]
+    except (FileNotFoundError, OSError, KeyError, ValueError):
+        return None, None
+
+
+def save_checkpoint(path: str, run_id: str, embeddings, done):
+    # np.savez adds .npz to names without it, so the temp name keeps the suffix
+    tmp_path = path[:-len(".npz")] + ".tmp.npz"
+    np.savez(tmp_path, run_id=np.array(run_id), embeddings=embeddings, done=done)
+    os.replace(tmp_path, path)
+
+
+def encode_corpus(model, texts, run_id: str, batch_size: int = 64,
+                  checkpoint_path: str = None, checkpoint_every: int = 20):
+    """Encode texts in length-bucketed batches, resuming from checkpoint_path"""
+    embeddings = done = None
+    if checkpoint_path:
+        embeddings, done = load_checkpoint(checkpoint_path, run_id, len(texts))
+    if embeddings is None:
+        dim = model.get_sentence_embedding_dimension()
+        embeddings = np.zeros((len(texts), dim), dtype=np.float32)
+        done = np.zeros(len(texts), dtype=bool)
+    elif done.all():
+        print("Checkpoint already complete")
+        return embeddings
+    else:
+        print(f"Resuming: {int(done.sum())}/{len(texts)} verses already encoded")
+
+    batches = [batch for batch in length_buckets(texts, batch_size) if not done[batch].all()]
+    encoded = chars = 0
+    start = time.time()
+
+    for n, batch in enumerate(tqdm(batches, desc="Encoding batches"), 1):
+        batch_texts = [texts[i] for i in batch]
+        embeddings[batch] = model.encode(batch_texts, batch_size=len(batch),
+                                         convert_to_numpy=True, show_progress_bar=False)
+        done[batch] = True
+        encoded += len(batch)
+        chars += sum(len(text) for text in batch_texts)
+
+        if checkpoint_path and (n % checkpoint_every == 0 or n == len(batches)):
+            save_checkpoint(checkpoint_path, run_id, embeddings, done)
+
+    elapsed = time.time() - start
+    if encoded:
+        print(f"Encoded {encoded} verses in {elapsed:.1f}s: "
+              f"{encoded / elapsed:.1f} verses/s, {chars / elapsed:.0f} chars/s "
+              f"({len(batches)} batches of up to {batch_size})")
+    return embeddings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate verse embeddings")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_STORE,
+                        help="store name; writes <name>.npy and <name>.meta.json")
+    parser.add_argument("--dtype", choices=DTYPES, default="float32")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="keep the model's raw vectors instead of L2-normalizing them")
+    parser.add_argument("--json", action="store_true",
+                        help="also write the old <name>.json list of float lists")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=None,
+                        help="CPU threads for the model (default: torch's choice)")
+    parser.add_argument("--checkpoint-every", type=int, default=20,
+                        help="save progress every N batches")
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+
+    # --- Load your current combined_quran JSON ---
+    with open(args.input, "r", encoding="utf-8") as f:
+        verses = json.load(f)
+    keys = list(verses)
+    texts = [verses[key]["arabic"] for key in keys]
 
-# --- Load multilingual embedding model ---
-# E5 large model: accurate, supports multi-language queries
-model = SentenceTransformer("intfloat/multilingual-e5-large")
+    # --- Load multilingual embedding model ---
+    # E5 large model: accurate, supports multi-language queries
+    model = SentenceTransformer(args.model)
 
-# --- Prepare output list ---
-output = []
+    checkpoint_path = args.output + ".checkpoint.npz"
+    embeddings = encode_corpus(model, texts, corpus_id(args.model, texts),
+                               batch_size=args.batch_size,
+                               checkpoint_path=checkpoint_path,
+                               checkpoint_every=args.checkpoint_every)
 
-# --- Loop through each verse and generate embedding ---
-for key, value in tqdm(verses.items(), desc="Processing verses"):
-    arabic_text = value["arabic"]
+    save_store(args.output, embeddings, keys, {"arabic": texts}, dtype=args.dtype,
+               normalize=not args.no_normalize, model=args.model)
 
-    # Generate embedding (Arabic text only)
-    embedding = model.encode([arabic_text], convert_to_numpy=True,batch_size=64, show_progress_bar=True)[0].tolist()
+    if args.json:
+        # Same records as the old output, without indentation
+        output = [{"key": key, "arabic": text, "embedding": embedding}
+                  for key, text, embedding in zip(keys, texts, embeddings.tolist())]
+        with open(args.output + ".json", "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False)
 
-    # Append to output
-    output.append({
-        "key": key,
-        "arabic": arabic_text,
-        "embedding": embedding
-    })
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"Done! Output saved to {args.output}.npy")
 
-# --- Save final JSON ---
-with open("../src/json/quran_verse_embeddings.json", "w", encoding="utf-8") as f:
-    json.dump(output, f, ensure_ascii=False, indent=2)
 
-print("Done! Output saved to quran_verse_embeddings.json")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Embedding Store
+Keeps embeddings as one contiguous float32/float16 matrix in a .npy file,
+memory-mapped on load, next to a small JSON sidecar with the ids, text
+columns, dtype, model and whether rows are L2-normalized:
+
+    quran_embeddings.npy        (count x dim matrix)
+    quran_embeddings.meta.json  {"ids": [...], "columns": {"arabic": [...]}, ...}
+
+Usage (convert an old JSON list of {"key", "arabic", "embedding"}):
+    python3 embedding_store.py quran_embeddings.json --dtype float16 --normalize
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+STORE_VERSION = 1
+DTYPES = ("float32", "float16")
+SEARCH_CHUNK = 8192     # rows per matmul when vectors must be upcast
+
+
+def store_paths(path: str):
+    """(matrix, sidecar) paths for a store name, with or without extension"""
+    base = os.path.splitext(path)[0] if path.endswith((".npy", ".json")) else path
+    return base + ".npy", base + ".meta.json"
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def save_store(path: str, vectors, ids: Sequence, columns: Optional[Dict[str, List]] = None,
+               dtype: str = "float32", normalize: bool = False, model: Optional[str] = None):
+    """Write vectors (count x dim) with their ids and per-row text/metadata columns"""
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {DTYPES}")
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2 or len(vectors) != len(ids):
+        raise ValueError(f"expected {len(ids)} rows, got shape {vectors.shape}")
+    columns = columns or {}
+    for name, values in columns.items():
+        if len(values) != len(ids):
+            raise ValueError(f"column {name} has {len(values)} values for {len(ids)} ids")
+
+    if normalize:
+        vectors = normalize_rows(vectors)
+
+    matrix_path, meta_path = store_paths(path)
+    meta = {
+        "version": STORE_VERSION,
+        "dtype": dtype,
+        "count": len(ids),
+        "dim": int(vectors.shape[1]),
+        "normalized": bool(normalize),
+        "model": model,
+        "ids": [str(i) for i in ids],
+        "columns": columns,
+    }
+
+    # Temp files first so readers never see a matrix without its sidecar
+    tmp_matrix = matrix_path[:-len(".npy")] + ".tmp.npy"
+    np.save(tmp_matrix, vectors.astype(dtype))
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+class EmbeddingStore:
+    """A loaded store: vectors is a read-only memory map of the .npy matrix"""
+
+    def __init__(self, path: str):
+        matrix_path, meta_path = store_paths(path)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"{meta_path}: unsupported store version {meta.get('version')}")
+
+        self.path = matrix_path
+        self.vectors = np.load(matrix_path, mmap_mode="r")
+        self.ids: List[str] = meta["ids"]
+        self.columns: Dict[str, List] = meta.get("columns", {})
+        self.normalized: bool = meta["normalized"]
+        self.model: Optional[str] = meta.get("model")
+        self._norms = None
+        self._positions = None
+
+        if self.vectors.shape != (meta["count"], meta["dim"]):
+            raise ValueError(f"{matrix_path}: shape {self.vectors.shape} does not match {meta_path}")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1]
+
+    def column(self, name: str) -> List:
+        return self.columns[name]
+
+    def position(self, id_) -> int:
+        """Row of an id"""
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(self.ids)}
+        return self._positions[str(id_)]
+
+    def record(self, i: int) -> Dict:
+        """Row i as a dict like the old JSON entries (without the embedding)"""
+        record = {"key": self.ids[i]}
+        for name, values in self.columns.items():
+            record[name] = values[i]
+        return record
+
+    def norms(self) -> np.ndarray:
+        if self._norms is None:
+            if self.normalized:
+                self._norms = np.ones(len(self), dtype=np.float32)
+            else:
+                self._norms = np.concatenate([
+                    np.linalg.norm(np.asarray(self.vectors[start:start + SEARCH_CHUNK], dtype=np.float32), axis=1)
+                    for start in range(0, len(self), SEARCH_CHUNK)
+                ]) if len(self) else np.zeros(0, dtype=np.float32)
+                self._norms[self._norms == 0] = 1.0
+        return self._norms
+
+    def dot(self, queries) -> np.ndarray:
+        """Raw dot products, (count,) for one query or (count, n) for a batch"""
+        queries = np.asarray(queries, dtype=np.float32)
+        if self.vectors.dtype == np.float32:
+            return self.vectors @ queries.T
+        # float16 matmul is slow in numpy; upcast a chunk at a time
+        return np.concatenate([
+            np.asarray(self.vectors[start:start + SEARCH_CHUNK], dtype=np.float32) @ queries.T
+            for start in range(0, len(self), SEARCH_CHUNK)
+        ])
+
+    def similarities(self, queries) -> np.ndarray:
+        """Cosine similarity of every row to each query, same shape as dot()"""
+        queries = np.asarray(queries, dtype=np.float32)
+        scores = self.dot(queries / np.linalg.norm(queries, axis=-1, keepdims=True))
+        if not self.normalized:
+            scores = scores / (self.norms()[:, None] if scores.ndim == 2 else self.norms())
+        return scores
+
+
+def convert_json(json_path: str, path: Optional[str] = None, dtype: str = "float32",
+                 normalize: bool = False, model: Optional[str] = None) -> str:
+    """Write a store from a JSON list of {"key", "embedding", ...} records"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        records = json.load(f)
+    if isinstance(records, dict):   # {key: {...}} layout
+        records = [dict(value, key=key) for key, value in records.items()]
+
+    path = path or os.path.splitext(json_path)[0]
+    names = [name for name in records[0] if name not in ("key", "embedding")] if records else []
+    save_store(
+        path,
+        np.array([record["embedding"] for record in records], dtype=np.float32),
+        [record["key"] for record in records],
+        {name: [record.get(name) for record in records] for name in names},
+        dtype=dtype, normalize=normalize, model=model,
+    )
+    return path
+
+
+def load_store(path: str) -> EmbeddingStore:
+    """Open a store, converting <name>.json into it the first time"""
+    matrix_path, meta_path = store_paths(path)
+    json_path = matrix_path[:-len(".npy")] + ".json"
+    if not (os.path.exists(matrix_path) and os.path.exists(meta_path)) and os.path.exists(json_path):
+        print(f"Converting {json_path} to {matrix_path} (one time)...")
+        convert_json(json_path)
+    return EmbeddingStore(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JSON embeddings to an embedding store")
+    parser.add_argument("json_file")
+    parser.add_argument("--output", help="store name (default: JSON file name without .json)")
+    parser.add_argument("--dtype", choices=DTYPES, default="float32")
+    parser.add_argument("--normalize", action="store_true", help="L2-normalize every row")
+    parser.add_argument("--model", help="model the embeddings came from")
+    args = parser.parse_args()
+
+    path = convert_json(args.json_file, args.output, args.dtype, args.normalize, args.model)
+    store = EmbeddingStore(path)
+    json_size = os.path.getsize(args.json_file)
+    store_size = os.path.getsize(store.path) + os.path.getsize(store_paths(path)[1])
+    print(f"{len(store)} x {store.dim} {store.vectors.dtype} vectors: "
+          f"{json_size / 1e6:.1f}MB JSON -> {store_size / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Query Embedding Cache
+Remembers query embeddings so repeated searches skip the transformer.
+Entries are keyed by model id and normalized query text (NFC, collapsed
+whitespace), so spellings that differ only in those share one embedding:
+the first one seen is encoded, as typed. Entries are evicted least
+recently used past max_entries, and optionally saved to an .npz file so
+the cache survives restarts. One cache per model and file is shared by
+everything in the process (see shared_cache).
+"""
+
+import atexit
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_MODEL_ID = "intfloat/multilingual-e5-large"   # the model the chat scripts search with
+DEFAULT_CACHE_FILE = "quran_query_cache.npz"
+
+
+def normalize_query(text: str) -> str:
+    """Cache key text: NFC with whitespace collapsed (case is kept; the model is cased)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class QueryEmbeddingCache:
+    """LRU cache of normalized query embeddings for one model"""
+
+    def __init__(self, model, model_id: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 path: Optional[str] = None, save_every: int = 50):
+        self.model = model
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.path = path
+        self.save_every = save_every
+
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def encode(self, query: str) -> np.ndarray:
+        """Normalized embedding of a query (read-only; copy before changing it)"""
+        key = normalize_query(query)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        # Encode outside the lock so other queries aren't held up
+        vector = np.asarray(self.model.encode([query], normalize_embeddings=True)[0], dtype=np.float32)
+        vector.setflags(write=False)
+
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._unsaved += 1
+            save = self.path and self._unsaved >= self.save_every
+        if save:
+            self.save()
+        return vector
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_id,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # ----- persistence -----
+
+    def save(self):
+        """Write the entries (oldest first) to path, replacing it atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            keys = list(self._entries)
+            vectors = np.stack(list(self._entries.values())) if keys else np.zeros((0, 0), dtype=np.float32)
+            self._unsaved = 0
+
+        tmp_path = self.path[:-len(".npz")] + ".tmp.npz" if self.path.endswith(".npz") else self.path + ".tmp.npz"
+        np.savez(tmp_path, model=np.array(self.model_id), keys=np.array(json.dumps(keys, ensure_ascii=False)),
+                 vectors=vectors)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> int:
+        """Restore saved entries for this model; returns how many were loaded"""
+        try:
+            with np.load(self.path) as saved:
+                if str(saved["model"]) != self.model_id:
+                    return 0
+                keys = json.loads(str(saved["keys"]))
+                vectors = saved["vectors"]
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return 0
+
+        with self._lock:
+            for key, vector in zip(keys[-self.max_entries:], vectors[-self.max_entries:]):
+                vector = np.array(vector, dtype=np.float32)
+                vector.setflags(write=False)
+                self._entries[key] = vector
+        return len(self._entries)
+
+
+_shared: Dict[Tuple[str, Optional[str]], QueryEmbeddingCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(model, model_id: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 path: Optional[str] = None) -> QueryEmbeddingCache:
+    """The process-wide cache for a model id and file, created on first use"""
+    with _shared_lock:
+        cache = _shared.get((model_id, path))
+        if cache is None:
+            cache = _shared[(model_id, path)] = QueryEmbeddingCache(model, model_id, max_entries, path)
+        return cache
@@ -1,23 +1,25 @@
 # filename: quran_chat.py
-import chromadb
 from sentence_transformers import SentenceTransformer
 import json
 from typing import List, Dict, Tuple
 import textwrap
 import sys
 
+from query_cache import DEFAULT_CACHE_FILE, DEFAULT_MODEL_ID, shared_cache
+from vector_index import open_collection
+
 class QuranChatAssistant:
-    def __init__(self, chroma_path: str = "quran_chroma"):
+    def __init__(self, store_path: str = "quran_embeddings"):
         """Initialize the Quran Chat Assistant"""
         print("🕋 Initializing Quran Chat Assistant...")
         
         # Load embedding model
-        self.model = SentenceTransformer('intfloat/multilingual-e5-large')
+        self.model = SentenceTransformer(DEFAULT_MODEL_ID)
+        self.query_cache = shared_cache(self.model, DEFAULT_MODEL_ID, path=DEFAULT_CACHE_FILE)
         print("✓ Embedding model loaded")
         
-        # Connect to ChromaDB
-        self.client = chromadb.PersistentClient(path=chroma_path)
-        self.collection = self.client.get_collection("quran_verses")
+        # Load the verse index (in memory, no database)
+        self.collection = open_collection(store_path)
         print(f"✓ Connected to Quran database ({self.collection.count()} verses)")
         
         # System prompt
@@ -46,12 +48,9 @@ class QuranChatAssistant:
     def search_verses(self, query: str, n_results: int = 5) -> List[Dict]:
         """Search for relevant Quran verses"""
         # Generate embedding for query
-        query_embedding = self.model.encode(
-            [query], 
-            normalize_embeddings=True
-        )[0].tolist()
+        query_embedding = self.query_cache.encode(query).tolist()
         
-        # Search in ChromaDB
+        # Search the verse index
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=n_results,
@@ -192,8 +191,8 @@ def main():
     except Exception as e:
         print(f"فشل التهيئة: {e}")
         print("تأكد من:")
-        print("1. تشغيل 02_create_collection.py أولاً")
-        print("2. وجود مجلد quran_chroma في نفس الدليل")
+        print("1. تشغيل embedding.py أو embedding_store.py أولاً")
+        print("2. وجود ملف quran_embeddings.npy في نفس الدليل")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,21 +1,23 @@
 # filename: quran_chat_auto_translate.py
-import chromadb
 from sentence_transformers import SentenceTransformer
 from deep_translator import GoogleTranslator
 import sys
 
+from query_cache import DEFAULT_CACHE_FILE, DEFAULT_MODEL_ID, shared_cache
+from vector_index import open_collection
+
 class QuranChatAutoTranslate:
-    def __init__(self, chroma_path: str = "quran_chroma"):
+    def __init__(self, store_path: str = "quran_embeddings"):
         """Initialize Quran Chat with auto-translation"""
         print("🕋 Initializing Quran Chat with Auto-Translation...")
         
         # Load embedding model
-        self.model = SentenceTransformer('intfloat/multilingual-e5-large')
+        self.model = SentenceTransformer(DEFAULT_MODEL_ID)
+        self.query_cache = shared_cache(self.model, DEFAULT_MODEL_ID, path=DEFAULT_CACHE_FILE)
         print("✓ Embedding model loaded")
         
-        # Connect to ChromaDB
-        self.client = chromadb.PersistentClient(path=chroma_path)
-        self.collection = self.client.get_collection("quran_verses")
+        # Load the verse index (in memory, no database)
+        self.collection = open_collection(store_path)
         print(f"✓ Connected to Quran database ({self.collection.count()} verses)")
         
         # Initialize translator
@@ -88,12 +90,9 @@ class QuranChatAutoTranslate:
         print(f"   Searching with: '{search_query}'")
         
         # Generate embedding
-        query_embedding = self.model.encode(
-            [search_query], 
-            normalize_embeddings=True
-        )[0].tolist()
+        query_embedding = self.query_cache.encode(search_query).tolist()
         
-        # Search in ChromaDB
+        # Search the verse index
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=n_results,
@@ -1,17 +1,34 @@
 # filename: quran_chat_web.py
 from flask import Flask, render_template, request, jsonify
-import chromadb
 from sentence_transformers import SentenceTransformer
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src', 'analysis'))
+from hot_reload import HotReloader
+from query_cache import DEFAULT_CACHE_FILE, DEFAULT_MODEL_ID, shared_cache
+from vector_index import collection_files, open_collection
 
 app = Flask(__name__)
 
+STORE_PATH = "quran_embeddings"
+
+def load_collection():
+    return open_collection(STORE_PATH)
+
 # Initialize components
 print("Loading Quran Chat Web App...")
-model = SentenceTransformer('intfloat/multilingual-e5-large')
-client = chromadb.PersistentClient(path="quran_chroma")
-collection = client.get_collection("quran_verses")
-print(f"Ready! {collection.count()} verses loaded")
+model = SentenceTransformer(DEFAULT_MODEL_ID)
+# Shared by /chat and /api/search; repeated queries skip the model
+query_cache = shared_cache(model, DEFAULT_MODEL_ID, path=DEFAULT_CACHE_FILE)
+# Re-indexed in the background when the embedding store changes or on
+# SIGHUP; requests in flight keep the collection they started with
+collection_data = HotReloader(load_collection,
+                              watch_files=collection_files(STORE_PATH),
+                              name="quran_verses")
+collection_data.watch()
+print(f"Ready! {collection_data.current.count()} verses loaded")
 
 @app.route('/')
 def home():
@@ -27,13 +44,14 @@ def chat():
     
     try:
         # Search for verses
-        query_embedding = model.encode([query], normalize_embeddings=True)[0].tolist()
+        query_embedding = query_cache.encode(query).tolist()
         
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=5,
-            include=["documents", "metadatas", "distances"]
-        )
+        with collection_data.acquire() as collection:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=5,
+                include=["documents", "metadatas", "distances"]
+            )
         
         verses = []
         if results['documents']:
@@ -60,7 +78,7 @@ def chat():
                 if meta.get('surah_name'):
                     response += f"   (سورة {meta['surah_name']}"
                     if meta.get('ayah'):
-                        response += f، الآية {meta['ayah']}"
+                        response += f"، الآية {meta['ayah']}"
                     response += ")\n"
             
             response += f"   Similarity: {verse['similarity']:.1%}\n"
@@ -85,13 +103,14 @@ def api_search():
         return jsonify({'error': 'No query parameter'})
     
     try:
-        query_embedding = model.encode([query], normalize_embeddings=True)[0].tolist()
+        query_embedding = query_cache.encode(query).tolist()
         
-        results = collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            include=["documents", "metadatas", "distances"]
-        )
+        with collection_data.acquire() as collection:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
+            )
         
         verses = []
         if results['documents']:
@@ -111,5 +130,11 @@ def api_search():
     except Exception as e:
         return jsonify({'error': str(e)})
 
+@app.route('/api/cache', methods=['GET'])
+def api_cache():
+    """Query embedding cache counters"""
+    return jsonify(query_cache.stats())
+
 if __name__ == '__main__':
+    collection_data.reload_on_signal()
     app.run(debug=True, port=5000)
\ No newline at end of file
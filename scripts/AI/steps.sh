@@ -1,14 +1,15 @@
-# 1. First, reset/clear any existing ChromaDB
-python3 01_reset_chroma.py
+# 1. Build the embedding store the search scripts load (quran_embeddings.npy);
+#    04/05 and the chat scripts also convert quran_embeddings.json on first use
+python3 embedding_store.py quran_embeddings.json --normalize
 
-# 2. Create new collection from your JSON file
-python3 02_create_collection.py
+# 2. Test with predefined queries
+python3 04_test_queries.py
 
-# 3. Verify the collection was created correctly
-python3 03_verify_collection.py
+# 3. (Optional) Use interactive mode for custom queries
+python3 05_interactive_query.py
 
-# 4. Test with predefined queries
-python3 04_test_queries.py
+# 4. (Optional) Check search latency
+python3 vector_index.py quran_embeddings
 
-# 5. (Optional) Use interactive mode for custom queries
-python3 05_interactive_query.py
\ No newline at end of file
+# ChromaDB is no longer needed for search; 01-03 still (re)build a
+# quran_chroma collection from the same store if you want one
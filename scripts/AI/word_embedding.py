@@ -0,0 +1,191 @@
+"""
+Word and Phrase Embedding Index
+Embeds every unique word form (quran_words_unique.json) and every sliding
+n-gram window inside a verse, so short concept queries match the words
+and phrases that carry them instead of whole verses. Each unique text is
+encoded once; where it occurs is kept in a compact occurrence table:
+
+    quran_phrase_embeddings.npy / .meta.json   embedding store, one row per text
+    quran_phrase_embeddings.occurrences.npz    offsets, first word ids per row
+
+Results map back to word ids and, through verse_to_words, to verse ids.
+
+Usage:
+    python3 word_embedding.py --ngrams 2 3 --dtype float16
+    python3 word_embedding.py --query "الصبر"          # search an existing index
+"""
+
+import argparse
+import json
+import os
+from bisect import bisect_right
+from typing import Dict, List, Sequence
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from embedding import DEFAULT_MODEL, corpus_id, encode_corpus
+from embedding_store import DTYPES, load_store, save_store
+from vector_index import VectorIndex
+
+JSON_DIR = "../src/json"
+OUTPUT_STORE = "../src/json/quran_phrase_embeddings"
+
+
+def load_json(name: str):
+    with open(os.path.join(JSON_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verse_to_words(verses: Dict) -> Dict[int, List[int]]:
+    """verse_id → word ids, as in the unified index"""
+    return {int(verse_id): list(range(int(verse["start_word"]), int(verse["end_word"]) + 1))
+            for verse_id, verse in verses.items()}
+
+
+def collect_texts(words: Dict[str, str], unique_words: Dict, verse_words: Dict[int, List[int]],
+                  ngrams: Sequence[int]):
+    """
+    Unique texts to embed with their n-gram length and occurrences (first
+    word id of each place the text appears). Words come first, in the
+    order of quran_words_unique.json.
+    """
+    rows: Dict[str, int] = {}
+    lengths: List[int] = []
+    occurrences: List[List[int]] = []
+
+    def add(text: str, n: int, word_id: int = None):
+        row = rows.get(text)
+        if row is None:
+            row = rows[text] = len(lengths)
+            lengths.append(n)
+            occurrences.append([])
+        if word_id is not None:
+            occurrences[row].append(word_id)
+
+    for form in unique_words:
+        add(form, 1)
+    for verse_id in sorted(verse_words):
+        ids = verse_words[verse_id]
+        forms = [words[str(word_id)] for word_id in ids]
+        for i, word_id in enumerate(ids):
+            add(forms[i], 1, word_id)
+            for n in ngrams:
+                if i + n <= len(ids):
+                    add(" ".join(forms[i:i + n]), n, word_id)
+
+    return list(rows), lengths, occurrences
+
+
+# --- Occurrence table: CSR arrays, row r occurs at word_ids[offsets[r]:offsets[r + 1]] ---
+
+def occurrences_path(store_path: str) -> str:
+    return store_path + ".occurrences.npz"
+
+
+def save_occurrences(store_path: str, occurrences: List[List[int]]):
+    offsets = np.zeros(len(occurrences) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(row) for row in occurrences])
+    word_ids = np.fromiter((w for row in occurrences for w in row), dtype=np.int32, count=int(offsets[-1]))
+    np.savez(occurrences_path(store_path), offsets=offsets, word_ids=word_ids)
+
+
+class PhraseIndex:
+    """Search over the word/phrase store, with results mapped to words and verses"""
+
+    def __init__(self, store_path: str = OUTPUT_STORE, verses: Dict = None, mode: str = "auto"):
+        self.store = load_store(store_path)
+        self.index = VectorIndex(self.store.vectors, self.store.normalized, mode)
+        with np.load(occurrences_path(store_path)) as table:
+            self.offsets = table["offsets"]
+            self.word_ids = table["word_ids"]
+
+        self.verse_to_words = verse_to_words(verses if verses is not None else load_json("combined_quran.json"))
+        self._verse_ids = sorted(self.verse_to_words)
+        self._verse_starts = [self.verse_to_words[v][0] for v in self._verse_ids]
+
+    def verse_of(self, word_id: int) -> int:
+        return self._verse_ids[bisect_right(self._verse_starts, word_id) - 1]
+
+    def occurrences(self, row: int) -> List[Dict]:
+        n = self.store.column("n")[row]
+        return [{"word_ids": list(range(int(w), int(w) + n)), "verse_id": self.verse_of(int(w))}
+                for w in self.word_ids[self.offsets[row]:self.offsets[row + 1]]]
+
+    def search(self, query_embedding, k: int = 10, n: int = None) -> List[Dict]:
+        """
+        Top-k words/phrases for a query vector; n limits results to one
+        n-gram length (1 = single words)
+        """
+        lengths = self.store.column("n")
+        # Over-fetch when filtering by length, then trim
+        fetch = k if n is None else min(len(self.store), k * 8)
+        indices, scores = self.index.search(query_embedding, fetch)
+        results = []
+        for row, score in zip(indices[0], scores[0]):
+            if n is not None and lengths[row] != n:
+                continue
+            results.append({
+                "text": self.store.column("text")[row],
+                "n": lengths[row],
+                "similarity": float(score),
+                "occurrences": self.occurrences(int(row)),
+            })
+            if len(results) == k:
+                break
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the word/phrase embedding index")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--output", default=OUTPUT_STORE)
+    parser.add_argument("--ngrams", type=int, nargs="*", default=[2, 3],
+                        help="n-gram window lengths besides single words")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--dtype", choices=DTYPES, default="float16")
+    parser.add_argument("--query", help="search the existing index instead of building it")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.threads:
+        import torch
+        torch.set_num_threads(args.threads)
+    model = SentenceTransformer(args.model)
+
+    verses = load_json("combined_quran.json")
+
+    if args.query:
+        index = PhraseIndex(args.output, verses)
+        query_embedding = model.encode([args.query], normalize_embeddings=True)
+        for result in index.search(query_embedding, args.k):
+            places = ", ".join(str(o["verse_id"]) for o in result["occurrences"][:5])
+            print(f"{result['similarity']:.3f}  {result['text']}  "
+                  f"({len(result['occurrences'])} occurrences; verses {places})")
+        return
+
+    texts, lengths, occurrences = collect_texts(
+        load_json("quran_words.json"), load_json("quran_words_unique.json"),
+        verse_to_words(verses), sorted(set(args.ngrams) - {1}))
+    total = sum(len(row) for row in occurrences)
+    print(f"{len(texts):,} unique texts for {total:,} occurrences "
+          f"({lengths.count(1):,} word forms)")
+
+    embeddings = encode_corpus(model, texts, corpus_id(args.model, texts),
+                               batch_size=args.batch_size,
+                               checkpoint_path=args.output + ".checkpoint.npz")
+
+    save_store(args.output, embeddings, [str(i) for i in range(len(texts))],
+               {"text": texts, "n": lengths, "count": [len(row) for row in occurrences]},
+               dtype=args.dtype, normalize=True, model=args.model)
+    save_occurrences(args.output, occurrences)
+
+    checkpoint = args.output + ".checkpoint.npz"
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    print(f"Done! Output saved to {args.output}.npy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Quran Data Build
+Runs the data build scripts as one dependency graph: each step declares the
+files it reads and writes, steps whose script and inputs are unchanged
+(by content hash) since their last run are skipped, and independent steps
+run in parallel processes. The cache (.build-cache.json) only records the
+state each step was built from, so outputs are never compared against it
+
+The build rewrites committed data; review the diff before committing it
+
+Usage:
+    python scripts/build.py                 # build everything that changed
+    python scripts/build.py morphology      # one step (and what it needs)
+    python scripts/build.py --dry-run       # show what would run
+    python scripts/build.py --force --jobs 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_FILE = os.path.join(ROOT, '.build-cache.json')
+
+
+class Step(NamedTuple):
+    name: str
+    script: str             # relative to ROOT
+    inputs: List[str]       # relative to ROOT
+    outputs: List[str]      # relative to ROOT
+    cwd: str = 'scripts'    # the scripts use paths relative to their folder
+    args: List[str] = []
+    optional: List[str] = []  # used when present, hashed like inputs
+
+
+def build_steps(json_dir: str) -> List[Step]:
+    """
+    Every build step. json_dir is where MODE-aware scripts write
+    (src/json in development, build/json in deployment).
+    """
+    return [
+        Step('words', 'scripts/ayahandword_parser.py',
+             ['data/arabic.md', 'data/en.md'],
+             [f'{json_dir}/combined_quran.json', f'{json_dir}/quran_words.json']),
+        Step('harakat_words', 'scripts/ayahandword.py',
+             ['data/uthmani.md', 'data/en.md'],
+             [f'{json_dir}/combined_harakat_quran.json', f'{json_dir}/quran_harakat_words.json']),
+        Step('warsh_text', 'scripts/warsh-raw-cleaner.py',
+             ['data/raw/UthmanicWarsh.txt'],
+             ['data/uthmani-warsh.txt'],
+             args=['../data/raw/UthmanicWarsh.txt', '../data/uthmani-warsh.txt']),
+        Step('warsh_words', 'scripts/quran_text_parser.py',
+             ['data/uthmani-warsh.txt'],
+             ['src/json/quranic_warsh_words.json']),
+        # One pass over the corpus writes every morphology/root output
+        Step('morphology', 'scripts/morphology_reader.py',
+             ['data/quran-morphology.txt', 'src/json/quran_words.json'],
+             [f'{json_dir}/quran_morphology.json', 'data/root.json', 'data/root.csv',
+              'data/categorized_by_root.json', 'src/json/root_words.json',
+              'data/reports/root_word_report.txt']),
+        Step('unique_words', 'scripts/uniquewords.py',
+             ['src/json/quran_words.json'],
+             ['src/json/quran_words_unique.json', 'src/json/quran_words_report.txt']),
+        Step('word_translations', 'scripts/translation/wordtanslation.py',
+             ['src/json/quran_words.json', 'src/json/en-word.json'],
+             ['scripts/translation/unique_word_translations.json'],
+             cwd='scripts/translation'),
+        # Shard files are tracked through the manifest, which holds their hashes
+        Step('shards', 'scripts/shard_bundles.py',
+             [f'{json_dir}/combined_quran.json', f'{json_dir}/combined_harakat_quran.json',
+              f'{json_dir}/quran_words.json', f'{json_dir}/quran_harakat_words.json',
+              'src/json/quranic_words.json', 'src/json/quranic_warsh_words.json',
+              'src/json/en-word.json', 'src/json/sura.json', 'src/json/pagination_map.json'],
+             [f'{json_dir}/shards/manifest.json'],
+             optional=[f'{json_dir}/quran_morphology.json']),
+        Step('pagination', 'src/analysis/pagination_map.py',
+             ['src/analysis/sura.json', 'src/analysis/verses.json'],
+             ['src/analysis/pagination_map.json', 'src/analysis/pagination_map_balanced.json',
+              'src/analysis/pagination_map_whole_surahs.json', 'src/json/pagination_map.json'],
+             cwd='src/analysis'),
+    ]
+
+
+# ----------------------
+# Content hashes and the build cache
+# ----------------------
+
+class Hasher:
+    """sha1 of file contents, computed at most once per file per run"""
+
+    def __init__(self):
+        self.hashes: Dict[str, Optional[str]] = {}
+
+    def __call__(self, path: str) -> Optional[str]:
+        if path not in self.hashes:
+            full_path = os.path.join(ROOT, path)
+            if not os.path.exists(full_path):
+                self.hashes[path] = None
+            else:
+                sha1 = hashlib.sha1()
+                with open(full_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b''):
+                        sha1.update(chunk)
+                self.hashes[path] = sha1.hexdigest()
+        return self.hashes[path]
+
+    def forget(self, paths: List[str]):
+        for path in paths:
+            self.hashes.pop(path, None)
+
+
+def load_cache() -> Dict:
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_cache(cache: Dict):
+    tmp_path = CACHE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, CACHE_FILE)
+
+
+def step_state(step: Step, mode: str, hasher: Hasher) -> Dict:
+    """What a step's result depends on: script, inputs and MODE"""
+    return {
+        'mode': mode,
+        'script': hasher(step.script),
+        'inputs': {path: hasher(path) for path in step.inputs + step.optional},
+    }
+
+
+def is_up_to_date(step: Step, state: Dict, cache: Dict) -> bool:
+    entry = cache.get(step.name)
+    if not entry or entry.get('state') != state:
+        return False
+    # Deleted outputs force a rebuild; edited ones are left for review
+    return all(os.path.exists(os.path.join(ROOT, path)) for path in step.outputs)
+
+
+# ----------------------
+# Running
+# ----------------------
+
+def run_step(step: Step, mode: str) -> Tuple[int, str, float]:
+    start = time.time()
+    env = dict(os.environ, MODE=mode)
+    result = subprocess.run(
+        [sys.executable, os.path.join(ROOT, step.script), *step.args],
+        cwd=os.path.join(ROOT, step.cwd), env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    return result.returncode, result.stdout, time.time() - start
+
+
+def select_steps(steps: List[Step], names: List[str]) -> List[Step]:
+    """The named steps plus every step producing one of their inputs"""
+    if not names:
+        return steps
+    by_name = {step.name: step for step in steps}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown step(s): {', '.join(unknown)}. Steps: {', '.join(by_name)}")
+
+    producers = {path: step.name for step in steps for path in step.outputs}
+    wanted: Set[str] = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in wanted:
+            continue
+        wanted.add(name)
+        stack.extend(producers[path] for path in by_name[name].inputs + by_name[name].optional
+                     if path in producers and producers[path] != name)
+    return [step for step in steps if step.name in wanted]
+
+
+def build(steps: List[Step], mode: str, jobs: int, force: bool = False,
+          dry_run: bool = False) -> bool:
+    """Run the out-of-date steps in dependency order; returns True on success"""
+    cache = load_cache()
+    hasher = Hasher()
+    producers = {path: step.name for step in steps for path in step.outputs}
+    deps = {
+        step.name: {producers[path] for path in step.inputs + step.optional
+                    if path in producers and producers[path] != step.name}
+        for step in steps
+    }
+
+    pending = {step.name: step for step in steps}
+    finished: Set[str] = set()
+    failed: Set[str] = set()
+    ran = skipped = 0
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while pending or running:
+            for name, step in list(pending.items()):
+                if not deps[name] <= finished | failed:
+                    continue
+                del pending[name]
+
+                if deps[name] & failed:
+                    print(f"✗ {name}: not run, {', '.join(sorted(deps[name] & failed))} failed")
+                    failed.add(name)
+                    continue
+
+                missing = [path for path in step.inputs if hasher(path) is None]
+                if missing:
+                    # Source data not checked in here; keep existing outputs
+                    print(f"- {name}: skipped, missing {', '.join(missing)}")
+                    finished.add(name)
+                    continue
+
+                state = step_state(step, mode, hasher)
+                if not force and is_up_to_date(step, state, cache):
+                    print(f"✓ {name}: up to date")
+                    skipped += 1
+                    finished.add(name)
+                    continue
+
+                if dry_run:
+                    print(f"→ {name}: would run {step.script}")
+                    finished.add(name)
+                    continue
+
+                print(f"→ {name}: running {step.script}")
+                running[pool.submit(run_step, step, mode)] = (step, state)
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step, state = running.pop(future)
+                returncode, output, seconds = future.result()
+                hasher.forget(step.outputs)
+                if returncode != 0:
+                    print(f"✗ {step.name}: failed after {seconds:.1f}s\n{output}")
+                    failed.add(step.name)
+                    cache.pop(step.name, None)
+                    continue
+
+                ran += 1
+                finished.add(step.name)
+                cache[step.name] = {'state': state}
+                print(f"✓ {step.name}: built in {seconds:.1f}s")
+
+    if not dry_run:
+        save_cache(cache)
+    print(f"\n{ran} built, {skipped} up to date, {len(failed)} failed")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Quran data files")
+    parser.add_argument('steps', nargs='*', help="steps to build (default: all)")
+    parser.add_argument('--mode', default=os.getenv('MODE', 'development'),
+                        choices=['development', 'deployment'])
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--force', action='store_true', help="ignore the build cache")
+    parser.add_argument('--dry-run', action='store_true', help="only show what would run")
+    args = parser.parse_args()
+
+    json_dir = 'src/json' if args.mode == 'development' else 'build/json'
+    steps = select_steps(build_steps(json_dir), args.steps)
+    ok = build(steps, args.mode, max(1, args.jobs), args.force, args.dry_run)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Streaming Quran Morphology Reader
+Reads quran-morphology.txt once as compact records and feeds every output
+derived from it (morphology JSON, root JSON, root CSV, root reports) in a
+single pass
+"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class MorphRecord(NamedTuple):
+    """One segment line of quran-morphology.txt"""
+    location: str             # sura:ayah:word:segment
+    word_key: str             # sura:ayah:word
+    word: str
+    pos: str
+    root: Optional[str]
+    lemma: Optional[str]
+    morphology: str           # features without ROOT: and LEM:
+
+
+def split_features(features: str) -> Tuple[Optional[str], Optional[str], str]:
+    """Split a feature string into (root, lemma, remaining features) in one pass"""
+    root = lemma = None
+    kept = []
+    for field in features.split('|'):
+        if field.startswith('ROOT:') and len(field) > 5:
+            if root is None:
+                root = field[5:]
+        elif field.startswith('LEM:') and len(field) > 4:
+            if lemma is None:
+                lemma = field[4:]
+        else:
+            kept.append(field)
+    return root, lemma, '|'.join(kept).strip('|')
+
+
+def read_morphology(file_path: str) -> Iterator[MorphRecord]:
+    """Yield one record per segment line, reading the file lazily"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            parts = line.split('\t')
+            if len(parts) < 4:
+                continue
+            location = parts[0].strip()
+            root, lemma, morphology = split_features(parts[3].strip())
+            yield MorphRecord(
+                location,
+                ':'.join(location.split(':')[:3]),
+                parts[1].strip(),
+                parts[2].strip(),
+                root,
+                lemma,
+                morphology,
+            )
+
+
+# ----------------------
+# Output sinks: add(seq_id, record) per segment, close() at the end.
+# seq_id numbers words (sura:ayah:word) from 1 in file order.
+# ----------------------
+
+class MorphologyJsonSink:
+    """quran_morphology.json, streamed one word at a time"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.seq_id = None
+        self.entry = None
+        self.count = 0
+
+    def add(self, seq_id: int, record: MorphRecord):
+        if seq_id != self.seq_id:
+            self._flush()
+            self.seq_id = seq_id
+            self.entry = {"id": record.word_key, "words": {}}
+        self.entry["words"][record.location] = {
+            "word": record.word,
+            "pos": record.pos,
+            "root": record.root,
+            "lemma": record.lemma,
+            "morphology": record.morphology
+        }
+
+    def _flush(self):
+        if self.entry is None:
+            return
+        # Same layout as json.dump(..., indent=2) of the whole mapping
+        body = json.dumps(self.entry, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        self.file.write(('{\n' if self.count == 0 else ',\n') + f'  "{self.seq_id}": {body}')
+        self.count += 1
+
+    def close(self):
+        self._flush()
+        self.file.write('\n}' if self.count else '{}')
+        self.file.close()
+
+
+class RootCsvSink:
+    """root.csv: Key, ID, Root for every segment with a root"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(['Key', 'ID', 'Root'])
+
+    def add(self, seq_id: int, record: MorphRecord):
+        if record.root:
+            self.writer.writerow([seq_id, record.word_key, record.root])
+
+    def close(self):
+        self.file.close()
+
+
+class RootJsonSink:
+    """root.json: root → total count and per-word counts and locations"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.roots = {}
+
+    def add(self, seq_id: int, record: MorphRecord):
+        if not record.root:
+            return
+        root_entry = self.roots.get(record.root)
+        if root_entry is None:
+            root_entry = self.roots[record.root] = {"total_count": 0, "words": {}}
+        root_entry["total_count"] += 1
+        word_entry = root_entry["words"].get(record.word)
+        if word_entry is None:
+            word_entry = root_entry["words"][record.word] = {"count": 0, "wordkeys": []}
+        word_entry["count"] += 1
+        word_entry["wordkeys"].append(record.location)
+
+    def close(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.roots, f, ensure_ascii=False, indent=2)
+
+
+class RootVariationsSink:
+    """categorized_by_root.json: root → count and distinct word forms"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.roots = {}
+
+    def add(self, seq_id: int, record: MorphRecord):
+        if not record.root:
+            return
+        for root in record.root.split("،"):  # Split multiple roots if they exist
+            root = root.strip()
+            root_entry = self.roots.get(root)
+            if root_entry is None:
+                root_entry = self.roots[root] = {'count': 0, 'variations': {}}
+            root_entry['count'] += 1
+            root_entry['variations'][record.word] = None
+
+    def close(self):
+        for root_entry in self.roots.values():
+            root_entry['variations'] = list(root_entry['variations'])
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.roots, f, ensure_ascii=False, indent=2)
+
+
+class RootWordsSink:
+    """root_words.json and the Root, Word, Count report, keyed by whole words"""
+
+    def __init__(self, json_path: str, report_path: str, quran_words: Dict[str, str]):
+        self.json_path = json_path
+        self.report_path = report_path
+        self.quran_words = quran_words
+        self.roots = {}
+
+    def add(self, seq_id: int, record: MorphRecord):
+        if not record.root:
+            return
+        key = str(seq_id)
+        word = self.quran_words.get(key, "")
+        root_entry = self.roots.get(record.root)
+        if root_entry is None:
+            root_entry = self.roots[record.root] = {"Word": {}, "RootCount": 0}
+        word_entry = root_entry["Word"].get(word)
+        if word_entry is None:
+            word_entry = root_entry["Word"][word] = {"Verses": [], "WordCount": 0}
+        word_entry["Verses"].append({"Key": key, "ID": record.word_key})
+        word_entry["WordCount"] += 1
+        root_entry["RootCount"] += 1
+
+    def close(self):
+        for root_entry in self.roots.values():
+            for word_entry in root_entry["Word"].values():
+                word_entry["VerseCount"] = len(word_entry["Verses"])
+
+        with open(self.json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.roots, f, ensure_ascii=False, indent=4)
+
+        with open(self.report_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Root', 'Word', 'Count'])
+            for root, details in self.roots.items():
+                for word, word_details in details["Word"].items():
+                    writer.writerow([root, word, word_details["WordCount"]])
+
+
+def build(morphology_file: str, sinks: Iterable) -> int:
+    """Stream the morphology file once through every sink; returns the word count"""
+    sinks = list(sinks)
+    seq_id = 0
+    word_key = None
+    seen = set()
+
+    try:
+        for record in read_morphology(morphology_file):
+            if record.word_key != word_key:
+                # Words must be contiguous for streaming output
+                if record.word_key in seen:
+                    raise ValueError(f"{record.word_key} is split across {morphology_file}")
+                seen.add(record.word_key)
+                word_key = record.word_key
+                seq_id += 1
+            for sink in sinks:
+                sink.add(seq_id, record)
+    finally:
+        for sink in sinks:
+            sink.close()
+
+    return seq_id
+
+
+def main():
+    """Build every morphology-derived output with one read of the corpus"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(script_dir, '../data')
+
+    # Same MODE switch as arabic-corpus.py
+    mode = os.getenv('MODE', 'deployment')
+    if mode == 'development':
+        json_output_dir = os.path.join(script_dir, '../src/json')
+    elif mode == 'deployment':
+        json_output_dir = os.path.join(script_dir, '../build/json')
+    else:
+        raise ValueError(f"Unknown MODE: {mode}")
+    os.makedirs(json_output_dir, exist_ok=True)
+
+    sinks: List = [
+        MorphologyJsonSink(os.path.join(json_output_dir, 'quran_morphology.json')),
+        RootJsonSink(os.path.join(data_dir, 'root.json')),
+        RootCsvSink(os.path.join(data_dir, 'root.csv')),
+        RootVariationsSink(os.path.join(data_dir, 'categorized_by_root.json')),
+    ]
+
+    # root_words.json needs whole-word text from quran_words.json
+    # (same locations as rootwordsjson.py)
+    words_dir = os.path.join(script_dir, '../src/json')
+    words_file = os.path.join(words_dir, 'quran_words.json')
+    if os.path.exists(words_file):
+        with open(words_file, 'r', encoding='utf-8') as f:
+            quran_words = json.load(f)
+        os.makedirs(os.path.join(data_dir, 'reports'), exist_ok=True)
+        sinks.append(RootWordsSink(os.path.join(words_dir, 'root_words.json'),
+                                   os.path.join(data_dir, 'reports', 'root_word_report.txt'),
+                                   quran_words))
+    else:
+        print(f"{words_file} not found, skipping root_words.json")
+
+    words = build(os.path.join(data_dir, 'quran-morphology.txt'), sinks)
+    print(f"Processed {words} words into {len(sinks)} outputs")
+
+
+if __name__ == "__main__":
+    main()
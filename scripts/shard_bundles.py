@@ -0,0 +1,241 @@
+"""
+Frontend Data Shards
+Splits the verse, word, translation and morphology JSON files into compact
+per-page and per-sura shards plus a manifest with content hashes, so the
+web pages can fetch only the ayat they show instead of ~10MB up front.
+
+Each shard stores its tables as columns (one array per field, no repeated
+keys or indentation); ids are implied by the first id and array position:
+
+    {"key": 1, "from": "1:1", "to": "2:18",
+     "verses": {"first": 1, "sura": [...], "ayah": [...], "arabic": [...], ...},
+     "words": {"first": 1, "quran_words": [...], "en-word": [...], ...},
+     "morphology": {"word_id": [...], "location": [...], "pos": [...], ...}}
+
+The manifest lists every layout as columns too (key, hash, size, verse and
+word ranges); js/shards.js uses it to find and fetch shards and turns them
+back into the original object shapes.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+# Word-level files sharing the global word ids; column name = file stem
+WORD_FILES = [
+    'quran_words.json',
+    'quranic_words.json',
+    'quran_harakat_words.json',
+    'quranic_warsh_words.json',
+    'en-word.json',
+]
+
+# Small files every page needs; listed in the manifest with their hashes
+SHARED_FILES = ['sura.json', 'pagination_map.json']
+
+MORPHOLOGY_FIELDS = ['word', 'pos', 'root', 'lemma', 'morphology']
+
+MANIFEST_VERSION = 1
+
+
+def load_json(path: str) -> Optional[object]:
+    if not os.path.exists(path):
+        print(f"{path} not found, skipping")
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def compact(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    """Keep unchanged shards untouched so their mtimes (and caches) survive"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+class ShardSource:
+    """All input tables, indexed by global verse id and word id"""
+
+    def __init__(self, json_dir: str, shared_dir: str):
+        self.suras = load_json(os.path.join(shared_dir, 'sura.json'))
+        self.pages = load_json(os.path.join(shared_dir, 'pagination_map.json'))
+        self.verses = load_json(os.path.join(json_dir, 'combined_quran.json'))
+        self.harakat_verses = load_json(os.path.join(json_dir, 'combined_harakat_quran.json'))
+        self.morphology = load_json(os.path.join(json_dir, 'quran_morphology.json'))
+
+        self.words: Dict[str, Dict[str, str]] = {}
+        for name in WORD_FILES:
+            # MODE-aware outputs first, then the checked-in copies
+            path = os.path.join(json_dir, name)
+            if not os.path.exists(path):
+                path = os.path.join(shared_dir, name)
+            table = load_json(path)
+            if table is not None:
+                self.words[os.path.splitext(name)[0]] = table
+
+        if not self.suras or not self.verses:
+            raise FileNotFoundError("sura.json and combined_quran.json are required")
+
+        # global verse id → (sura, ayah)
+        self.refs: Dict[int, tuple] = {}
+        for s_key, sura_meta in self.suras.items():
+            for ayah in range(1, sura_meta["nAyah"] + 1):
+                self.refs[sura_meta["start"] + ayah - 1] = (int(s_key), ayah)
+
+    def verse_id(self, ref: str) -> int:
+        sura, ayah = ref.split(':')
+        return self.suras[sura]["start"] + int(ayah) - 1
+
+    def shard(self, key: int, first_verse: int, last_verse: int) -> Dict:
+        verse_ids = range(first_verse, last_verse + 1)
+        entries = [self.verses[str(v)] for v in verse_ids]
+        first_word = entries[0]["start_word"]
+        last_word = entries[-1]["end_word"]
+
+        verses = {
+            "first": first_verse,
+            "sura": [self.refs[v][0] for v in verse_ids],
+            "ayah": [self.refs[v][1] for v in verse_ids],
+            "start_word": [e["start_word"] for e in entries],
+            "end_word": [e["end_word"] for e in entries],
+            "arabic": [e.get("arabic") for e in entries],
+            "en": [e.get("en") for e in entries],
+        }
+        if self.harakat_verses:
+            verses["arabic_harakat"] = [self.harakat_verses[str(v)].get("arabic") for v in verse_ids]
+
+        word_ids = range(first_word, last_word + 1)
+        words = {"first": first_word}
+        for name, table in self.words.items():
+            words[name] = [table.get(str(w)) for w in word_ids]
+
+        shard = {
+            "key": key,
+            "from": "%d:%d" % self.refs[first_verse],
+            "to": "%d:%d" % self.refs[last_verse],
+            "verses": verses,
+            "words": words,
+        }
+
+        if self.morphology:
+            morphology = {"word_id": [], "location": []}
+            morphology.update({field: [] for field in MORPHOLOGY_FIELDS})
+            for w in word_ids:
+                entry = self.morphology.get(str(w))
+                if not entry:
+                    continue
+                for location, segment in entry["words"].items():
+                    morphology["word_id"].append(w)
+                    morphology["location"].append(location)
+                    for field in MORPHOLOGY_FIELDS:
+                        morphology[field].append(segment.get(field))
+            shard["morphology"] = morphology
+
+        return shard
+
+    def page_ranges(self) -> List[tuple]:
+        return [(p["page"], self.verse_id(p["from"]), self.verse_id(p["to"]))
+                for p in self.pages or []]
+
+    def sura_ranges(self) -> List[tuple]:
+        return [(int(s_key), meta["start"], meta["start"] + meta["nAyah"] - 1)
+                for s_key, meta in self.suras.items()]
+
+
+def write_layout(source: ShardSource, layout: str, ranges: List[tuple], output_dir: str) -> Dict:
+    """
+    Write one shard per range to output_dir/layout/<key>.json; returns the
+    layout's manifest columns
+    """
+    layout_dir = os.path.join(output_dir, layout)
+    os.makedirs(layout_dir, exist_ok=True)
+
+    columns = {name: [] for name in
+               ("key", "hash", "size", "first_verse", "last_verse", "first_word", "last_word")}
+    written = set()
+    changed = 0
+    for key, first_verse, last_verse in ranges:
+        shard = source.shard(key, first_verse, last_verse)
+        data = compact(shard)
+        file_name = f"{key}.json"
+        changed += write_if_changed(os.path.join(layout_dir, file_name), data)
+        written.add(file_name)
+
+        columns["key"].append(key)
+        columns["hash"].append(content_hash(data))
+        columns["size"].append(len(data))
+        columns["first_verse"].append(first_verse)
+        columns["last_verse"].append(last_verse)
+        columns["first_word"].append(shard["words"]["first"])
+        columns["last_word"].append(shard["verses"]["end_word"][-1])
+
+    # Drop shards left over from an older pagination
+    for file_name in os.listdir(layout_dir):
+        if file_name.endswith('.json') and file_name not in written:
+            os.remove(os.path.join(layout_dir, file_name))
+
+    print(f"{layout}: {len(written)} shards, {sum(columns['size']) / 1e6:.1f}MB, {changed} changed")
+    return columns
+
+
+def build_shards(json_dir: str, shared_dir: str, output_dir: str) -> Dict:
+    source = ShardSource(json_dir, shared_dir)
+
+    layouts = {"sura": write_layout(source, "sura", source.sura_ranges(), output_dir)}
+    if source.pages:
+        layouts["page"] = write_layout(source, "page", source.page_ranges(), output_dir)
+
+    shared = {}
+    for name in SHARED_FILES:
+        path = os.path.join(shared_dir, name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                shared[name] = content_hash(f.read())
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "verse_count": len(source.verses),
+        "word_count": max((len(table) for table in source.words.values()), default=0),
+        "word_columns": list(source.words),
+        "morphology": bool(source.morphology),
+        "shared": shared,
+        "layouts": layouts,
+    }
+    # The only file fetched up front
+    write_if_changed(os.path.join(output_dir, 'manifest.json'), compact(manifest))
+    return manifest
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    shared_dir = os.path.join(script_dir, '../src/json')
+
+    # Same MODE switch as ayahandword_parser.py
+    mode = os.getenv('MODE', 'development')
+    if mode == 'development':
+        json_dir = shared_dir
+    elif mode == 'deployment':
+        json_dir = os.path.join(script_dir, '../build/json')
+    else:
+        raise ValueError(f"Unknown MODE: {mode}")
+
+    build_shards(json_dir, shared_dir, os.path.join(json_dir, 'shards'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Quran Index JSON API
+Asyncio ASGI service exposing QuranUnifiedIndex and QuranSyntaxParser
+queries as JSON endpoints
+
+Run with any ASGI server from the data directory, e.g.:
+    uvicorn api_server:app --workers 4
+"""
+
+import asyncio
+import json
+import os
+import re
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from unified_index_imp import QuranUnifiedIndex
+from syntax_parser import QuranSyntaxParser
+from hot_reload import HotReloader
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+MAX_BATCH = 100
+
+
+class APIError(Exception):
+    """Error returned to the client as a JSON body"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_param(params: Dict[str, List[str]], name: str, default: int,
+               minimum: int = 0, maximum: Optional[int] = None) -> int:
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise APIError(400, f"'{name}' must be an integer")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise APIError(400, f"'{name}' out of range")
+    return value
+
+
+def _bool_param(params: Dict[str, List[str]], name: str) -> bool:
+    values = params.get(name)
+    return bool(values) and values[0].lower() in ('1', 'true', 'yes')
+
+
+def _select_fields(item: Any, fields: Optional[List[str]]) -> Any:
+    if not fields or not isinstance(item, dict):
+        return item
+    return {key: item[key] for key in fields if key in item}
+
+
+class IndexData:
+    """One loaded generation of the index and its syntax parser"""
+
+    def __init__(self, data_dir: str):
+        self.index = QuranUnifiedIndex(data_dir)
+        # Per-word data comes from the memory-mapped word store, so every
+        # worker process shares one copy of its pages
+        self.index.load_from_word_store()
+        self.parser = QuranSyntaxParser(self.index)
+
+
+class QuranAPI:
+    """ASGI application serving index queries"""
+
+    def __init__(self, data_dir: str = ".", workers: Optional[int] = None):
+        self.data_dir = data_dir
+        self.workers = workers or min(8, (os.cpu_count() or 1) + 2)
+        self.data = None    # HotReloader of IndexData, set at startup
+        self.executor = None
+        self.slots = None   # bounds queued CPU work; created on the event loop
+        self._ready = None
+
+        self.routes: List[Tuple[re.Pattern, Callable]] = [
+            (re.compile(r'^/health$'), self.health),
+            (re.compile(r'^/verse/(\d+)/(\d+)$'), self.verse),
+            (re.compile(r'^/verses$'), self.verses),
+            (re.compile(r'^/root/([^/]+)$'), self.root),
+            (re.compile(r'^/commands/([^/]+)$'), self.commands),
+            (re.compile(r'^/search$'), self.search),
+            (re.compile(r'^/syntax/(\d+)$'), self.syntax),
+        ]
+
+    # ----- startup -----
+
+    def _load(self):
+        watch = [os.path.join(self.data_dir, name) for name in QuranUnifiedIndex.SOURCE_FILES]
+        self.data = HotReloader(lambda: IndexData(self.data_dir), watch_files=watch, name="index")
+        self.data.watch()
+
+    async def startup(self):
+        if self._ready is None:
+            self._ready = asyncio.ensure_future(self._startup())
+        await self._ready
+
+    async def _startup(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(self.workers * 4)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._load)
+        try:
+            # kill -HUP reloads the index in the background
+            loop.add_signal_handler(signal.SIGHUP, self.data.reload)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run a CPU-heavy call in the bounded executor"""
+        async with self.slots:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    # ----- handlers (return JSON-able objects) -----
+
+    async def health(self, data, params):
+        return {'status': 'ok', 'data': self.data.status(),
+                'stats': {k: v for k, v in data.index.stats.items() if not isinstance(v, dict)}}
+
+    async def verse(self, data, params, sura, ayah):
+        result = await self.run(data.index.get_sura_verse, int(sura), int(ayah))
+        if result is None:
+            raise APIError(404, f"Verse {sura}:{ayah} not found")
+        return _select_fields(result, params.get('_fields'))
+
+    async def verses(self, data, params):
+        refs = ','.join(params.get('refs', [])).split(',')
+        refs = [ref.strip() for ref in refs if ref.strip()]
+        if not refs:
+            raise APIError(400, "'refs' is required, e.g. refs=1:1,2:255")
+        if len(refs) > MAX_BATCH:
+            raise APIError(400, f"At most {MAX_BATCH} refs per request")
+
+        parsed = []
+        for ref in refs:
+            try:
+                sura, ayah = (int(part) for part in ref.split(':'))
+            except ValueError:
+                raise APIError(400, f"Invalid verse ref '{ref}'")
+            parsed.append((sura, ayah))
+
+        def lookup():
+            return [data.index.get_sura_verse(sura, ayah) for sura, ayah in parsed]
+
+        results = await self.run(lookup)
+        return {
+            'items': [_select_fields(r, params.get('_fields')) for r in results],
+            'missing': [ref for ref, r in zip(refs, results) if r is None],
+        }
+
+    async def _page(self, data, params, word_ids: List[int]):
+        """Expand one page of word ids into word info dicts"""
+        offset = _int_param(params, 'offset', 0)
+        limit = _int_param(params, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        page_ids = word_ids[offset:offset + limit]
+
+        def expand():
+            return [data.index.get_word_info(word_id) for word_id in page_ids]
+
+        items = await self.run(expand)
+        return {
+            'total': len(word_ids),
+            'offset': offset,
+            'limit': limit,
+            'items': [_select_fields(item, params.get('_fields')) for item in items if item],
+        }
+
+    async def root(self, data, params, root):
+        return await self._page(data, params, data.index.root_index.get(root, []))
+
+    async def commands(self, data, params, root):
+        entries = data.index.commands_by_root(root)
+        offset = _int_param(params, 'offset', 0)
+        limit = _int_param(params, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        return {
+            'total': len(entries),
+            'offset': offset,
+            'limit': limit,
+            'items': [_select_fields(e, params.get('_fields')) for e in entries[offset:offset + limit]],
+        }
+
+    async def search(self, data, params):
+        query = (params.get('q') or [''])[0].strip()
+        if not query:
+            raise APIError(400, "'q' is required")
+        word_ids = await self.run(
+            data.index.search_word_ids, query,
+            _bool_param(params, 'exact'), _bool_param(params, 'normalized')
+        )
+        return await self._page(data, params, word_ids)
+
+    async def syntax(self, data, params, verse_id):
+        result = await self.run(data.parser.analyze_verse_syntax, int(verse_id))
+        if 'error' in result:
+            raise APIError(404, result['error'])
+        return _select_fields(result, params.get('_fields'))
+
+    # ----- dispatch -----
+
+    async def dispatch(self, path: str, query_string: str) -> Tuple[int, Any]:
+        params = parse_qs(query_string)
+        fields = ','.join(params.get('fields', []))
+        params['_fields'] = [f for f in fields.split(',') if f] or None
+
+        for pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match:
+                # Requests keep the data generation they started with
+                with self.data.acquire() as data:
+                    try:
+                        return 200, await handler(data, params, *match.groups())
+                    except APIError as e:
+                        return e.status, {'error': e.message}
+        return 404, {'error': f"Unknown endpoint {path}"}
+
+    async def batch(self, body: bytes) -> Tuple[int, Any]:
+        """POST /batch: {"requests": ["/verse/1/1", "/search?q=..."]}"""
+        try:
+            requests = json.loads(body or b'{}').get('requests', [])
+        except (ValueError, AttributeError):
+            return 400, {'error': "Body must be JSON: {\"requests\": [...]}"}
+        if not isinstance(requests, list) or len(requests) > MAX_BATCH:
+            return 400, {'error': f"'requests' must be a list of at most {MAX_BATCH} paths"}
+
+        async def one(url):
+            parts = urlsplit(str(url))
+            status, payload = await self.dispatch(parts.path, parts.query)
+            return {'status': status, 'body': payload}
+
+        return 200, {'responses': await asyncio.gather(*(one(url) for url in requests))}
+
+    # ----- ASGI -----
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await self.startup()
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    if self.executor:
+                        self.executor.shutdown(wait=False)
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+
+        if scope['type'] != 'http':
+            return
+
+        await self.startup()
+        path = scope['path']
+        method = scope['method']
+
+        if method == 'POST' and path == '/batch':
+            body = b''
+            while True:
+                message = await receive()
+                body += message.get('body', b'')
+                if not message.get('more_body'):
+                    break
+            status, payload = await self.batch(body)
+        elif method == 'GET':
+            status, payload = await self.dispatch(path, scope.get('query_string', b'').decode('latin-1'))
+        else:
+            status, payload = 405, {'error': f"{method} not allowed"}
+
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json; charset=utf-8'),
+                (b'content-length', str(len(data)).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': data})
+
+
+app = QuranAPI(os.environ.get('QURAN_DATA_DIR', '.'))
+
+
+def main():
+    """Serve the API with uvicorn"""
+    import uvicorn
+    uvicorn.run('api_server:app', host='0.0.0.0', port=int(os.environ.get('PORT', 8000)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,165 @@
 # app.py
-from flask import Flask, render_template, abort, request, redirect
+from flask import Flask, render_template, abort, request, redirect, Response
+from bisect import bisect_right
+import gzip
+import hashlib
 import json
+import os
 
-app = Flask(__name__)
-
-# ----------------------
-# Load data
-# ----------------------
-with open("pagination_map.json", encoding="utf-8") as f:
-    pages = json.load(f)
+from hot_reload import HotReloader
 
-with open("verses.json", encoding="utf-8") as f:
-    verses = json.load(f)
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
 
-with open("sura.json", encoding="utf-8") as f:
-    suras = json.load(f)
+app = Flask(__name__)
+# Pick up template edits along with data reloads
+app.config["TEMPLATES_AUTO_RELOAD"] = True
+
+# Pages only change when one of these files changes, so their hash
+# identifies the data build in ETags and versioned URLs
+BUILD_FILES = [
+    "pagination_map.json",
+    "verses.json",
+    "sura.json",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "page.html"),
+]
+
+# Versioned URLs (?v=<build hash>) never change content; others revalidate
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "public, no-cache"
 
 # ----------------------
 # Helper functions
 # ----------------------
 
+def compute_build_hash(paths):
+    sha1 = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            sha1.update(f.read())
+    return sha1.hexdigest()[:16]
+
+
 def parse_ref(ref):
     s, a = ref.split(":")
     return int(s), int(a)
 
 
-def get_page_data(page_number):
-    for p in pages:
-        if p["page"] == page_number:
-            start_s, start_a = parse_ref(p["from"])
-            end_s, end_a = parse_ref(p["to"])
-
-            ayat = []
-            current_s = start_s
-            current_a = start_a
-
-            while True:
-                # Find global ayah id via sura.json
-                sura_meta = suras[str(current_s)]
-                global_id = sura_meta["start"] + current_a - 1
-                ayah = verses[str(global_id)]
-                ayat.append({
-                    "surah": current_s,
-                    "ayah": current_a,
-                    "arabic": ayah.get("arabic"),
-                    "en": ayah.get("en")
-                })
-
-                if current_s == end_s and current_a == end_a:
-                    break
-
-                current_a += 1
-                if current_a > suras[str(current_s)]["nAyah"]:
-                    current_s += 1
-                    current_a = 1
+# ----------------------
+# Page data (one generation per data build)
+# ----------------------
 
-            return p, ayat
-    return None, None
+class PageData:
+    """Page/verse tables and rendered page cache for one data build"""
+
+    def __init__(self):
+        with open("pagination_map.json", encoding="utf-8") as f:
+            self.pages = json.load(f)
+
+        with open("verses.json", encoding="utf-8") as f:
+            self.verses = json.load(f)
+
+        with open("sura.json", encoding="utf-8") as f:
+            self.suras = json.load(f)
+
+        self.build_hash = compute_build_hash(BUILD_FILES)
+
+        # global ayah id → (surah, ayah)
+        self.verse_refs = {}
+        for s_key, sura_meta in self.suras.items():
+            for a in range(1, sura_meta["nAyah"] + 1):
+                self.verse_refs[sura_meta["start"] + a - 1] = (int(s_key), a)
+
+        # page number → page entry and its (start_verse_id, end_verse_id)
+        self.page_by_number = {}
+        self.page_ranges = {}
+        for p in self.pages:
+            self.page_by_number[p["page"]] = p
+            self.page_ranges[p["page"]] = (self.ref_to_verse_id(*parse_ref(p["from"])),
+                                           self.ref_to_verse_id(*parse_ref(p["to"])))
+
+        # Page numbers ordered by first ayah, for bisect lookups in /goto
+        self.page_order = sorted(self.page_ranges, key=lambda n: self.page_ranges[n][0])
+        self.page_starts = [self.page_ranges[n][0] for n in self.page_order]
+
+        self.page_cache = {}     # page number → (page entry, ayat)
+        self.page_bodies = {}    # page number → {encoding: body bytes}
+
+    def ref_to_verse_id(self, surah, ayah):
+        """Global ayah id for surah:ayah via sura.json"""
+        return self.suras[str(surah)]["start"] + ayah - 1
+
+    def find_page(self, verse_id):
+        """Page number containing a global ayah id, or None"""
+        i = bisect_right(self.page_starts, verse_id) - 1
+        if i < 0:
+            return None
+        page_number = self.page_order[i]
+        if verse_id > self.page_ranges[page_number][1]:
+            return None
+        return page_number
+
+    def get_page_data(self, page_number):
+        cached = self.page_cache.get(page_number)
+        if cached is not None:
+            return cached
+
+        p = self.page_by_number.get(page_number)
+        if p is None:
+            return None, None
+
+        start_id, end_id = self.page_ranges[page_number]
+        ayat = []
+        for global_id in range(start_id, end_id + 1):
+            current_s, current_a = self.verse_refs[global_id]
+            ayah = self.verses[str(global_id)]
+            ayat.append({
+                "surah": current_s,
+                "ayah": current_a,
+                "arabic": ayah.get("arabic"),
+                "en": ayah.get("en")
+            })
+
+        self.page_cache[page_number] = p, ayat
+        return p, ayat
+
+    def get_page_bodies(self, page_number):
+        """Rendered page in every supported encoding, built once per page"""
+        bodies = self.page_bodies.get(page_number)
+        if bodies is not None:
+            return bodies
+
+        page, ayat = self.get_page_data(page_number)
+        if not page:
+            return None
+
+        html = render_template(
+            "page.html",
+            page=page,
+            ayat=ayat,
+            page_number=page_number,
+            total_pages=len(self.pages),
+            suras=self.suras,  # Add this line to pass surah data to template
+            build=self.build_hash
+        ).encode("utf-8")
+
+        bodies = {
+            "identity": html,
+            "gzip": gzip.compress(html, compresslevel=9, mtime=0),
+        }
+        if brotli is not None:
+            bodies["br"] = brotli.compress(html)
+
+        self.page_bodies[page_number] = bodies
+        return bodies
+
+
+# Reloaded in the background when a build file changes or on SIGHUP;
+# requests in flight keep the generation they started with
+page_data = HotReloader(PageData, watch_files=BUILD_FILES, name="page data")
+page_data.watch()
 
 # ----------------------
 # Routes
@@ -64,11 +167,12 @@ def get_page_data(page_number):
 # Home page with surah/ayah navigation (RTL)
 @app.route("/")
 def index():
-    return render_template(
-        "index.html",
-        suras=suras,
-        total_pages=len(pages)
-    )
+    with page_data.acquire() as data:
+        return render_template(
+            "index.html",
+            suras=data.suras,
+            total_pages=len(data.pages)
+        )
 
 
 @app.route("/goto", methods=["GET"])
@@ -76,33 +180,58 @@ def goto():
     surah = int(request.args.get("surah"))
     ayah = int(request.args.get("ayah"))
 
-    # find page containing this ayah
-    for p in pages:
-        start_s, start_a = parse_ref(p["from"])
-        end_s, end_a = parse_ref(p["to"])
+    with page_data.acquire() as data:
+        # find page containing this ayah
+        sura_meta = data.suras.get(str(surah))
+        if sura_meta is None or not 1 <= ayah <= sura_meta["nAyah"]:
+            abort(404)
+
+        page_number = data.find_page(data.ref_to_verse_id(surah, ayah))
+        if page_number is None:
+            abort(404)
+        return redirect(f"/page/{page_number}?v={data.build_hash}")
+
+
+# ----------------------
+# Cached page responses
+# ----------------------
+
+# Strong ETags identify exact bytes, so each encoding gets its own
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+
+def cached_response(bodies, etag, build_hash):
+    """Serve precomputed bodies with a per-encoding strong ETag and conditional GET"""
+    cache_control = CACHE_IMMUTABLE if request.args.get("v") == build_hash else CACHE_REVALIDATE
 
-        if (surah > start_s or (surah == start_s and ayah >= start_a)) and \
-           (surah < end_s or (surah == end_s and ayah <= end_a)):
-            return redirect(f"/page/{p['page']}")
+    encoding = request.accept_encodings.best_match(
+        [e for e in ("br", "gzip") if e in bodies], default="identity"
+    )
+    etag += ETAG_SUFFIXES[encoding]
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(bodies[encoding], mimetype="text/html")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
 
-    abort(404)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
 
 
 @app.route("/page/<int:page_number>")
 def show_page(page_number):
-    page, ayat = get_page_data(page_number)
-    if not page:
-        abort(404)
-    return render_template(
-        "page.html",
-        page=page,
-        ayat=ayat,
-        page_number=page_number,
-        total_pages=len(pages),
-        suras=suras  # Add this line to pass surah data to template
-    )
+    with page_data.acquire() as data:
+        bodies = data.get_page_bodies(page_number)
+        if bodies is None:
+            abort(404)
+        return cached_response(bodies, f"{data.build_hash}-{page_number}", data.build_hash)
 
 # ----------------------
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    page_data.reload_on_signal()
+    app.run(debug=True)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Arabic Text Normalizer
+Table-driven normalization so that diacritized, Uthmani, Warsh and plain
+spellings of the same word compare equal
+"""
+
+from typing import Dict, List
+
+# Characters removed entirely: standalone hamza, harakat, tanween, shadda,
+# sukun, combining hamza/maddah, superscript alef, Quranic annotation marks,
+# tatweel and direction marks
+_DELETE = (
+    ['\u0621'] +                               # standalone hamza (ءامنوا = امنوا)
+    [chr(c) for c in range(0x064B, 0x0660)] +   # harakat and combining marks
+    ['\u0670'] +                               # superscript (dagger) alef
+    [chr(c) for c in range(0x06D6, 0x06EE)] +   # Quranic annotation signs
+    ['\u0640', '\u200c', '\u200d', '\u200e', '\u200f']  # tatweel, joiners, marks
+)
+
+# Letter variants folded to one base letter
+_FOLD = {
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ٲ': 'ا', 'ٳ': 'ا',
+    'ؤ': 'و',
+    'ئ': 'ي', 'ى': 'ي', 'ی': 'ي', 'ے': 'ي',
+    'ة': 'ه',
+    'ک': 'ك',
+}
+
+DIACRITICS_TABLE = str.maketrans({ch: None for ch in _DELETE if ch != '\u0621'})
+NORMALIZE_TABLE = str.maketrans({**{ch: None for ch in _DELETE}, **_FOLD})
+
+# Uthmani rasm spellings with a written waw/alef where standard spelling
+# differs; applied after the character table, so keys are normalized.
+# Only whole tokens are replaced (optionally after the proclitics below):
+# a substring replace would also rewrite words like يتمنوه or يربوا
+RASM_VARIANTS = {
+    'صلوه': 'صلاه',
+    'صلوت': 'صلوات',
+    'زكوه': 'زكاه',
+    'حيوه': 'حياه',
+    'نجوه': 'نجاه',
+    'مشكوه': 'مشكاه',
+    'منوه': 'مناه',
+    'غدوه': 'غداه',
+    'ربوا': 'ربا',
+}
+
+# Conjunction/preposition/article prefixes a variant may carry
+_PROCLITICS = ('', 'ال', 'و', 'ف', 'ب', 'ل', 'ك', 'لل', 'وال', 'فال', 'بال', 'كال',
+               'ول', 'فل', 'وب', 'فب', 'ولل', 'فلل', 'وبال', 'فبال')
+
+# Full token → standard spelling, e.g. والصلوه → والصلاه
+_RASM_TOKENS = {prefix + rasm: prefix + standard
+                for rasm, standard in RASM_VARIANTS.items() for prefix in _PROCLITICS}
+
+
+def normalize_arabic(text: str) -> str:
+    """Normalize Arabic text for diacritic- and hamza-insensitive matching"""
+    if not text:
+        return ''
+    text = text.translate(NORMALIZE_TABLE).strip()
+    tokens = text.split()
+    if len(tokens) == 1:
+        return _RASM_TOKENS.get(text, text)
+    return ' '.join(_RASM_TOKENS.get(token, token) for token in tokens)
+
+
+def strip_diacritics(text: str) -> str:
+    """Remove harakat and annotation marks but keep letter forms"""
+    if not text:
+        return ''
+    return text.translate(DIACRITICS_TABLE)
+
+
+def build_normalized_forms(*word_sets: Dict[str, str]) -> Dict[str, List[int]]:
+    """
+    Map normalized form → sorted word ids across several word_id (str) →
+    text mappings (e.g. plain, harakat and Warsh word files)
+    """
+    forms = {}
+    for words in word_sets:
+        for word_id_str, text in words.items():
+            try:
+                word_id = int(word_id_str)
+            except ValueError:
+                continue
+            forms.setdefault(normalize_arabic(text), set()).add(word_id)
+    return {form: sorted(ids) for form, ids in forms.items() if form}
+
@@ -5,6 +5,8 @@ Debug script for الصلاة search
 
 import json
 
+from arabic_normalizer import normalize_arabic, build_normalized_forms
+
 def debug_salah():
     print("Debugging الصلاة Search")
     print("="*60)
@@ -41,6 +43,18 @@ def debug_salah():
             for word_id, arabic_word in partial_found[:3]:
                 print(f"    {word_id}: {arabic_word}")
     
+    print("\n" + "="*60)
+    print("Normalized search (diacritics, hamza and rasm variants ignored)")
+    print("="*60)
+    
+    normalized_forms = build_normalized_forms(words)
+    for term in search_terms:
+        form = normalize_arabic(term)
+        word_ids = normalized_forms.get(form, [])
+        print(f"  '{term}' → '{form}': {len(word_ids)} exact normalized matches")
+        for word_id in word_ids[:3]:
+            print(f"    {word_id}: {words[str(word_id)]}")
+    
     print("\n" + "="*60)
     print("Checking specific word IDs around prayer concepts")
     print("="*60)
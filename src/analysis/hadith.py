@@ -2,6 +2,8 @@ import pandas as pd
 import re
 from pathlib import Path
 
+from arabic_normalizer import normalize_arabic
+
 class HadithAnalyzer:
     def __init__(self, csv_path):
         """
@@ -93,6 +95,13 @@ class HadithAnalyzer:
         
         # Remove any duplicate rows
         self.df = self.df.drop_duplicates()
+        
+        # Precompute normalized text (no harakat, unified hamza/alef forms)
+        # so variant-tolerant searches don't re-normalize on every query
+        source = self.df['Arabic_TASHKEEL'].where(
+            self.df['Arabic_TASHKEEL'] != '', self.df['Arabic_without_TASHKEEL']
+        )
+        self.df['Arabic_normalized'] = source.map(normalize_arabic)
     
     def search_arabic_text(self, query, search_column='both', case_sensitive=False):
         """
@@ -100,7 +109,8 @@ class HadithAnalyzer:
         
         Args:
             query (str): Search term
-            search_column (str): 'both', 'without_tashkeel', or 'with_tashkeel'
+            search_column (str): 'both', 'without_tashkeel', 'with_tashkeel',
+                or 'normalized' (ignores harakat, hamza forms and tatweel)
             case_sensitive (bool): Whether search should be case sensitive
         
         Returns:
@@ -113,8 +123,12 @@ class HadithAnalyzer:
             mask = self.df['Arabic_without_TASHKEEL'].str.contains(query, case=case_sensitive, na=False)
         elif search_column == 'with_tashkeel':
             mask = self.df['Arabic_TASHKEEL'].str.contains(query, case=case_sensitive, na=False)
+        elif search_column == 'normalized':
+            mask = self.df['Arabic_normalized'].str.contains(
+                normalize_arabic(query), case=case_sensitive, na=False, regex=False
+            )
         else:
-            raise ValueError("search_column must be 'both', 'without_tashkeel', or 'with_tashkeel'")
+            raise ValueError("search_column must be 'both', 'without_tashkeel', 'with_tashkeel', or 'normalized'")
         
         results = self.df[mask]
         print(f"Found {len(results)} results for query: '{query}'")
@@ -207,7 +221,8 @@ def main():
             print("1. Both columns")
             print("2. Arabic without Tashkeel only")
             print("3. Arabic with Tashkeel only")
-            col_choice = input("Enter choice (1-3): ").strip()
+            print("4. Normalized (ignore Tashkeel and hamza forms)")
+            col_choice = input("Enter choice (1-4): ").strip()
             
             if col_choice == '1':
                 search_column = 'both'
@@ -215,6 +230,8 @@ def main():
                 search_column = 'without_tashkeel'
             elif col_choice == '3':
                 search_column = 'with_tashkeel'
+            elif col_choice == '4':
+                search_column = 'normalized'
             else:
                 print("Invalid choice. Defaulting to 'both'.")
                 search_column = 'both'
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Hot-Reloadable Data Holder
+Keeps versioned generations of loaded data for long-running servers: a new
+generation is built in the background and swapped in atomically, while the
+previous one stays alive until requests using it finish
+"""
+
+import os
+import signal
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class Generation:
+    """One loaded version of the data"""
+
+    __slots__ = ('version', 'data', 'loaded_at', 'active')
+
+    def __init__(self, version: int, data: Any):
+        self.version = version
+        self.data = data
+        self.loaded_at = time.time()
+        self.active = 0     # requests currently using this generation
+
+
+def _file_state(paths: Sequence[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            state[path] = (st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            state[path] = None
+    return state
+
+
+class HotReloader:
+    """
+    Holds the current generation of data produced by loader().
+
+    Readers use `with holder.acquire() as data:`; acquiring only bumps a
+    counter under a short lock, so a reload never blocks requests. Reloads
+    run loader() on a background thread, triggered by reload(), a watched
+    file changing, or a signal.
+    """
+
+    def __init__(self, loader: Callable[[], Any], watch_files: Sequence[str] = (),
+                 dispose: Optional[Callable[[Any], None]] = None, name: str = "data"):
+        self.loader = loader
+        self.watch_files = list(watch_files)
+        self.dispose = dispose
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()   # one background build at a time
+        self._pending = False
+        self._retired: List[Generation] = []   # replaced, still in use
+        self._watch_state = _file_state(self.watch_files)
+        self.last_error: Optional[str] = None  # why the latest reload failed
+        self._current = Generation(1, loader())
+
+    # ----- readers -----
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    @property
+    def current(self) -> Any:
+        """Current data, for callers that don't need drain tracking"""
+        return self._current.data
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Pin the current generation for the duration of a request"""
+        with self._lock:
+            generation = self._current
+            generation.active += 1
+        try:
+            yield generation.data
+        finally:
+            with self._lock:
+                generation.active -= 1
+                drained = generation is not self._current and generation.active == 0
+                if drained and generation in self._retired:
+                    self._retired.remove(generation)
+                else:
+                    drained = False
+            if drained:
+                self._dispose(generation)
+
+    # ----- reloading -----
+
+    def reload(self, wait: bool = False) -> bool:
+        """
+        Build a new generation in the background and swap it in. Returns
+        False if a reload is already running (it will pick up the change).
+        """
+        with self._lock:
+            if self._pending:
+                return False
+            self._pending = True
+
+        thread = threading.Thread(target=self._reload, name=f"{self.name}-reload", daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def _reload(self):
+        with self._reload_lock:
+            with self._lock:
+                self._pending = False
+            state = _file_state(self.watch_files)
+            start = time.time()
+            try:
+                data = self.loader()
+            except Exception as e:
+                # Keep serving the old generation if the new data is broken.
+                # Remember the files as tried, so the watcher retries only
+                # after they change again instead of on every poll.
+                with self._lock:
+                    self._watch_state = state
+                    self.last_error = f"{type(e).__name__}: {e}"
+                print(f"Reload of {self.name} failed; keeping version {self.version}")
+                traceback.print_exc()
+                return
+
+            with self._lock:
+                old = self._current
+                self._current = Generation(old.version + 1, data)
+                self._watch_state = state
+                self.last_error = None
+                if old.active:
+                    self._retired.append(old)
+                    old = None
+            print(f"Reloaded {self.name} as version {self.version} in {time.time() - start:.2f}s")
+            if old is not None:
+                self._dispose(old)
+
+    def _dispose(self, generation: Generation):
+        if self.dispose is not None:
+            try:
+                self.dispose(generation.data)
+            except Exception:
+                traceback.print_exc()
+
+    def changed_files(self) -> List[str]:
+        """Watched files whose size or mtime changed since the last load attempt"""
+        state = _file_state(self.watch_files)
+        return [path for path in self.watch_files if state[path] != self._watch_state.get(path)]
+
+    def watch(self, interval: float = 2.0) -> threading.Thread:
+        """Poll the watched files and reload when any of them changes"""
+        def poll():
+            while True:
+                time.sleep(interval)
+                if self._reload_lock.locked():
+                    continue   # compare again once the running reload finishes
+                changed = self.changed_files()
+                if changed:
+                    print(f"{self.name}: {', '.join(changed)} changed, reloading")
+                    self.reload()
+
+        thread = threading.Thread(target=poll, name=f"{self.name}-watch", daemon=True)
+        thread.start()
+        return thread
+
+    def reload_on_signal(self, signum: Optional[int] = None):
+        """Reload when the process receives signum (SIGHUP where available)"""
+        signum = signum or getattr(signal, 'SIGHUP', None)
+        if signum is not None:
+            signal.signal(signum, lambda *_: self.reload())
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'name': self.name,
+                'version': self._current.version,
+                'loaded_at': self._current.loaded_at,
+                'active': self._current.active,
+                'draining': [(g.version, g.active) for g in self._retired],
+                'last_error': self.last_error,
+            }
@@ -5,10 +5,15 @@ Handles conversion between different ID formats across files
 """
 
 import json
-from functools import lru_cache
-from typing import Dict, Tuple, Optional
+from array import array
+from typing import Dict, Iterable, List, Tuple, Optional
 import os
 
+try:
+    import numpy as np
+except ImportError:  # batch converters fall back to pure Python
+    np = None
+
 class QuranIDMapper:
     """Maps between different Quran ID systems"""
     
@@ -39,36 +44,57 @@ class QuranIDMapper:
                 verse_data['end_word']
             )
         
+        self._build_tables()
+        
         print(f"Loaded {len(self.sura_data)} surahs, {len(self.verse_ranges)} verses")
     
-    @lru_cache(maxsize=10000)
+    def _build_tables(self):
+        """Build dense id-indexed lookup arrays (0 means 'no value')"""
+        n_surahs = max((int(k) for k in self.sura_data), default=0) + 1
+        n_verses = max(self.verse_ranges, default=0) + 1
+        n_words = max((end for _, end in self.verse_ranges.values()), default=0) + 1
+        
+        # surah → first verse id / number of ayat
+        self.surah_start = array('I', bytes(4 * n_surahs))
+        self.surah_size = array('I', bytes(4 * n_surahs))
+        # verse_id → (surah, ayah)
+        self.verse_surah = array('I', bytes(4 * n_verses))
+        self.verse_ayah = array('I', bytes(4 * n_verses))
+        for surah_key, surah_info in self.sura_data.items():
+            surah = int(surah_key)
+            start, end = surah_info['start'], surah_info['end']
+            self.surah_start[surah] = start
+            self.surah_size[surah] = end - start + 1
+            for verse_id in range(start, min(end, n_verses - 1) + 1):
+                self.verse_surah[verse_id] = surah
+                self.verse_ayah[verse_id] = verse_id - start + 1
+        
+        # verse_id → first/last word, word_id → verse_id
+        self.verse_first_word = array('I', bytes(4 * n_verses))
+        self.verse_last_word = array('I', bytes(4 * n_verses))
+        self.word_verse = array('I', bytes(4 * n_words))
+        for verse_id, (start, end) in self.verse_ranges.items():
+            self.verse_first_word[verse_id] = start
+            self.verse_last_word[verse_id] = end
+            for word_id in range(start, end + 1):
+                self.word_verse[word_id] = verse_id
+    
     def surah_ayah_to_verse_id(self, surah: int, ayah: int) -> Optional[int]:
         """Convert surah:ayah to sequential verse ID"""
-        surah_key = str(surah)
-        if surah_key not in self.sura_data:
+        if not 0 < surah < len(self.surah_start) or not self.surah_size[surah]:
             return None
         
-        surah_info = self.sura_data[surah_key]
-        start_verse = surah_info['start']
-        end_verse = surah_info['end']
-        
         # Validate ayah number
-        if ayah < 1 or ayah > (end_verse - start_verse + 1):
+        if ayah < 1 or ayah > self.surah_size[surah]:
             return None
         
-        verse_id = start_verse + ayah - 1
-        return verse_id
+        return self.surah_start[surah] + ayah - 1
     
-    @lru_cache(maxsize=10000)
     def verse_id_to_surah_ayah(self, verse_id: int) -> Optional[Tuple[int, int]]:
         """Convert sequential verse ID to surah:ayah"""
-        # Find which surah contains this verse
-        for surah_key, surah_info in self.sura_data.items():
-            if surah_info['start'] <= verse_id <= surah_info['end']:
-                surah = int(surah_key)
-                ayah = verse_id - surah_info['start'] + 1
-                return surah, ayah
-        return None
+        if not 0 < verse_id < len(self.verse_surah) or not self.verse_surah[verse_id]:
+            return None
+        return self.verse_surah[verse_id], self.verse_ayah[verse_id]
     
     def parse_root_id(self, root_id: str) -> Optional[Tuple[int, int, int]]:
         """
@@ -104,10 +130,11 @@ class QuranIDMapper:
             return None
         
         # Get word range for this verse
-        if verse_id not in self.verse_ranges:
+        if verse_id >= len(self.verse_first_word) or not self.verse_first_word[verse_id]:
             return None
         
-        start_word, end_word = self.verse_ranges[verse_id]
+        start_word = self.verse_first_word[verse_id]
+        end_word = self.verse_last_word[verse_id]
         
         # Calculate global word ID
         if word_pos < 1:
@@ -126,18 +153,15 @@ class QuranIDMapper:
         Convert global word ID to "surah:ayah:word_position"
         """
         # Find which verse contains this word
-        verse_id = None
-        word_pos_in_verse = None
-        
-        for v_id, (start, end) in self.verse_ranges.items():
-            if start <= global_word_id <= end:
-                verse_id = v_id
-                word_pos_in_verse = global_word_id - start + 1
-                break
+        if not 0 < global_word_id < len(self.word_verse):
+            return None
         
+        verse_id = self.word_verse[global_word_id]
         if not verse_id:
             return None
         
+        word_pos_in_verse = global_word_id - self.verse_first_word[verse_id] + 1
+        
         # Convert verse_id to surah:ayah
         surah_ayah = self.verse_id_to_surah_ayah(verse_id)
         if not surah_ayah:
@@ -146,6 +170,94 @@ class QuranIDMapper:
         surah, ayah = surah_ayah
         return f"{surah}:{ayah}:{word_pos_in_verse}"
     
+    # ===== BATCH CONVERTERS =====
+    
+    def word_ids_to_verse_ids(self, word_ids: Iterable[int]):
+        """Map many word ids to verse ids at once (0 for unknown ids)"""
+        if np is not None:
+            table = np.frombuffer(self.word_verse, dtype=np.uint32)
+            ids = np.asarray(word_ids, dtype=np.int64)
+            valid = (ids > 0) & (ids < len(table))
+            return np.where(valid, table[np.where(valid, ids, 0)], 0)
+        
+        table = self.word_verse
+        n = len(table)
+        return array('I', (table[i] if 0 < i < n else 0 for i in word_ids))
+    
+    def verse_ids_to_surah_ayah(self, verse_ids: Iterable[int]):
+        """Map many verse ids to (surahs, ayahs) arrays (0 for unknown ids)"""
+        if np is not None:
+            surahs = np.frombuffer(self.verse_surah, dtype=np.uint32)
+            ayahs = np.frombuffer(self.verse_ayah, dtype=np.uint32)
+            ids = np.asarray(verse_ids, dtype=np.int64)
+            valid = (ids > 0) & (ids < len(surahs))
+            safe = np.where(valid, ids, 0)
+            return np.where(valid, surahs[safe], 0), np.where(valid, ayahs[safe], 0)
+        
+        n = len(self.verse_surah)
+        ids = [i if 0 < i < n else 0 for i in verse_ids]
+        return (array('I', (self.verse_surah[i] for i in ids)),
+                array('I', (self.verse_ayah[i] for i in ids)))
+    
+    def global_word_ids_to_root_ids(self, word_ids: Iterable[int]) -> List[Optional[str]]:
+        """Convert many global word ids to "surah:ayah:word_position" strings"""
+        word_ids = list(word_ids)
+        verse_ids = self.word_ids_to_verse_ids(word_ids)
+        surahs, ayahs = self.verse_ids_to_surah_ayah(verse_ids)
+        first_word = self.verse_first_word
+        
+        return [
+            f"{surah}:{ayah}:{word_id - first_word[verse_id] + 1}" if surah else None
+            for word_id, verse_id, surah, ayah in zip(word_ids, verse_ids, surahs, ayahs)
+        ]
+    
+    @staticmethod
+    def _split_root_id(root_id: str) -> Tuple[int, int, int]:
+        """(surah, ayah, word_position), or zeros for a malformed id"""
+        parts = root_id.split(':')
+        if len(parts) != 3:
+            return 0, 0, 0
+        try:
+            return int(parts[0]), int(parts[1]), int(parts[2])
+        except ValueError:
+            return 0, 0, 0
+    
+    def root_ids_to_global_word_ids(self, root_ids: Iterable[str]):
+        """
+        Convert many "surah:ayah:word_position" ids (e.g. all root_words.json
+        keys) to global word ids at once (0 for malformed or out-of-range ids)
+        """
+        root_ids = list(root_ids)
+        
+        if np is not None:
+            if not root_ids:
+                return np.zeros(0, dtype=np.int64)
+            try:
+                # C-level parse of the whole list; any malformed id falls back
+                parsed = np.loadtxt(root_ids, delimiter=':', dtype=np.int64, comments=None, ndmin=2)
+                if parsed.shape[1] != 3:
+                    raise ValueError
+            except ValueError:
+                parsed = np.array([self._split_root_id(root_id) for root_id in root_ids], dtype=np.int64)
+            surahs, ayahs, positions = parsed.T
+            surah_start = np.frombuffer(self.surah_start, dtype=np.uint32).astype(np.int64)
+            surah_size = np.frombuffer(self.surah_size, dtype=np.uint32).astype(np.int64)
+            first_word = np.frombuffer(self.verse_first_word, dtype=np.uint32).astype(np.int64)
+            last_word = np.frombuffer(self.verse_last_word, dtype=np.uint32).astype(np.int64)
+            
+            # Same checks as root_id_to_global_word_id, on whole arrays
+            valid = (surahs > 0) & (surahs < len(surah_start))
+            surahs = np.where(valid, surahs, 0)
+            valid &= (ayahs >= 1) & (ayahs <= surah_size[surahs])
+            verse_ids = np.where(valid, surah_start[surahs] + ayahs - 1, 0)
+            valid &= (verse_ids > 0) & (verse_ids < len(first_word))
+            verse_ids = np.where(valid, verse_ids, 0)
+            word_ids = first_word[verse_ids] + positions - 1
+            valid &= (first_word[verse_ids] > 0) & (positions >= 1) & (word_ids <= last_word[verse_ids])
+            return np.where(valid, word_ids, 0)
+        
+        return array('I', (self.root_id_to_global_word_id(root_id) or 0 for root_id in root_ids))
+    
     def test_mappings(self):
         """Test the ID mapping system with sample data"""
         print("\n" + "="*60)
@@ -195,12 +307,24 @@ class QuranIDMapper:
         import time
         start = time.time()
         
-        # Repeated calls should be fast due to caching
+        # Lookups are direct array indexing, no caching needed
         for _ in range(1000):
             self.root_id_to_global_word_id("74:51:3")
         
         elapsed = time.time() - start
-        print(f"1000 lookups: {elapsed:.3f} seconds ({elapsed*1000:.1f} ms per call)")
+        print(f"1000 lookups: {elapsed:.3f} seconds ({elapsed:.3f} ms per call)")
+        
+        # Batch conversion of every word id
+        start = time.time()
+        all_words = range(1, len(self.word_verse))
+        root_ids = self.global_word_ids_to_root_ids(all_words)
+        elapsed = time.time() - start
+        print(f"Batch conversion of {len(all_words):,} word ids: {elapsed:.3f} seconds")
+        
+        start = time.time()
+        self.root_ids_to_global_word_ids(root_ids)
+        elapsed = time.time() - start
+        print(f"Batch conversion of {len(root_ids):,} root ids: {elapsed:.3f} seconds")
 
 def main():
     """Main function to test the ID mapper"""
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Quran Index Snapshots
+Saves a fully built QuranUnifiedIndex into one binary file so later
+processes can skip JSON parsing and index building
+"""
+
+import hashlib
+import os
+import pickle
+import struct
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_MAGIC = b'QIDXSNAP'
+# Bump whenever a pickled type changes shape (NgramIndex, MorphologyBitmapIndex,
+# TagFeatures, ...) so older snapshots are rebuilt instead of misread.
+# 2: n-gram search index, morphology bitmap index
+SNAPSHOT_VERSION = 2
+SNAPSHOT_FILE = 'quran_index.snapshot'
+
+# Header: magic, format version, length of the metadata block
+_HEADER = struct.Struct('<8sII')
+
+
+def file_fingerprint(path: str) -> Optional[Tuple[int, int, str]]:
+    """Return (size, mtime_ns, sha1) for a file, or None if it is missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+
+    return st.st_size, st.st_mtime_ns, sha1.hexdigest()
+
+
+def source_fingerprints(data_dir: str, source_files: List[str]) -> Dict[str, Optional[Tuple[int, int, str]]]:
+    """Fingerprint every source file the index is built from"""
+    return {name: file_fingerprint(os.path.join(data_dir, name)) for name in source_files}
+
+
+def _check_source(data_dir: str, name: str,
+                  saved: Optional[Tuple[int, int, str]]) -> Tuple[bool, Optional[Tuple[int, int, str]]]:
+    """Compare one source file with its saved fingerprint: (matches, current fingerprint)"""
+    path = os.path.join(data_dir, name)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return saved is None, None
+
+    if saved is not None and st.st_size == saved[0] and st.st_mtime_ns == saved[1]:
+        # Unchanged mtime means unchanged file; only hash when it was touched
+        return True, saved
+
+    current = file_fingerprint(path)
+    return saved is not None and current is not None and current[2] == saved[2], current
+
+
+def check_sources(data_dir: str, sources: Dict[str, Optional[Tuple[int, int, str]]]
+                  ) -> Tuple[List[str], Dict[str, Optional[Tuple[int, int, str]]]]:
+    """
+    Names of source files that no longer match their saved fingerprints,
+    and the current fingerprints of all of them (each file hashed at most once)
+    """
+    changed, current = [], {}
+    for name, saved in sources.items():
+        matches, current[name] = _check_source(data_dir, name, saved)
+        if not matches:
+            changed.append(name)
+    return changed, current
+
+
+def save_snapshot(index, path: str, fields: List[str], source_files: List[str],
+                  sources: Optional[Dict] = None) -> Dict:
+    """
+    Write the given index attributes to a versioned snapshot file.
+    sources are fingerprints already taken for source_files (they are
+    hashed again otherwise). Returns the source fingerprints stored with it.
+    """
+    if sources is None or set(sources) != set(source_files):
+        sources = source_fingerprints(index.data_dir, source_files)
+    meta = {
+        'class': type(index).__name__,
+        'fields': list(fields),
+        'sources': sources,
+    }
+    meta_bytes = pickle.dumps(meta, protocol=pickle.HIGHEST_PROTOCOL)
+    payload = {name: getattr(index, name) for name in fields}
+
+    # Write to a temp file first so readers never see a partial snapshot
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return meta['sources']
+
+
+def read_snapshot_meta(path: str) -> Optional[Dict]:
+    """Read only the snapshot metadata, or None if the file is unusable"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+
+            magic, version, meta_len = _HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                return None
+
+            return pickle.loads(f.read(meta_len))
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def snapshot_status(index, path: str, fields: List[str]) -> Optional[Tuple[List[str], Dict]]:
+    """
+    (source files changed since the snapshot was saved, their current
+    fingerprints), or None if the snapshot is missing or was written for
+    another class or field list
+    """
+    meta = read_snapshot_meta(path)
+    if not meta:
+        return None
+
+    if meta.get('class') != type(index).__name__ or meta.get('fields') != list(fields):
+        return None
+
+    return check_sources(index.data_dir, meta.get('sources', {}))
+
+
+def load_snapshot(index, path: str, fields: List[str], allow_stale: bool = False,
+                  status: Optional[Tuple[List[str], Dict]] = None) -> bool:
+    """
+    Restore index attributes from a snapshot.
+    Returns False (leaving the index untouched) if the snapshot is
+    missing, from another format version, or stale. With allow_stale,
+    a snapshot whose source files changed is still restored so the
+    caller can rebuild only the affected parts. status is a result of
+    snapshot_status() for the same file, to avoid checking the sources
+    twice.
+    """
+    if status is None:
+        status = snapshot_status(index, path, fields)
+    if status is None or (status[0] and not allow_stale):
+        return False
+
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            magic, version, meta_len = _HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                return False
+            f.seek(meta_len, os.SEEK_CUR)
+            payload = pickle.load(f)
+    except (OSError, struct.error, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return False
+
+    for name in fields:
+        if name in payload:
+            setattr(index, name, payload[name])
+
+    return True
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Quran Morphology Bitmap Index
+One bitset per morphology feature, POS, lemma and root over subtoken ids,
+so grammatical queries are answered by bitwise AND/OR/NOT
+
+Query syntax: keys joined by AND, OR, NOT and parentheses, e.g.
+    ROOT=رحم AND PASS AND GEN
+    (IMPV OR IMPF) AND NOT ROOT=قول
+Keys are raw tag parts (IMPV, GEN, ACT_PCPL, ...), POS=, LEMMA=, ROOT=, and
+PERSON=/GENDER=/NUMBER= split out of combined parts like 3FD
+"""
+
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+# Combined person/gender/number tag parts such as 3MS, FD, MP
+_PGN = re.compile(r'^([123])?([MF])?([SDP])$')
+
+_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+
+Bits = int
+
+
+def subtoken_keys(subtoken: Dict) -> Iterator[str]:
+    """Index keys for one morphology subtoken"""
+    morph = subtoken.get('morphology') or ''
+    for part in morph.split('|'):
+        if not part:
+            continue
+        yield part
+        match = _PGN.match(part)
+        if match:
+            person, gender, number = match.groups()
+            if person:
+                yield 'PERSON=' + person
+            if gender:
+                yield 'GENDER=' + gender
+            yield 'NUMBER=' + number
+    for field, prefix in (('pos', 'POS='), ('lemma', 'LEMMA='), ('root', 'ROOT=')):
+        value = subtoken.get(field)
+        if value:
+            yield prefix + value
+
+
+def _ids_to_bits(ids: Iterable[int], n: int) -> Bits:
+    packed = bytearray((n + 7) // 8)
+    for i in ids:
+        packed[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(packed, 'little')
+
+
+def iter_bits(bits: Bits) -> Iterator[int]:
+    """Set bit positions in ascending order"""
+    packed = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(packed):
+        while byte:
+            low = byte & -byte
+            yield (byte_index << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+class MorphologyBitmapIndex:
+    """Bitmap index over all morphology subtokens"""
+
+    def __init__(self):
+        self.n = 0                      # number of subtokens
+        self.word_ids = array('I')      # subtoken id → word_id
+        self.subtoken_keys = []         # subtoken id → key within the word
+        self.bitmaps = {}               # frequent key → int bitset
+        self.postings = {}              # rare key → sorted array of subtoken ids
+
+    @classmethod
+    def build(cls, morphology: Dict[int, Dict]) -> 'MorphologyBitmapIndex':
+        """Build from a word_id → morphology entry mapping"""
+        index = cls()
+        postings = {}
+        for word_id, morph_data in morphology.items():
+            for key, subtoken in (morph_data.get('words') or {}).items():
+                sub_id = index.n
+                index.n += 1
+                index.word_ids.append(word_id)
+                index.subtoken_keys.append(key)
+                for index_key in set(subtoken_keys(subtoken)):
+                    posting = postings.get(index_key)
+                    if posting is None:
+                        posting = postings[index_key] = array('I')
+                    posting.append(sub_id)
+
+        # Keys covering more than 1/32 of subtokens are smaller as bitsets
+        # than as 4-byte id lists; the rest stay as sorted id arrays
+        dense = index.n // 32
+        for index_key, posting in postings.items():
+            if len(posting) > dense:
+                index.bitmaps[index_key] = _ids_to_bits(posting, index.n)
+            else:
+                index.postings[index_key] = posting
+        return index
+
+    def keys(self, prefix: str = '') -> List[str]:
+        """Indexed keys, optionally only those starting with prefix"""
+        return sorted(k for k in (*self.bitmaps, *self.postings) if k.startswith(prefix))
+
+    def bitmap(self, key: str) -> Bits:
+        bits = self.bitmaps.get(key)
+        if bits is not None:
+            return bits
+        posting = self.postings.get(key)
+        return _ids_to_bits(posting, self.n) if posting else 0
+
+    # ----- queries -----
+
+    def query(self, expr: Union[str, Bits]) -> Bits:
+        """Evaluate a query expression to a subtoken bitset"""
+        if isinstance(expr, int):
+            return expr
+        tokens = _TOKEN.findall(expr)
+        if not tokens:
+            raise ValueError("Empty morphology query")
+        bits, pos = self._parse_or(tokens, 0)
+        if pos != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[pos]}' in morphology query")
+        return bits
+
+    def _parse_or(self, tokens: List[str], pos: int) -> Tuple[Bits, int]:
+        bits, pos = self._parse_and(tokens, pos)
+        while pos < len(tokens) and tokens[pos].upper() == 'OR':
+            right, pos = self._parse_and(tokens, pos + 1)
+            bits |= right
+        return bits, pos
+
+    def _parse_and(self, tokens: List[str], pos: int) -> Tuple[Bits, int]:
+        bits, pos = self._parse_not(tokens, pos)
+        while pos < len(tokens) and tokens[pos].upper() not in ('OR', ')'):
+            # Adjacent terms without an operator are ANDed
+            if tokens[pos].upper() == 'AND':
+                pos += 1
+            right, pos = self._parse_not(tokens, pos)
+            bits &= right
+        return bits, pos
+
+    def _parse_not(self, tokens: List[str], pos: int) -> Tuple[Bits, int]:
+        if pos >= len(tokens):
+            raise ValueError("Incomplete morphology query")
+        token = tokens[pos]
+        if token.upper() == 'NOT':
+            bits, pos = self._parse_not(tokens, pos + 1)
+            return ((1 << self.n) - 1) & ~bits, pos
+        if token == '(':
+            bits, pos = self._parse_or(tokens, pos + 1)
+            if pos >= len(tokens) or tokens[pos] != ')':
+                raise ValueError("Missing ')' in morphology query")
+            return bits, pos + 1
+        if token == ')' or token.upper() in ('AND', 'OR'):
+            raise ValueError(f"Unexpected '{token}' in morphology query")
+        return self.bitmap(token), pos + 1
+
+    def count(self, expr: Union[str, Bits]) -> int:
+        """Number of matching subtokens"""
+        return self.query(expr).bit_count()
+
+    def subtokens(self, expr: Union[str, Bits]) -> List[Tuple[int, str]]:
+        """(word_id, subtoken key) pairs of matching subtokens, in corpus order"""
+        return [(self.word_ids[i], self.subtoken_keys[i]) for i in iter_bits(self.query(expr))]
+
+    def word_ids_for(self, expr: Union[str, Bits]) -> List[int]:
+        """Sorted ids of words with at least one matching subtoken"""
+        return sorted({self.word_ids[i] for i in iter_bits(self.query(expr))})
+
+    # ----- incremental updates -----
+
+    def update(self, old_morphology: Dict[int, Dict], new_morphology: Dict[int, Dict],
+               word_ids: Iterable[int]) -> bool:
+        """
+        Patch the index for words whose morphology entries changed. Returns
+        False, leaving the index untouched, if a word gained or lost
+        subtokens or is not indexed; the index must then be rebuilt.
+        """
+        patches = []
+        for word_id in word_ids:
+            old = (old_morphology.get(word_id) or {}).get('words') or {}
+            new = (new_morphology.get(word_id) or {}).get('words') or {}
+            if list(old) != list(new):
+                return False
+            if not new:
+                continue
+
+            first = bisect_left(self.word_ids, word_id)
+            if (first >= self.n or self.word_ids[first] != word_id or
+                    (first and self.word_ids[first - 1] == word_id)):
+                return False
+
+            for sub_id, key in enumerate(new, first):
+                if sub_id >= self.n or self.subtoken_keys[sub_id] != key:
+                    return False
+                old_keys = set(subtoken_keys(old[key]))
+                new_keys = set(subtoken_keys(new[key]))
+                patches.append((sub_id, old_keys - new_keys, new_keys - old_keys))
+
+        for sub_id, removed, added in patches:
+            for key in removed:
+                self._discard(key, sub_id)
+            for key in added:
+                self._add(key, sub_id)
+        return True
+
+    def _add(self, key: str, sub_id: int):
+        if key in self.bitmaps:
+            self.bitmaps[key] |= 1 << sub_id
+            return
+        posting = self.postings.get(key)
+        if posting is None:
+            self.postings[key] = array('I', [sub_id])
+            return
+        i = bisect_left(posting, sub_id)
+        if i == len(posting) or posting[i] != sub_id:
+            posting.insert(i, sub_id)
+
+    def _discard(self, key: str, sub_id: int):
+        if key in self.bitmaps:
+            self.bitmaps[key] &= ~(1 << sub_id)
+            return
+        posting = self.postings.get(key)
+        if posting is None:
+            return
+        i = bisect_left(posting, sub_id)
+        if i < len(posting) and posting[i] == sub_id:
+            del posting[i]
+            if not posting:
+                del self.postings[key]
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Quran N-gram Search Index
+Inverted character n-gram index over the unique word forms, used for
+exact and substring word search without scanning every word
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Gram sizes that get posting lists; shorter queries scan the unique forms
+GRAM_SIZES = (2, 3)
+
+
+def _grams(text: str, size: int) -> Iterable[str]:
+    return (text[i:i + size] for i in range(len(text) - size + 1))
+
+
+class NgramIndex:
+    """Maps word forms and their character n-grams to word ids"""
+
+    def __init__(self):
+        self.forms = []          # form_id → form text
+        self.form_ids = {}       # form text → form_id
+        self.form_words = []     # form_id → array of word_ids
+        self.postings = {}       # n-gram → sorted array of form_ids
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[int, str]]) -> 'NgramIndex':
+        """Build from (word_id, text) pairs, in ascending word_id order"""
+        index = cls()
+        for word_id, text in items:
+            form_id = index.form_ids.get(text)
+            if form_id is None:
+                form_id = index._add_form(text, ())
+            index.form_words[form_id].append(word_id)
+        return index
+
+    @classmethod
+    def from_words(cls, words: Dict[str, str]) -> 'NgramIndex':
+        """Build from a word_id (str) → text mapping like quran_words.json"""
+        items = []
+        for word_id_str, text in words.items():
+            try:
+                items.append((int(word_id_str), text))
+            except ValueError:
+                continue
+        items.sort()
+        return cls.build(items)
+
+    @classmethod
+    def from_forms(cls, form_words: Dict[str, List[int]]) -> 'NgramIndex':
+        """Build from a precomputed form → sorted word_ids mapping"""
+        index = cls()
+        for text, word_ids in form_words.items():
+            index._add_form(text, word_ids)
+        return index
+
+    def _add_form(self, text: str, word_ids: Iterable[int]) -> int:
+        """Register a new form and add it to the posting lists of its n-grams"""
+        form_id = len(self.forms)
+        self.form_ids[text] = form_id
+        self.forms.append(text)
+        self.form_words.append(array('I', word_ids))
+        for size in GRAM_SIZES:
+            for gram in set(_grams(text, size)):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array('I')
+                posting.append(form_id)
+        return form_id
+
+    def _candidate_forms(self, query: str) -> Iterable[int]:
+        """Form ids that may contain the query, by posting-list intersection"""
+        size = max((s for s in GRAM_SIZES if s <= len(query)), default=None)
+        if size is None:
+            return range(len(self.forms))
+
+        posting_lists = []
+        for gram in set(_grams(query, size)):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return ()
+            posting_lists.append(posting)
+
+        posting_lists.sort(key=len)
+        candidates = set(posting_lists[0])
+        for posting in posting_lists[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return candidates
+
+    def matching_forms(self, query: str, exact: bool = False) -> List[int]:
+        """Form ids equal to (exact) or containing the query"""
+        if exact:
+            form_id = self.form_ids.get(query)
+            return [] if form_id is None else [form_id]
+
+        forms = self.forms
+        # n-grams only filter; confirm each candidate with a substring test
+        return sorted(f for f in self._candidate_forms(query) if query in forms[f])
+
+    def search(self, query: str, exact: bool = False) -> List[int]:
+        """Sorted word ids whose text equals or contains the query"""
+        form_ids = self.matching_forms(query, exact)
+        if len(form_ids) == 1:
+            return list(self.form_words[form_ids[0]])
+
+        word_ids = []
+        for form_id in form_ids:
+            word_ids.extend(self.form_words[form_id])
+        word_ids.sort()
+        return word_ids
+
+    def count(self, query: str, exact: bool = False) -> int:
+        """Number of matching words, without materializing the id list"""
+        return sum(len(self.form_words[f]) for f in self.matching_forms(query, exact))
+
+    def words_for_form(self, form: str) -> Optional[array]:
+        form_id = self.form_ids.get(form)
+        return None if form_id is None else self.form_words[form_id]
@@ -1,91 +1,280 @@
+"""
+Quran Pagination
+Splits the ayah sequence into pages. pagination_map.json is the original
+greedy layout (fill each page up to the word limit); page numbers in URLs
+and bookmarks refer to it, so it stays the default and is reproduced
+byte for byte. The other layouts use dynamic programming: each minimizes
+the total squared deviation of page word counts from its target, subject
+to pluggable constraints (surah starts a page, short surahs stay whole,
+...). Layouts paginating the same word counts are solved together in one
+pass over shared prefix sums.
+"""
+
 import json
-from collections import OrderedDict
+import os
+from abc import ABC, abstractmethod
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
 
 TARGET_PAGES = 360
-TOTAL_WORDS = 77430
-TARGET_WORDS_PER_PAGE = TOTAL_WORDS // TARGET_PAGES  # ≈215
-MAX_WORDS_PER_PAGE = TARGET_WORDS_PER_PAGE + 15      # tolerance
+TOLERANCE = 15          # words a page may exceed its target by
+
+# Layouts marked web=True are also written here for the static pages
+WEB_JSON_DIR = "../json"
+
 
 # -------------------------
-# Load JSON files
+# Constraints
 # -------------------------
-with open("sura.json", "r", encoding="utf-8") as f:
-    sura_data = json.load(f)
+# A constraint marks ayah indices where a page must start (required) or
+# must not start (forbidden); max_words is the layout's page size limit.
+
+class Constraint(ABC):
+    @abstractmethod
+    def apply(self, ayahs: List[Dict], required: bytearray, forbidden: bytearray, max_words: int):
+        """Mark page starts in required/forbidden (indexed like ayahs)"""
+
+
+class SurahStartsPage(Constraint):
+    """Every surah begins on a new page"""
+
+    def apply(self, ayahs, required, forbidden, max_words):
+        for k, ayah in enumerate(ayahs):
+            if ayah["ayah"] == 1:
+                required[k] = 1
+
+
+class KeepShortSurahs(Constraint):
+    """Never split a surah that fits on one page (or within max_words)"""
+
+    def __init__(self, max_words: Optional[int] = None):
+        self.max_words = max_words
+
+    def apply(self, ayahs, required, forbidden, max_words):
+        limit = self.max_words or max_words
+        for start, end in surah_spans(ayahs):
+            if sum(a["words"] for a in ayahs[start:end]) <= limit:
+                for k in range(start + 1, end):
+                    forbidden[k] = 1
+
+
+def surah_spans(ayahs: List[Dict]) -> List[Tuple[int, int]]:
+    """(first index, end index) of each surah in the ayah list"""
+    spans = []
+    start = 0
+    for k in range(1, len(ayahs) + 1):
+        if k == len(ayahs) or ayahs[k]["surah"] != ayahs[start]["surah"]:
+            spans.append((start, k))
+            start = k
+    return spans
 
-with open("verses.json", "r", encoding="utf-8") as f:
-    verse_data = json.load(f)
 
 # -------------------------
-# Build ordered ayah list
+# Layouts
 # -------------------------
-# Each entry:
-# {
-#   surah, ayah, start_word, end_word, word_count
-# }
-
-ayahs = []
-
-for surah_id in sorted(sura_data.keys(), key=lambda x: int(x)):
-    surah = sura_data[surah_id]
-    start = surah["start"]
-    end = surah["end"]
-
-    for global_ayah_id in range(start, end + 1):
-        ayah = verse_data[str(global_ayah_id)]
-        word_count = ayah["end_word"] - ayah["start_word"] + 1
-
-        ayahs.append({
-            "surah": int(surah_id),
-            "ayah": global_ayah_id - start + 1,
-            "global_ayah": global_ayah_id,
-            "words": word_count
-        })
+
+class Layout:
+    """
+    One pagination to produce: page count target, constraints, output file.
+    greedy layouts fill pages in order and ignore constraints.
+    """
+
+    def __init__(self, output_file: str, target_pages: int = TARGET_PAGES,
+                 tolerance: int = TOLERANCE, constraints: Sequence[Constraint] = (),
+                 verses_file: str = "verses.json", greedy: bool = False, web: bool = False):
+        self.output_file = output_file
+        self.target_pages = target_pages
+        self.tolerance = tolerance
+        self.constraints = list(constraints)
+        self.verses_file = verses_file      # word counts to paginate
+        self.greedy = greedy
+        self.web = web                      # also write to WEB_JSON_DIR
+
+
+# e.g. Layout("pagination_map_mushaf.json", 604, constraints=[SurahStartsPage()])
+LAYOUTS = [
+    # Default page numbering; changing it would move every page URL
+    Layout("pagination_map.json", greedy=True, web=True),
+    Layout("pagination_map_balanced.json"),
+    Layout("pagination_map_whole_surahs.json", constraints=[KeepShortSurahs()]),
+]
+
+
+# -------------------------
+# Load JSON files
+# -------------------------
+
+def load_ayahs(sura_data: Dict, verse_data: Dict) -> List[Dict]:
+    """Ordered ayah list: surah, ayah, global_ayah, words"""
+    ayahs = []
+    for surah_id in sorted(sura_data.keys(), key=lambda x: int(x)):
+        surah = sura_data[surah_id]
+        start = surah["start"]
+        end = surah["end"]
+
+        for global_ayah_id in range(start, end + 1):
+            ayah = verse_data[str(global_ayah_id)]
+            ayahs.append({
+                "surah": int(surah_id),
+                "ayah": global_ayah_id - start + 1,
+                "global_ayah": global_ayah_id,
+                "words": ayah["end_word"] - ayah["start_word"] + 1
+            })
+    return ayahs
+
 
 # -------------------------
 # Pagination logic
 # -------------------------
-pages = OrderedDict()
-
-page_num = 1
-page_words = 0
-page_start = ayahs[0]
-
-for ayah in ayahs:
-    if page_words + ayah["words"] <= MAX_WORDS_PER_PAGE:
-        page_words += ayah["words"]
-    else:
-        pages[page_num] = {
-            "start": page_start,
-            "end": prev_ayah,
-            "words": page_words
-        }
-        page_num += 1
-        page_start = ayah
-        page_words = ayah["words"]
-
-    prev_ayah = ayah
-
-# last page
-pages[page_num] = {
-    "start": page_start,
-    "end": prev_ayah,
-    "words": page_words
-}
+
+class _Plan:
+    """DP state of one layout"""
+
+    def __init__(self, layout: Layout, ayahs: List[Dict], total_words: int):
+        n = len(ayahs)
+        self.layout = layout
+        self.target = total_words / layout.target_pages
+        self.max_words = max_page_words(layout, total_words)
+
+        self.required = bytearray(n + 1)
+        self.forbidden = bytearray(n + 1)
+        for constraint in layout.constraints:
+            constraint.apply(ayahs, self.required, self.forbidden, self.max_words)
+        self.required[0] = self.required[n] = 1
+        self.forbidden[0] = self.forbidden[n] = 0
+
+        # floor[j]: latest required page start before j; a page ending at
+        # j can't start earlier without crossing it
+        self.floor = [0] * (n + 1)
+        last = 0
+        for j in range(1, n + 1):
+            self.floor[j] = last
+            if self.required[j]:
+                last = j
+
+        self.best = [float("inf")] * (n + 1)   # min cost of pages covering ayahs[:j]
+        self.best[0] = 0.0
+        self.prev = [0] * (n + 1)
+
+
+def max_page_words(layout: Layout, total_words: int) -> int:
+    return int(total_words / layout.target_pages) + layout.tolerance
+
+
+def paginate_greedy(ayahs: List[Dict], max_words: int) -> List[Tuple[int, int]]:
+    """Fill each page with ayat until the next one would pass max_words"""
+    pages = []
+    start = words = 0
+    for k, ayah in enumerate(ayahs):
+        if k > start and words + ayah["words"] > max_words:
+            pages.append((start, k))
+            start, words = k, 0
+        words += ayah["words"]
+    pages.append((start, len(ayahs)))
+    return pages
+
+
+def paginate(ayahs: List[Dict], layouts: Sequence[Layout]) -> List[List[Tuple[int, int]]]:
+    """
+    Solve every layout over the same ayahs in one pass. Returns, per layout,
+    the pages as (first index, end index) pairs. A page never exceeds
+    the layout's max words unless it is a single ayah.
+    """
+    n = len(ayahs)
+    prefix = list(accumulate((a["words"] for a in ayahs), initial=0))
+    plans = [_Plan(layout, ayahs, prefix[n]) for layout in layouts]
+    window = max(plan.max_words for plan in plans)
+
+    for j in range(1, n + 1):
+        active = [plan for plan in plans if not plan.forbidden[j]]
+        if not active:
+            continue
+        lowest = min(plan.floor[j] for plan in active)
+
+        i = j - 1
+        while i >= lowest:
+            words = prefix[j] - prefix[i]
+            if words > window and i < j - 1:
+                break
+            for plan in active:
+                if i < plan.floor[j] or plan.forbidden[i]:
+                    continue
+                if words > plan.max_words and i < j - 1:
+                    continue
+                deviation = words - plan.target
+                cost = plan.best[i] + deviation * deviation
+                if cost < plan.best[j]:
+                    plan.best[j] = cost
+                    plan.prev[j] = i
+            i -= 1
+
+    results = []
+    for plan in plans:
+        if plan.best[n] == float("inf"):
+            raise ValueError(f"{plan.layout.output_file}: constraints allow no pagination "
+                             f"within {plan.max_words} words per page")
+        pages = []
+        j = n
+        while j > 0:
+            pages.append((plan.prev[j], j))
+            j = plan.prev[j]
+        pages.reverse()
+        results.append(pages)
+    return results
+
 
 # -------------------------
 # Output pagination map
 # -------------------------
-output = []
 
-for page, data in pages.items():
-    output.append({
-        "page": page,
-        "from": f'{data["start"]["surah"]}:{data["start"]["ayah"]}',
-        "to": f'{data["end"]["surah"]}:{data["end"]["ayah"]}',
-        "word_count": data["words"]
-    })
+def pagination_map(ayahs: List[Dict], pages: List[Tuple[int, int]]) -> List[Dict]:
+    output = []
+    for page, (start, end) in enumerate(pages, 1):
+        first, last = ayahs[start], ayahs[end - 1]
+        output.append({
+            "page": page,
+            "from": f'{first["surah"]}:{first["ayah"]}',
+            "to": f'{last["surah"]}:{last["ayah"]}',
+            "word_count": sum(a["words"] for a in ayahs[start:end])
+        })
+    return output
+
+
+def main(layouts: Sequence[Layout] = LAYOUTS):
+    with open("sura.json", "r", encoding="utf-8") as f:
+        sura_data = json.load(f)
+
+    # One pass per word-count source; layouts on the same source share it
+    by_source: Dict[str, List[Layout]] = {}
+    for layout in layouts:
+        by_source.setdefault(layout.verses_file, []).append(layout)
+
+    for verses_file, group in by_source.items():
+        with open(verses_file, "r", encoding="utf-8") as f:
+            verse_data = json.load(f)
+        ayahs = load_ayahs(sura_data, verse_data)
+
+        total_words = sum(a["words"] for a in ayahs)
+        solved = [layout for layout in group if not layout.greedy]
+        results = dict(zip(map(id, solved), paginate(ayahs, solved) if solved else []))
+
+        for layout in group:
+            if layout.greedy:
+                pages = paginate_greedy(ayahs, max_page_words(layout, total_words))
+            else:
+                pages = results[id(layout)]
+            output = pagination_map(ayahs, pages)
+            paths = [layout.output_file]
+            if layout.web:
+                paths.append(os.path.join(WEB_JSON_DIR, layout.output_file))
+            for path in paths:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(output, f, ensure_ascii=False, indent=2)
+
+            counts = [p["word_count"] for p in output]
+            print(f"{layout.output_file}: {len(output)} pages, "
+                  f"{min(counts)}-{max(counts)} words per page")
 
-with open("pagination_map.json", "w", encoding="utf-8") as f:
-    json.dump(output, f, ensure_ascii=False, indent=2)
 
-print(f"Pagination complete: {len(pages)} pages created.")
+if __name__ == "__main__":
+    main()
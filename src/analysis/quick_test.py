@@ -19,7 +19,7 @@ def quick_test():
     try:
         # Try to load data
         index = QuranUnifiedIndex(".")
-        index.load_all_data()
+        index.load_with_snapshot()
         
         # Test a few things
         print("\nQuick tests:")
@@ -7,6 +7,8 @@ import re
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 
+from arabic_normalizer import normalize_arabic
+
 class QuranQAFixed:
     """Fixed Quran Question Answering Engine"""
     
@@ -113,11 +115,12 @@ class QuranQAFixed:
         verses_found = []
         seen_ids = set()
         
-        # Search for the concept
-        search_results = self.index.search_by_arabic(arabic_concept)
+        # Search for the concept (ids only; verse lookup needs no word info),
+        # ignoring diacritics and spelling variants such as الصلاة / الصلوة
+        word_ids = self.index.search_word_ids(arabic_concept, normalized=True)
         
-        for word_info in search_results:
-            verse_id = word_info.get('verse_id')
+        for word_id in word_ids:
+            verse_id = self.index.word_to_verse.get(word_id)
             if not verse_id or verse_id in seen_ids:
                 continue
             
@@ -144,15 +147,15 @@ class QuranQAFixed:
         verse_data = self.index.verses.get(verse_id, {})
         verse_text = verse_data.get('arabic', '')
         
-        # Find position of search term
-        pos = verse_text.find(search_term)
-        if pos == -1:
+        # Compare normalized forms so spelling variants still match
+        normalized_term = normalize_arabic(search_term)
+        if normalized_term not in normalize_arabic(verse_text):
             return ""
         
         # Get context (words before and after)
         words = verse_text.split()
         for i, word in enumerate(words):
-            if search_term in word:
+            if normalized_term in normalize_arabic(word):
                 start = max(0, i - 2)
                 end = min(len(words), i + 3)
                 context_words = words[start:end]
@@ -372,7 +375,7 @@ def main():
         # Load data
         print("Loading Quran data...")
         index = QuranUnifiedIndex(".")
-        index.load_all_data()
+        index.load_with_snapshot()
         
         # Initialize parser
         print("Initializing syntax parser...")
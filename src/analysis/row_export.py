@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Streaming Row Export
+Writes rows from a generator to CSV, JSONL or Parquet with bounded memory
+"""
+
+import csv
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def infer_format(output_file: str) -> str:
+    """Output format from the file extension (defaults to csv)"""
+    ext = os.path.splitext(output_file)[1].lower().lstrip('.')
+    if ext == 'json':
+        ext = 'jsonl'
+    return ext if ext in FORMATS else 'csv'
+
+
+def write_rows(rows: Iterable[Dict], output_file: str, fieldnames: Sequence[str],
+               output_format: Optional[str] = None, int_fields: Sequence[str] = (),
+               chunk_size: int = 4096) -> int:
+    """
+    Write dict rows to output_file, consuming the iterable once. Only
+    fieldnames are written; int_fields are typed as integers in Parquet.
+    Returns the number of rows written.
+    """
+    output_format = output_format or infer_format(output_file)
+    if output_format not in FORMATS:
+        raise ValueError(f"output_format must be one of {', '.join(FORMATS)}")
+
+    count = 0
+    if output_format == 'csv':
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for row in rows:
+                writer.writerow({k: '' if row.get(k) is None else row[k] for k in fieldnames})
+                count += 1
+
+    elif output_format == 'jsonl':
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps({k: row.get(k) for k in fieldnames}, ensure_ascii=False))
+                f.write('\n')
+                count += 1
+
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Fixed schema so chunks with all-null columns still line up
+        schema = pa.schema([
+            (k, pa.int64() if k in int_fields else pa.string()) for k in fieldnames
+        ])
+        rows = iter(rows)
+        with pq.ParquetWriter(output_file, schema) as writer:
+            while True:
+                chunk: List[Dict] = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                columns = {
+                    k: [row.get(k) if k in int_fields or row.get(k) is None else str(row[k])
+                        for row in chunk]
+                    for k in fieldnames
+                }
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                count += len(chunk)
+
+    return count
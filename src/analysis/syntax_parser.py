@@ -5,8 +5,14 @@ Analyzes morphology data to understand grammatical structure
 """
 
 import json
+import multiprocessing
+import os
 import re
-from typing import Dict, List, Optional, Tuple, Any
+import time
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 from enum import Enum
 
 class SyntaxRole(Enum):
@@ -43,11 +49,79 @@ class Gender(Enum):
     FEMININE = "feminine"        # مؤنث
     UNKNOWN = "unknown"
 
+class TagFeatures(Mapping):
+    """
+    Immutable grammatical features of one morphology tag. A read-only
+    mapping of feature name → value, so it can be used wherever the
+    features dict parse_morphology_tag used to return is expected.
+    """
+    
+    __slots__ = (
+        'raw', 'parts', 'case', 'number', 'gender',
+        'is_adjective', 'is_particle', 'is_verb', 'is_noun', 'is_preposition',
+        'is_determiner', 'is_proper_noun', 'is_participle',
+    )
+    
+    def __init__(self, **features):
+        for name in self.__slots__:
+            object.__setattr__(self, name, features[name])
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("TagFeatures is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("TagFeatures is immutable")
+    
+    def __reduce__(self):
+        # Slots are restored through setattr by default, which is blocked
+        return (_tag_features_from_dict, (self.to_dict(),))
+    
+    # Mapping interface
+    def get(self, name: str, default: Any = None) -> Any:
+        return getattr(self, name, default) if name in self.__slots__ else default
+    
+    def __getitem__(self, name: str) -> Any:
+        if name not in self.__slots__:
+            raise KeyError(name)
+        return getattr(self, name)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self.__slots__
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+    
+    def __len__(self) -> int:
+        return len(self.__slots__)
+    
+    def __hash__(self):
+        return hash(self.raw)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __repr__(self):
+        return f"TagFeatures({self.raw!r})"
+
+
+def _tag_features_from_dict(features: Dict[str, Any]) -> TagFeatures:
+    """Unpickle helper for TagFeatures"""
+    return TagFeatures(**features)
+
+# Stable small-int codes used by the corpus-wide role sequence
+ROLE_ORDER = list(SyntaxRole)
+CASE_ORDER = list(Case)
+NUMBER_ORDER = list(Number)
+GENDER_ORDER = list(Gender)
+ROLE_SEPARATOR = 255
+
 class QuranSyntaxParser:
     """Parses Quranic Arabic syntax from morphology data"""
     
     def __init__(self, unified_index):
         self.index = unified_index
+        self._role_sequence = None  # built on first pattern query
+        self._tag_cache = {}        # raw morphology tag → TagFeatures
         
         # Morphology tag mappings
         self.case_markers = {
@@ -78,16 +152,29 @@ class QuranSyntaxParser:
             'MP': Gender.MASCULINE,
             'FP': Gender.FEMININE,
         }
-    
-    def parse_morphology_tag(self, morph_tag: str) -> Dict[str, Any]:
-        """Parse morphology tag into grammatical features"""
-        if not morph_tag:
-            return {}
         
-        parts = morph_tag.split('|')
+        # The tag vocabulary is small, so compile every distinct tag up front
+        self.precompile_tags()
+    
+    def precompile_tags(self):
+        """Compile the features of every distinct morphology tag in the corpus"""
+        for morph in self.index.morphology.values():
+            for subtoken in morph.get('words', {}).values():
+                self.parse_morphology_tag(subtoken.get('morphology', ''))
+    
+    def parse_morphology_tag(self, morph_tag: str) -> TagFeatures:
+        """Parse morphology tag into grammatical features (cached per tag)"""
+        features = self._tag_cache.get(morph_tag)
+        if features is None:
+            features = self._tag_cache[morph_tag] = self._compile_morphology_tag(morph_tag)
+        return features
+    
+    def _compile_morphology_tag(self, morph_tag: str) -> TagFeatures:
+        """Turn one raw tag into an immutable feature record"""
+        parts = morph_tag.split('|') if morph_tag else []
         features = {
             'raw': morph_tag,
-            'parts': parts,
+            'parts': tuple(parts),
             'case': Case.UNKNOWN,
             'number': Number.UNKNOWN,
             'gender': Gender.UNKNOWN,
@@ -140,7 +227,7 @@ class QuranSyntaxParser:
             elif 'IMPF' in part or 'PERF' in part:
                 features['is_verb'] = True
         
-        return features
+        return TagFeatures(**features)
     
     def infer_syntax_role(self, word_data: Dict, context: List[Dict] = None) -> SyntaxRole:
         """Infer syntax role from morphology and context"""
@@ -156,6 +243,15 @@ class QuranSyntaxParser:
         # Parse morphology tag
         features = self.parse_morphology_tag(morph_tag)
         
+        position = None
+        if context:
+            position = context.index(word_data) if word_data in context else 0
+        
+        return self._role_from_features(morph_tag, features, position)
+    
+    def _role_from_features(self, morph_tag: str, features: Dict,
+                            position: Optional[int] = None) -> SyntaxRole:
+        """Map parsed tag features to a role; position is the word's index in its verse"""
         # Determine syntax role based on features
         if features.get('is_particle'):
             if 'PREF' in morph_tag:
@@ -170,9 +266,8 @@ class QuranSyntaxParser:
             
             if case == Case.NOMINATIVE:
                 # Check if this could be subject or predicate
-                if context:
+                if position is not None:
                     # Simple heuristic: first nominal in sentence is often subject
-                    position = context.index(word_data) if word_data in context else 0
                     if position == 0:
                         return SyntaxRole.SUBJECT
                     else:
@@ -381,35 +476,138 @@ class QuranSyntaxParser:
         
         return "; ".join(summary_parts)
     
-    def find_by_syntax_pattern(self, pattern: Dict) -> List[Dict]:
-        """Find verses matching specific syntax patterns"""
-        results = []
+    # ===== CORPUS-WIDE ROLE SEQUENCE =====
+    
+    def build_role_sequence(self):
+        """
+        Precompute one small-int role code (plus case/number/gender codes)
+        per word for the whole corpus, laid out verse after verse with a
+        separator between verses, so pattern queries are flat scans
+        """
+        role_codes = {role: i for i, role in enumerate(ROLE_ORDER)}
+        case_codes = {case: i for i, case in enumerate(CASE_ORDER)}
+        number_codes = {number: i for i, number in enumerate(NUMBER_ORDER)}
+        gender_codes = {gender: i for i, gender in enumerate(GENDER_ORDER)}
         
-        # Simple pattern matching for now
-        # Example pattern: {'roles': ['preposition', 'noun_genitive']}
+        roles = bytearray()
+        cases = array('B')
+        numbers = array('B')
+        genders = array('B')
+        word_ids = array('I')
+        verse_ids = array('I')
+        verse_starts = array('I')   # position of each verse's first word
         
-        for verse_id in range(1, min(100, self.index.stats['total_verses']) + 1):  # Limit to first 100
-            analysis = self.analyze_verse_syntax(verse_id)
+        for verse_id in sorted(self.index.verse_to_words):
+            verse_ids.append(verse_id)
+            verse_starts.append(len(roles))
+            
+            for position, word_id in enumerate(self.index.verse_to_words[verse_id]):
+                morph = self.index.morphology.get(word_id)
+                role = SyntaxRole.UNKNOWN
+                features = {}
+                if morph and morph.get('words'):
+                    first_subtoken = next(iter(morph['words'].values()))
+                    morph_tag = first_subtoken.get('morphology', '')
+                    features = self.parse_morphology_tag(morph_tag)
+                    role = self._role_from_features(morph_tag, features, position)
+                
+                roles.append(role_codes[role])
+                cases.append(case_codes[features.get('case', Case.UNKNOWN)])
+                numbers.append(number_codes[features.get('number', Number.UNKNOWN)])
+                genders.append(gender_codes[features.get('gender', Gender.UNKNOWN)])
+                word_ids.append(word_id)
             
-            if 'error' in analysis:
+            # Separator so no match can span two verses
+            roles.append(ROLE_SEPARATOR)
+            cases.append(0)
+            numbers.append(0)
+            genders.append(0)
+            word_ids.append(0)
+        
+        self._role_sequence = {
+            'roles': bytes(roles),
+            'case': cases,
+            'number': numbers,
+            'gender': genders,
+            'word_ids': word_ids,
+            'verse_ids': verse_ids,
+            'verse_starts': verse_starts,
+        }
+        return self._role_sequence
+    
+    def _match_features(self, seq: Dict, pos: int, constraints: List[Optional[Dict]]) -> bool:
+        """Check per-position case/number/gender constraints of a pattern"""
+        for offset, constraint in enumerate(constraints):
+            if not constraint:
                 continue
+            for feature, order in (('case', CASE_ORDER), ('number', NUMBER_ORDER), ('gender', GENDER_ORDER)):
+                wanted = constraint.get(feature)
+                if wanted is not None and order[seq[feature][pos + offset]].value != wanted:
+                    return False
+        return True
+    
+    def find_pattern_positions(self, pattern: Dict, limit: Optional[int] = None,
+                               first_per_verse: bool = True) -> List[Dict]:
+        """
+        Find role subsequences across the whole corpus without analyzing verses.
+        pattern = {'roles': [...], 'features': [{'case': 'genitive'}, None, ...]}
+        Returns verse_id, matched_position (word index in verse) and word_ids.
+        """
+        seq = self._role_sequence or self.build_role_sequence()
+        role_codes = {role.value: i for i, role in enumerate(ROLE_ORDER)}
+        
+        try:
+            needle = bytes(role_codes[role] for role in pattern.get('roles', []))
+        except KeyError:
+            return []
+        if not needle:
+            return []
+        
+        constraints = pattern.get('features') or []
+        haystack = seq['roles']
+        verse_starts = seq['verse_starts']
+        matches = []
+        last_verse = None
+        
+        pos = haystack.find(needle)
+        while pos != -1:
+            verse_index = bisect_right(verse_starts, pos) - 1
+            verse_id = seq['verse_ids'][verse_index]
             
-            roles = [word['syntax_role'] for word in analysis['syntax_analysis']]
+            if (not first_per_verse or verse_id != last_verse) and \
+                    self._match_features(seq, pos, constraints):
+                matches.append({
+                    'verse_id': verse_id,
+                    'matched_position': pos - verse_starts[verse_index],
+                    'word_ids': list(seq['word_ids'][pos:pos + len(needle)]),
+                })
+                last_verse = verse_id
+                if limit is not None and len(matches) >= limit:
+                    break
             
-            # Check if pattern matches
-            if 'roles' in pattern:
-                pattern_roles = pattern['roles']
-                # Simple subsequence matching
-                for i in range(len(roles) - len(pattern_roles) + 1):
-                    if roles[i:i+len(pattern_roles)] == pattern_roles:
-                        results.append({
-                            'verse_id': verse_id,
-                            'verse_text': analysis['verse_text'],
-                            'matched_pattern': pattern,
-                            'matched_position': i,
-                            'analysis': analysis
-                        })
-                        break
+            pos = haystack.find(needle, pos + 1)
+        
+        return matches
+    
+    def find_by_syntax_pattern(self, pattern: Dict, limit: Optional[int] = None,
+                               include_analysis: bool = False) -> List[Dict]:
+        """Find verses matching specific syntax patterns"""
+        # Example pattern: {'roles': ['preposition', 'noun_genitive']}
+        results = []
+        
+        for match in self.find_pattern_positions(pattern, limit=limit):
+            verse_id = match['verse_id']
+            result = {
+                'verse_id': verse_id,
+                'verse_text': self.index.verses.get(verse_id, {}).get('arabic', ''),
+                'matched_pattern': pattern,
+                'matched_position': match['matched_position'],
+                'word_ids': match['word_ids'],
+            }
+            # Full analysis is expensive; only build it when asked for
+            if include_analysis:
+                result['analysis'] = self.analyze_verse_syntax(verse_id)
+            results.append(result)
         
         return results
     
@@ -471,6 +669,121 @@ class QuranSyntaxParser:
             'sample_verses': [{'verse_id': w['verse_id'], 'word': w['arabic']} for w in words[:5]]
         }
 
+# ===== BATCH ANALYSIS =====
+
+# Parser shared with forked workers; set before the pool starts so children
+# inherit the loaded index copy-on-write instead of receiving a pickled copy
+_WORKER_PARSER = None
+
+def _analyze_chunk(verse_ids: List[int]) -> List[Dict]:
+    """Worker entry point: analyze a chunk of verses with the inherited parser"""
+    return [_WORKER_PARSER.analyze_verse_syntax(verse_id) for verse_id in verse_ids]
+
+def iter_verse_analyses(parser: QuranSyntaxParser, verse_ids: Optional[List[int]] = None,
+                        workers: Optional[int] = None, chunk_size: int = 64) -> Iterator[Dict]:
+    """
+    Yield analyze_verse_syntax results for many verses, in verse order.
+    With workers > 1 (and fork available) chunks run in a process pool.
+    """
+    global _WORKER_PARSER
+    
+    if verse_ids is None:
+        verse_ids = sorted(parser.index.verse_to_words)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    use_pool = workers > 1 and 'fork' in multiprocessing.get_all_start_methods()
+    if not use_pool:
+        for verse_id in verse_ids:
+            yield parser.analyze_verse_syntax(verse_id)
+        return
+    
+    chunks = [verse_ids[i:i + chunk_size] for i in range(0, len(verse_ids), chunk_size)]
+    _WORKER_PARSER = parser
+    try:
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            for analyses in pool.imap(_analyze_chunk, chunks):
+                yield from analyses
+    finally:
+        _WORKER_PARSER = None
+
+def _word_rows(analysis: Dict) -> Iterator[Dict]:
+    """Flatten one verse analysis into per-word rows for columnar output"""
+    for position, word in enumerate(analysis.get('syntax_analysis', []), 1):
+        features = word['grammatical_features']
+        yield {
+            'verse_id': analysis['verse_id'],
+            'word_id': word['word_id'],
+            'word_position': position,
+            'arabic': word['arabic'],
+            'syntax_role': word['syntax_role'],
+            'case': features['case'],
+            'number': features['number'],
+            'gender': features['gender'],
+            'roots': '|'.join(word.get('roots') or []),
+            'sentence_type': analysis['sentence_structure']['type'],
+        }
+
+def analyze_all(parser: QuranSyntaxParser, output_file: str,
+                verse_ids: Optional[List[int]] = None, workers: Optional[int] = None,
+                output_format: str = 'jsonl', chunk_size: int = 64) -> Dict:
+    """
+    Run syntax analysis over the whole corpus (or the given verses) and
+    stream it to output_file as JSONL (one verse per line) or Parquet
+    (one row per word; needs pyarrow). Returns throughput statistics.
+    """
+    if output_format not in ('jsonl', 'parquet'):
+        raise ValueError("output_format must be 'jsonl' or 'parquet'")
+    
+    start = time.time()
+    analyses = iter_verse_analyses(parser, verse_ids, workers, chunk_size)
+    verses = 0
+    words = 0
+    
+    if output_format == 'jsonl':
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for analysis in analyses:
+                f.write(json.dumps(analysis, ensure_ascii=False))
+                f.write('\n')
+                verses += 1
+                words += analysis.get('word_count', 0)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        writer = None
+        rows = []
+        try:
+            for analysis in analyses:
+                rows.extend(_word_rows(analysis))
+                verses += 1
+                words += analysis.get('word_count', 0)
+                # Flush a row group every chunk of verses to bound memory
+                if verses % chunk_size == 0:
+                    table = pa.Table.from_pylist(rows)
+                    writer = writer or pq.ParquetWriter(output_file, table.schema)
+                    writer.write_table(table)
+                    rows = []
+            if rows:
+                table = pa.Table.from_pylist(rows)
+                writer = writer or pq.ParquetWriter(output_file, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer:
+                writer.close()
+    
+    elapsed = time.time() - start
+    stats = {
+        'output_file': output_file,
+        'verses': verses,
+        'words': words,
+        'seconds': round(elapsed, 3),
+        'verses_per_second': round(verses / elapsed, 1) if elapsed > 0 else None,
+    }
+    print(f"Analyzed {verses:,} verses ({words:,} words) in {elapsed:.2f}s "
+          f"({stats['verses_per_second']} verses/s) → {output_file}")
+    return stats
+
 def interactive_syntax_test(parser: QuranSyntaxParser):
     """Interactive testing of syntax parser"""
     print("\n" + "="*60)
@@ -481,6 +794,7 @@ def interactive_syntax_test(parser: QuranSyntaxParser):
     print("  root [root]     - Analyze concept usage")
     print("  pattern [roles] - Find verses by syntax pattern")
     print("  word [id]       - Analyze single word")
+    print("  all [file]      - Analyze every verse to a JSONL file")
     print("  test            - Run automated tests")
     print("  quit            - Exit")
     print("\nPattern example: preposition,noun_genitive")
@@ -496,6 +810,10 @@ def interactive_syntax_test(parser: QuranSyntaxParser):
             elif cmd == 'test':
                 run_syntax_tests(parser)
             
+            elif cmd == 'all' or cmd.startswith('all '):
+                output_file = cmd[4:].strip() or 'syntax_analysis.jsonl'
+                analyze_all(parser, output_file)
+            
             elif cmd.startswith('verse '):
                 try:
                     verse_id = int(cmd[6:])
@@ -713,7 +1031,7 @@ def main():
         # Load data
         print("Loading unified index...")
         index = QuranUnifiedIndex(".")
-        index.load_all_data()
+        index.load_with_snapshot()
         
         # Create syntax parser
         parser = QuranSyntaxParser(index)
@@ -7,13 +7,66 @@ Connects all data files using global word IDs
 import json
 import os
 import sys
-import csv
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable, Iterator, Union
 from collections import defaultdict
 
+import index_snapshot
+import row_export
+import word_store
+from ngram_index import NgramIndex
+from morphology_index import MorphologyBitmapIndex
+from arabic_normalizer import normalize_arabic, build_normalized_forms
+
 class QuranUnifiedIndex:
     """Unified index connecting all Quran data files"""
     
+    # Source files the index is built from (used to invalidate snapshots)
+    SOURCE_FILES = [
+        'quran_words.json', 'word_translations.json', 'morphology.json',
+        'verses.json', 'sura.json', 'root_words.json',
+        'quran_harakat_words.json', 'quranic_words.json', 'quranic_warsh_words.json'
+    ]
+    
+    # Optional alternative spellings (harakat, Uthmani Hafs, Warsh) that share
+    # word ids with quran_words.json; folded into the normalized search index
+    VARIANT_WORD_FILES = [
+        'quran_harakat_words.json', 'quranic_words.json', 'quranic_warsh_words.json'
+    ]
+    
+    # Source files whose contents the word store holds
+    WORD_STORE_SOURCES = [
+        'quran_words.json', 'word_translations.json', 'morphology.json',
+        'verses.json', 'root_words.json'
+    ]
+    
+    # Attributes persisted by save_snapshot()
+    SNAPSHOT_FIELDS = [
+        'words', 'word_translations', 'morphology', 'verses', 'suras',
+        'word_to_verse', 'verse_to_words', 'root_index', 'word_roots',
+        'sura_verse_index', 'search_index', 'normalized_index', 'morphology_index',
+        'imperative_verbs_by_root', 'imperative_verbs_flat',
+        'stats'
+    ]
+    
+    # Build steps in dependency order: (method, inputs, outputs). Inputs are
+    # source files or attributes made by earlier steps; after a source file
+    # changes, only steps with a changed input rerun.
+    BUILD_STEPS = [
+        ('_load_words', ['quran_words.json'], ['words']),
+        ('_load_word_translations', ['word_translations.json'], ['word_translations']),
+        ('_load_morphology', ['morphology.json'], ['morphology']),
+        ('_load_verses', ['verses.json'], ['verses']),
+        ('_load_suras', ['sura.json'], ['suras']),
+        ('_load_root_words', ['root_words.json'], ['root_index', 'word_roots']),
+        ('_build_derived_indices', ['verses', 'suras'],
+         ['word_to_verse', 'verse_to_words', 'sura_verse_index']),
+        ('_build_morphology_index', ['morphology'], ['morphology_index']),
+        ('_build_imperative_verbs_index', ['morphology_index', 'words', 'word_to_verse'],
+         ['imperative_verbs_by_root', 'imperative_verbs_flat']),
+        ('_build_search_index', ['words'] + VARIANT_WORD_FILES,
+         ['search_index', 'normalized_index']),
+    ]
+    
     def __init__(self, data_dir: str = "."):
         self.data_dir = data_dir
         
@@ -27,8 +80,15 @@ class QuranUnifiedIndex:
         # Derived indices
         self.word_to_verse = {}       # word_id → verse_id
         self.verse_to_words = {}      # verse_id → [word_ids]
-        self.root_index = defaultdict(list)  # root → [word_ids]
+        self.root_index = defaultdict(list)  # root → sorted [word_ids]
+        self.word_roots = defaultdict(list)  # word_id → [roots]
         self.sura_verse_index = {}    # (sura, ayah) → verse_id
+        self.search_index = None      # NgramIndex over word forms
+        self.normalized_index = None  # NgramIndex over normalized forms
+        self.morphology_index = None  # MorphologyBitmapIndex over subtokens
+        self._syntax_role_cache = {}  # (morphology tag, pos) → role
+        self._verse_positions_cache = None  # see _verse_positions()
+        self._source_fingerprints = None  # source files the loaded data matches
         
         # Imperative verbs index
         self.imperative_verbs_by_root = defaultdict(list)  # root → list of (word_id, arabic, morphology)
@@ -56,91 +116,44 @@ class QuranUnifiedIndex:
         try:
             # 1. Load quran_words.json
             print("1. Loading words...")
-            with open(os.path.join(self.data_dir, 'quran_words.json'), 'r', encoding='utf-8') as f:
-                self.words = json.load(f)
-            self.stats['total_words'] = len(self.words)
-            print(f"   Loaded {self.stats['total_words']} words")
+            self._load_words()
             
             # 2. Load word translations
             print("2. Loading word translations...")
-            word_trans_file = os.path.join(self.data_dir, 'word_translations.json')
-            if os.path.exists(word_trans_file):
-                with open(word_trans_file, 'r', encoding='utf-8') as f:
-                    self.word_translations = json.load(f)
-                self.stats['words_with_translation'] = len(self.word_translations)
-                print(f"   Loaded {self.stats['words_with_translation']} word translations")
-            else:
-                print("   Word translations file not found, skipping")
+            self._load_word_translations()
             
             # 3. Load morphology
             print("3. Loading morphology...")
-            with open(os.path.join(self.data_dir, 'morphology.json'), 'r', encoding='utf-8') as f:
-                morph_data = json.load(f)
-                
-                # Convert keys to integers and store
-                for key_str, value in morph_data.items():
-                    try:
-                        word_id = int(key_str)
-                        self.morphology[word_id] = value
-                    except ValueError:
-                        print(f"   Warning: Non-integer key in morphology: {key_str}")
-                        continue
-                
-                self.stats['words_with_morphology'] = len(self.morphology)
-                print(f"   Loaded {self.stats['words_with_morphology']} morphology entries")
+            self._load_morphology()
             
             # 4. Load verses
             print("4. Loading verses...")
-            with open(os.path.join(self.data_dir, 'verses.json'), 'r', encoding='utf-8') as f:
-                verses_data = json.load(f)
-                
-                for key_str, value in verses_data.items():
-                    try:
-                        verse_id = int(key_str)
-                        self.verses[verse_id] = value
-                    except ValueError:
-                        print(f"   Warning: Non-integer key in verses: {key_str}")
-                        continue
-                
-                self.stats['total_verses'] = len(self.verses)
-                print(f"   Loaded {self.stats['total_verses']} verses")
+            self._load_verses()
             
             # 5. Load suras
             print("5. Loading suras...")
-            with open(os.path.join(self.data_dir, 'sura.json'), 'r', encoding='utf-8') as f:
-                sura_data = json.load(f)
-                
-                for key_str, value in sura_data.items():
-                    try:
-                        sura_id = int(key_str)
-                        self.suras[sura_id] = value
-                    except ValueError:
-                        print(f"   Warning: Non-integer key in suras: {key_str}")
-                        continue
-                
-                self.stats['total_suras'] = len(self.suras)
-                print(f"   Loaded {self.stats['total_suras']} suras")
+            self._load_suras()
             
             # 6. Load root words (optional)
             print("6. Loading root words...")
-            root_file = os.path.join(self.data_dir, 'root_words.json')
-            if os.path.exists(root_file):
-                with open(root_file, 'r', encoding='utf-8') as f:
-                    root_data = json.load(f)
-                self._build_root_index(root_data)
-                print(f"   Loaded {self.stats['unique_roots']} unique roots")
-                print(f"   Found {self.stats['words_with_root']} word-root mappings")
-            else:
-                print("   Root words file not found, skipping")
+            self._load_root_words()
             
             # 7. Build derived indices
             print("7. Building derived indices...")
             self._build_derived_indices()
             
-            # 8. Build imperative verbs index
-            print("8. Building imperative verbs index...")
+            # 8. Build morphology index
+            print("8. Building morphology index...")
+            self._build_morphology_index()
+            
+            # 9. Build imperative verbs index
+            print("9. Building imperative verbs index...")
             self._build_imperative_verbs_index()
             
+            # 10. Build search index
+            print("10. Building search index...")
+            self._build_search_index()
+            
             print("\n" + "="*60)
             print("DATA LOADING COMPLETE")
             print("="*60)
@@ -161,50 +174,138 @@ class QuranUnifiedIndex:
             print(f"\n❌ ERROR: Invalid JSON: {e}")
             sys.exit(1)
     
+    # ===== SOURCE LOADERS =====
+    
+    def _load_words(self):
+        """Load quran_words.json"""
+        with open(os.path.join(self.data_dir, 'quran_words.json'), 'r', encoding='utf-8') as f:
+            self.words = json.load(f)
+        self.stats['total_words'] = len(self.words)
+        print(f"   Loaded {self.stats['total_words']} words")
+    
+    def _load_word_translations(self):
+        """Load word_translations.json (optional)"""
+        self.word_translations = {}
+        word_trans_file = os.path.join(self.data_dir, 'word_translations.json')
+        if os.path.exists(word_trans_file):
+            with open(word_trans_file, 'r', encoding='utf-8') as f:
+                self.word_translations = json.load(f)
+            self.stats['words_with_translation'] = len(self.word_translations)
+            print(f"   Loaded {self.stats['words_with_translation']} word translations")
+        else:
+            print("   Word translations file not found, skipping")
+    
+    def _load_morphology(self):
+        """Load morphology.json keyed by integer word id"""
+        with open(os.path.join(self.data_dir, 'morphology.json'), 'r', encoding='utf-8') as f:
+            morph_data = json.load(f)
+        
+        # Convert keys to integers and store
+        morphology = {}
+        for key_str, value in morph_data.items():
+            try:
+                word_id = int(key_str)
+                morphology[word_id] = value
+            except ValueError:
+                print(f"   Warning: Non-integer key in morphology: {key_str}")
+                continue
+        self.morphology = morphology
+        
+        self.stats['words_with_morphology'] = len(self.morphology)
+        print(f"   Loaded {self.stats['words_with_morphology']} morphology entries")
+    
+    def _load_verses(self):
+        """Load verses.json keyed by integer verse id"""
+        with open(os.path.join(self.data_dir, 'verses.json'), 'r', encoding='utf-8') as f:
+            verses_data = json.load(f)
+        
+        self.verses = {}
+        for key_str, value in verses_data.items():
+            try:
+                verse_id = int(key_str)
+                self.verses[verse_id] = value
+            except ValueError:
+                print(f"   Warning: Non-integer key in verses: {key_str}")
+                continue
+        
+        self.stats['total_verses'] = len(self.verses)
+        print(f"   Loaded {self.stats['total_verses']} verses")
+    
+    def _load_suras(self):
+        """Load sura.json keyed by integer sura id"""
+        with open(os.path.join(self.data_dir, 'sura.json'), 'r', encoding='utf-8') as f:
+            sura_data = json.load(f)
+        
+        self.suras = {}
+        for key_str, value in sura_data.items():
+            try:
+                sura_id = int(key_str)
+                self.suras[sura_id] = value
+            except ValueError:
+                print(f"   Warning: Non-integer key in suras: {key_str}")
+                continue
+        
+        self.stats['total_suras'] = len(self.suras)
+        print(f"   Loaded {self.stats['total_suras']} suras")
+    
+    def _load_root_words(self):
+        """Load root_words.json (optional) into the root indices"""
+        self.root_index = defaultdict(list)
+        self.word_roots = defaultdict(list)
+        root_file = os.path.join(self.data_dir, 'root_words.json')
+        if os.path.exists(root_file):
+            with open(root_file, 'r', encoding='utf-8') as f:
+                root_data = json.load(f)
+            self._build_root_index(root_data)
+            print(f"   Loaded {self.stats['unique_roots']} unique roots")
+            print(f"   Found {self.stats['words_with_root']} word-root mappings")
+        else:
+            print("   Root words file not found, skipping")
+    
     def _build_imperative_verbs_index(self):
-        """Build index of imperative verbs from morphology data"""
+        """Build index of imperative verbs from the morphology bitmap index"""
+        self.imperative_verbs_by_root = defaultdict(list)
+        self.imperative_verbs_flat = []
         imperative_verbs = 0
         root_counts = defaultdict(int)
         
-        for word_id, morph_data in self.morphology.items():
-            if 'words' not in morph_data:
-                continue
+        # Imperatives are the 'IMPV' slice of the morphology bitmap index
+        if self.morphology_index is None:
+            self._build_morphology_index()
+        
+        for word_id, subtoken_key in self.morphology_index.subtokens('IMPV'):
+            subtoken_data = self.morphology[word_id]['words'][subtoken_key]
+            morphology_str = subtoken_data.get('morphology', '')
+            # Get the Arabic word
+            arabic_word = self.words.get(str(word_id), '')
             
-            for subtoken_key, subtoken_data in morph_data['words'].items():
-                morphology_str = subtoken_data.get('morphology', '')
-                
-                # Check if this is an imperative verb
-                if 'IMPV' in morphology_str:
-                    # Get the Arabic word
-                    arabic_word = self.words.get(str(word_id), '')
-                    
-                    # Get the root from this subtoken
-                    root = subtoken_data.get('root')
-                    
-                    # Prepare the entry
-                    entry = {
-                        'word_id': word_id,
-                        'arabic_word': arabic_word,
-                        'morphology': morphology_str,
-                        'subtoken_word': subtoken_data.get('word', ''),
-                        'pos': subtoken_data.get('pos', ''),
-                        'lemma': subtoken_data.get('lemma', ''),
-                        'verse_id': self.word_to_verse.get(word_id),
-                        'root': root
-                    }
-                    
-                    # Add to flat list
-                    self.imperative_verbs_flat.append(entry)
-                    imperative_verbs += 1
-                    
-                    # Add to root-based index (use root from subtoken)
-                    if root:
-                        self.imperative_verbs_by_root[root].append(entry)
-                        root_counts[root] += 1
-                    else:
-                        # Store without root key for rootless imperatives
-                        self.imperative_verbs_by_root['NO_ROOT'].append(entry)
-                        root_counts['NO_ROOT'] += 1
+            # Get the root from this subtoken
+            root = subtoken_data.get('root')
+            
+            # Prepare the entry
+            entry = {
+                'word_id': word_id,
+                'arabic_word': arabic_word,
+                'morphology': morphology_str,
+                'subtoken_word': subtoken_data.get('word', ''),
+                'pos': subtoken_data.get('pos', ''),
+                'lemma': subtoken_data.get('lemma', ''),
+                'verse_id': self.word_to_verse.get(word_id),
+                'root': root
+            }
+            
+            # Add to flat list
+            self.imperative_verbs_flat.append(entry)
+            imperative_verbs += 1
+            
+            # Add to root-based index (use root from subtoken)
+            if root:
+                self.imperative_verbs_by_root[root].append(entry)
+                root_counts[root] += 1
+            else:
+                # Store without root key for rootless imperatives
+                self.imperative_verbs_by_root['NO_ROOT'].append(entry)
+                root_counts['NO_ROOT'] += 1
         
         # Update statistics
         self.stats['imperative_verbs'] = imperative_verbs
@@ -239,12 +340,49 @@ class QuranUnifiedIndex:
                     except ValueError:
                         # Skip non-integer keys
                         continue
+                    
+                    # Reverse mapping; a root's entries are consecutive,
+                    # so checking the last root is enough to dedupe
+                    roots = self.word_roots[word_id]
+                    if not roots or roots[-1] != root:
+                        roots.append(root)
+        
+        # Sort and dedupe word lists so lookups by root are stable
+        for root, word_ids in self.root_index.items():
+            self.root_index[root] = sorted(set(word_ids))
         
         self.stats['unique_roots'] = len(roots_found)
         self.stats['words_with_root'] = words_with_root
     
+    def _build_morphology_index(self):
+        """Build the bitmap index used by query_morphology"""
+        self.morphology_index = MorphologyBitmapIndex.build(self.morphology)
+        keys = len(self.morphology_index.bitmaps) + len(self.morphology_index.postings)
+        print(f"   Indexed {self.morphology_index.n:,} subtokens under {keys:,} feature keys")
+    
+    def _build_search_index(self):
+        """Build the n-gram indices used by search_by_arabic"""
+        self.search_index = NgramIndex.from_words(self.words)
+        print(f"   Indexed {len(self.search_index.forms):,} unique word forms")
+        
+        # Normalized forms across all available spellings of each word
+        word_sets = [self.words]
+        for filename in self.VARIANT_WORD_FILES:
+            path = os.path.join(self.data_dir, filename)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    word_sets.append(json.load(f))
+        self.normalized_index = NgramIndex.from_forms(build_normalized_forms(*word_sets))
+        print(f"   Indexed {len(self.normalized_index.forms):,} normalized forms "
+              f"from {len(word_sets)} word sets")
+    
     def _build_derived_indices(self):
         """Build derived lookup indices"""
+        self.word_to_verse = {}
+        self.verse_to_words = {}
+        self.sura_verse_index = {}
+        self._verse_positions_cache = None
+        
         print("   Building word-to-verse mapping...")
         for verse_id, verse_data in self.verses.items():
             start = verse_data.get('start_word')
@@ -365,6 +503,190 @@ class QuranUnifiedIndex:
         if missing_morphology:
             print(f"   Missing morphology for words: {missing_morphology[:10]}{'...' if len(missing_morphology) > 10 else ''}")
     
+    # ===== SNAPSHOTS =====
+    
+    def _snapshot_path(self, path: Optional[str] = None) -> str:
+        return path or os.path.join(self.data_dir, index_snapshot.SNAPSHOT_FILE)
+    
+    def save_snapshot(self, path: Optional[str] = None, sources: Optional[Dict] = None):
+        """Save all loaded data and indices to a binary snapshot file"""
+        path = self._snapshot_path(path)
+        self._source_fingerprints = index_snapshot.save_snapshot(
+            self, path, self.SNAPSHOT_FIELDS, self.SOURCE_FILES, sources
+        )
+        print(f"Saved index snapshot to {path}")
+    
+    def load_snapshot(self, path: Optional[str] = None) -> bool:
+        """Load data and indices from a snapshot if it matches the source files"""
+        path = self._snapshot_path(path)
+        status = index_snapshot.snapshot_status(self, path, self.SNAPSHOT_FIELDS)
+        if not index_snapshot.load_snapshot(self, path, self.SNAPSHOT_FIELDS, status=status):
+            return False
+        self._source_fingerprints = status[1]
+        print(f"Loaded index snapshot from {path}")
+        return True
+    
+    def load_with_snapshot(self, path: Optional[str] = None):
+        """
+        Load from the snapshot, rebuilding only what depends on source files
+        changed since it was saved, or build from JSON if there is no usable
+        snapshot. The snapshot is resaved whenever anything was rebuilt.
+        Source files are fingerprinted once and reused for the resave.
+        """
+        path = self._snapshot_path(path)
+        status = index_snapshot.snapshot_status(self, path, self.SNAPSHOT_FIELDS)
+        sources = None
+        if status and index_snapshot.load_snapshot(self, path, self.SNAPSHOT_FIELDS,
+                                                   allow_stale=True, status=status):
+            stale, sources = status
+            self._source_fingerprints = sources
+            if not stale:
+                print(f"Loaded index snapshot from {path}")
+                return
+            print(f"Loaded index snapshot from {path}, updating for {', '.join(stale)}")
+            self.rebuild_changed(stale)
+        else:
+            self.load_all_data()
+        try:
+            self.save_snapshot(path, sources)
+        except OSError as e:
+            print(f"   Warning: could not save index snapshot: {e}")
+    
+    # ===== INCREMENTAL REBUILD =====
+    
+    def rebuild_changed(self, changed: List[str]) -> List[str]:
+        """
+        Rerun only the build steps affected by the changed source files.
+        Morphology edits patch the bitmap index in place when the edited
+        words keep their subtokens. Returns the steps that ran.
+        """
+        dirty = set(changed)
+        ran = []
+        old_morphology = self.morphology
+        
+        for method, inputs, outputs in self.BUILD_STEPS:
+            if dirty.isdisjoint(inputs):
+                continue
+            if method == '_build_morphology_index' and self._patch_morphology_index(old_morphology):
+                method = '_patch_morphology_index'
+            else:
+                getattr(self, method)()
+            dirty.update(outputs)
+            ran.append(method)
+        
+        print(f"   Rebuilt: {', '.join(ran) or 'nothing'}")
+        return ran
+    
+    def _patch_morphology_index(self, old_morphology: Dict) -> bool:
+        """Update the bitmap index for the words whose morphology changed"""
+        if self.morphology_index is None or old_morphology.keys() != self.morphology.keys():
+            return False
+        changed = [word_id for word_id, entry in self.morphology.items()
+                   if old_morphology[word_id] != entry]
+        if not self.morphology_index.update(old_morphology, self.morphology, changed):
+            return False
+        print(f"   Patched morphology index for {len(changed)} changed words")
+        return True
+    
+    def refresh(self, save: bool = True) -> List[str]:
+        """
+        Pick up source file edits in a running process: rebuild only the
+        affected indices and, by default, resave the snapshot. Returns the
+        steps that ran. Needs data loaded through the snapshot methods.
+        """
+        if self._source_fingerprints is None:
+            return []
+        changed, sources = index_snapshot.check_sources(self.data_dir, self._source_fingerprints)
+        if not changed:
+            return []
+        
+        print(f"Source files changed: {', '.join(changed)}")
+        ran = self.rebuild_changed(changed)
+        if save:
+            self.save_snapshot(sources=sources)
+        else:
+            self._source_fingerprints = sources
+        return ran
+    
+    # ===== COLUMNAR WORD STORE =====
+    
+    def build_word_store(self, path: Optional[str] = None):
+        """Write word text, translations, morphology and roots to a columnar store"""
+        path = path or os.path.join(self.data_dir, word_store.STORE_FILE)
+        word_store.build_word_store(self, path)
+        print(f"Saved word store to {path}")
+    
+    def attach_word_store(self, path: Optional[str] = None) -> word_store.WordStore:
+        """
+        Replace the per-word dicts with read-only views over a memory-mapped
+        word store. Lookups keep the same keys and value shapes.
+        """
+        path = path or os.path.join(self.data_dir, word_store.STORE_FILE)
+        store = word_store.WordStore(path)
+        self.words = word_store.WordTextView(store)
+        self.word_translations = word_store.TranslationView(store)
+        self.morphology = word_store.MorphologyView(store)
+        self.word_to_verse = word_store.WordVerseView(store)
+        self.word_roots = word_store.WordRootsView(store)
+        print(f"Attached word store {path} ({store.n_subtokens:,} subtokens)")
+        return store
+
+    def _word_store_current(self, path: str) -> bool:
+        """
+        Check that the store exists, is in the format and byte order this
+        version reads, and is newer than the files it was built from
+        """
+        if word_store.read_store_toc(path) is None:
+            return False
+        built = os.stat(path).st_mtime_ns
+        for name in self.WORD_STORE_SOURCES:
+            source = os.path.join(self.data_dir, name)
+            if os.path.exists(source) and os.stat(source).st_mtime_ns > built:
+                return False
+        return True
+    
+    def load_from_word_store(self, path: Optional[str] = None):
+        """
+        Load per-word data (words, translations, morphology, roots, verse of
+        each word) straight from the memory-mapped word store, so server
+        processes share one copy of it, and only verses.json and sura.json
+        from JSON. The store is (re)built from the JSON sources first when
+        it is missing or older than them.
+        """
+        path = path or os.path.join(self.data_dir, word_store.STORE_FILE)
+        if not self._word_store_current(path):
+            print(f"Word store {path} is missing, out of date or from another version, building it")
+            self.load_all_data()
+            self.build_word_store(path)
+        
+        print("="*60)
+        print("Loading Quran Data from Word Store")
+        print("="*60)
+        store = self.attach_word_store(path)
+        self._load_verses()
+        self._load_suras()
+        
+        # Derived indices; word_to_verse stays a view over the store
+        self._build_derived_indices()
+        self.word_to_verse = word_store.WordVerseView(store)
+        
+        # root → sorted word ids, from the store's per-word roots
+        self.root_index = defaultdict(list)
+        for word_id, roots in self.word_roots.items():
+            for root in roots:
+                self.root_index[root].append(word_id)
+        
+        self.stats['total_words'] = store.counts['words']
+        self.stats['words_with_translation'] = store.counts['translations']
+        self.stats['words_with_morphology'] = store.counts['morphology']
+        self.stats['unique_roots'] = len(self.root_index)
+        self.stats['words_with_root'] = sum(len(ids) for ids in self.root_index.values())
+        
+        self._build_morphology_index()
+        self._build_imperative_verbs_index()
+        self._build_search_index()
+        self.print_stats()
+    
     # ===== QUERY METHODS =====
     
     def get_word_info(self, word_id: int) -> Optional[Dict]:
@@ -416,10 +738,7 @@ class QuranUnifiedIndex:
             info['verse_translation'] = verse_data.get('en')
         
         # Add root information if available
-        info['roots'] = []
-        for root, word_ids in self.root_index.items():
-            if word_id in word_ids:
-                info['roots'].append(root)
+        info['roots'] = list(self.word_roots.get(word_id, ()))
         
         return info
     
@@ -430,66 +749,14 @@ class QuranUnifiedIndex:
         else:
             return []
     
-    def export_imperative_verbs_report(self, output_file: str = "imperative_verbs_report.csv"):
-        """Export imperative verbs report to CSV file"""
+    def export_imperative_verbs_report(self, output_file: str = "imperative_verbs_report.csv",
+                                       output_format: Optional[str] = None):
+        """Export imperative verbs report (CSV, JSONL or Parquet) plus a JSON summary"""
         print(f"\nExporting imperative verbs report to {output_file}...")
-        
-        with open(output_file, 'w', encoding='utf-8', newline='') as csvfile:
-            fieldnames = [
-                'word_id', 
-                'arabic_word', 
-                'subtoken_word',
-                'root', 
-                'morphology', 
-                'pos', 
-                'lemma',
-                'verse_id',
-                'sura',
-                'ayah',
-                'word_position'
-            ]
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for entry in self.imperative_verbs_flat:
-                row = entry.copy()
-                
-                # Get verse details if available
-                verse_id = entry.get('verse_id')
-                if verse_id and verse_id in self.verses:
-                    verse_data = self.verses[verse_id]
-                    row['verse_arabic'] = verse_data.get('arabic', '')
-                    row['verse_translation'] = verse_data.get('en', '')
-                
-                # Get sura and ayah
-                sura_ayah = None
-                for (s, a), v_id in self.sura_verse_index.items():
-                    if v_id == verse_id:
-                        sura_ayah = (s, a)
-                        break
-                
-                if sura_ayah:
-                    row['sura'], row['ayah'] = sura_ayah
-                    
-                    # Calculate word position in verse
-                    verse_words = self.verse_to_words.get(verse_id, [])
-                    if entry['word_id'] in verse_words:
-                        row['word_position'] = verse_words.index(entry['word_id']) + 1
-                    else:
-                        row['word_position'] = ''
-                else:
-                    row['sura'] = ''
-                    row['ayah'] = ''
-                    row['word_position'] = ''
-                
-                # Write the row (only include defined fieldnames)
-                writer.writerow({k: row.get(k, '') for k in fieldnames})
-        
-        print(f"Exported {len(self.imperative_verbs_flat)} imperative verbs to {output_file}")
+        self.export_morphology(output_file, 'IMPV', output_format)
         
         # Also create a summary JSON file
-        summary_file = output_file.replace('.csv', '_summary.json')
+        summary_file = os.path.splitext(output_file)[0] + '_summary.json'
         summary = {
             'total_imperative_verbs': self.stats['imperative_verbs'],
             'roots_with_imperatives': len(self.imperative_verbs_by_root),
@@ -528,6 +795,98 @@ class QuranUnifiedIndex:
         
         return results
     
+    # ===== STREAMING EXPORT =====
+    
+    # Columns written by export_morphology
+    EXPORT_FIELDS = [
+        'word_id', 'arabic_word', 'subtoken_word', 'root', 'morphology',
+        'pos', 'lemma', 'verse_id', 'sura', 'ayah', 'word_position'
+    ]
+    EXPORT_INT_FIELDS = ['word_id', 'verse_id', 'sura', 'ayah', 'word_position']
+    
+    def _verse_positions(self) -> Tuple[List, List, List]:
+        """verse_id-indexed sura, ayah and first word id arrays (built on first use)"""
+        if self._verse_positions_cache is None:
+            size = max(self.verse_to_words, default=0) + 1
+            verse_sura = [None] * size
+            verse_ayah = [None] * size
+            verse_start = [None] * size
+            
+            for (sura_id, ayah), verse_id in self.sura_verse_index.items():
+                if verse_id < size:
+                    verse_sura[verse_id] = int(sura_id)
+                    verse_ayah[verse_id] = ayah
+            for verse_id, word_ids in self.verse_to_words.items():
+                if word_ids:
+                    verse_start[verse_id] = word_ids[0]
+            
+            self._verse_positions_cache = (verse_sura, verse_ayah, verse_start)
+        return self._verse_positions_cache
+    
+    def iter_morphology_rows(self, predicate: Union[str, Callable[[Dict], bool], None] = None) -> Iterator[Dict]:
+        """
+        Yield one export row per morphology subtoken matching predicate: a
+        morphology query such as 'IMPV' or 'IMPV AND ROOT=قول' (matched by
+        whole tag parts through the bitmap index, as in query_morphology), a
+        callable taking the subtoken dict, or None for every subtoken
+        """
+        if isinstance(predicate, str):
+            if self.morphology_index is None:
+                self._build_morphology_index()
+            matches = (
+                (word_id, self.morphology[word_id]['words'][key])
+                for word_id, key in self.morphology_index.subtokens(predicate)
+            )
+        else:
+            matches = (
+                (word_id, subtoken_data)
+                for word_id, morph_data in self.morphology.items()
+                for subtoken_data in (morph_data.get('words') or {}).values()
+                if predicate is None or predicate(subtoken_data)
+            )
+        
+        verse_sura, verse_ayah, verse_start = self._verse_positions()
+        
+        last_word_id = None
+        for word_id, subtoken_data in matches:
+            if word_id != last_word_id:
+                last_word_id = word_id
+                arabic_word = self.words.get(str(word_id), '')
+                verse_id = self.word_to_verse.get(word_id)
+                if verse_id is not None and verse_id < len(verse_sura) and verse_sura[verse_id] is not None:
+                    sura, ayah = verse_sura[verse_id], verse_ayah[verse_id]
+                    word_position = word_id - verse_start[verse_id] + 1
+                else:
+                    sura = ayah = word_position = None
+            
+            yield {
+                'word_id': word_id,
+                'arabic_word': arabic_word,
+                'subtoken_word': subtoken_data.get('word', ''),
+                'root': subtoken_data.get('root'),
+                'morphology': subtoken_data.get('morphology', ''),
+                'pos': subtoken_data.get('pos', ''),
+                'lemma': subtoken_data.get('lemma', ''),
+                'verse_id': verse_id,
+                'sura': sura,
+                'ayah': ayah,
+                'word_position': word_position
+            }
+    
+    def export_morphology(self, output_file: str,
+                          predicate: Union[str, Callable[[Dict], bool], None] = None,
+                          output_format: Optional[str] = None) -> int:
+        """
+        Stream matching subtokens to CSV, JSONL or Parquet (format from the
+        extension unless given). Returns the number of rows written.
+        """
+        count = row_export.write_rows(
+            self.iter_morphology_rows(predicate), output_file, self.EXPORT_FIELDS,
+            output_format, int_fields=self.EXPORT_INT_FIELDS
+        )
+        print(f"Exported {count:,} subtokens to {output_file}")
+        return count
+    
     def analyze_verse_syntax(self, verse_id: int) -> List[Dict]:
         """Analyze syntactic structure of a verse"""
         words = self.get_verse_words(verse_id)
@@ -545,10 +904,15 @@ class QuranUnifiedIndex:
         return words
     
     def _infer_syntax_role(self, morph_data: Dict) -> str:
-        """Infer syntax role from morphology data"""
-        morph_str = morph_data.get('morphology', '')
-        pos = morph_data.get('pos', '')
-        
+        """Infer syntax role from morphology data (memoized per tag and POS)"""
+        key = (morph_data.get('morphology', ''), morph_data.get('pos', ''))
+        role = self._syntax_role_cache.get(key)
+        if role is None:
+            role = self._syntax_role_cache[key] = self._syntax_role_for(*key)
+        return role
+    
+    def _syntax_role_for(self, morph_str: str, pos: str) -> str:
+        """Role inference rules for one morphology tag and POS"""
         # Check for imperative first
         if 'IMPV' in morph_str:
             return 'imperative_verb'
@@ -576,28 +940,50 @@ class QuranUnifiedIndex:
         
         return 'unknown'
     
-    def search_by_arabic(self, arabic_text: str, exact: bool = False) -> List[Dict]:
-        """Search for words by Arabic text"""
-        results = []
-        arabic_lower = arabic_text.strip()
+    def query_morphology(self, expr: str) -> List[Tuple[int, str]]:
+        """
+        (word_id, subtoken key) pairs matching a morphology query such as
+        'ROOT=رحم AND PASS AND GEN' (see morphology_index for the syntax)
+        """
+        if self.morphology_index is None:
+            self._build_morphology_index()
+        return self.morphology_index.subtokens(expr)
+    
+    def count_morphology(self, expr: str) -> int:
+        """Number of subtokens matching a morphology query"""
+        if self.morphology_index is None:
+            self._build_morphology_index()
+        return self.morphology_index.count(expr)
+    
+    def search_word_ids(self, arabic_text: str, exact: bool = False,
+                        normalized: bool = False) -> List[int]:
+        """
+        Find ids of words equal to (exact) or containing the Arabic text.
+        With normalized=True, diacritics, hamza forms, tatweel and Uthmani
+        spelling variants are ignored.
+        """
+        if self.search_index is None:
+            self._build_search_index()
+        if normalized:
+            return self.normalized_index.search(normalize_arabic(arabic_text), exact)
+        return self.search_index.search(arabic_text.strip(), exact)
+    
+    def search_by_arabic(self, arabic_text: str, exact: bool = False,
+                         limit: Optional[int] = None, offset: int = 0,
+                         normalized: bool = False) -> List[Dict]:
+        """Search for words by Arabic text; limit/offset page the results"""
+        word_ids = self.search_word_ids(arabic_text, exact, normalized)
+        if limit is not None:
+            word_ids = word_ids[offset:offset + limit]
+        elif offset:
+            word_ids = word_ids[offset:]
         
-        for word_id_str, text in self.words.items():
-            # Convert string key to integer for get_word_info
-            try:
-                word_id = int(word_id_str)
-            except ValueError:
-                continue
-            
-            if exact:
-                if text == arabic_lower:
-                    word_info = self.get_word_info(word_id)
-                    if word_info:
-                        results.append(word_info)
-            else:
-                if arabic_lower in text:
-                    word_info = self.get_word_info(word_id)
-                    if word_info:
-                        results.append(word_info)
+        # Only the requested page is expanded into full word info
+        results = []
+        for word_id in word_ids:
+            word_info = self.get_word_info(word_id)
+            if word_info:
+                results.append(word_info)
         
         return results
     
@@ -627,6 +1013,7 @@ def interactive_test(index: QuranUnifiedIndex):
     print("  commands [root] - Find imperative verbs by root")
     print("  search [text]   - Search Arabic text")
     print("  sura [s:aya]    - Get verse by sura:ayah")
+    print("  morph [query]   - Query morphology, e.g. 'ROOT=رحم AND GEN'")
     print("  stats           - Show statistics")
     print("  export          - Export imperative verbs report")
     print("  test            - Run automated tests")
@@ -737,17 +1124,32 @@ def interactive_test(index: QuranUnifiedIndex):
             
             elif cmd.startswith('search '):
                 text = cmd[7:].strip()
-                words = index.search_by_arabic(text)
+                total = len(index.search_word_ids(text))
+                words = index.search_by_arabic(text, limit=10)
                 if words:
-                    print(f"\nFound {len(words)} words containing '{text}':")
+                    print(f"\nFound {total} words containing '{text}':")
                     for word in words[:10]:  # Show first 10
                         impv_marker = " [IMPV]" if word.get('is_imperative') else ""
                         print(f"  {word['word_id']}: {word['arabic']} (Verse {word['verse_id']}){impv_marker}")
-                    if len(words) > 10:
-                        print(f"  ... and {len(words) - 10} more")
+                    if total > 10:
+                        print(f"  ... and {total - 10} more")
                 else:
                     print(f"No words found containing '{text}'")
             
+            elif cmd.startswith('morph '):
+                expr = cmd[6:].strip().upper()
+                matches = index.query_morphology(expr)
+                if matches:
+                    print(f"\nFound {len(matches)} subtokens matching '{expr}':")
+                    for word_id, key in matches[:10]:
+                        subtoken = index.morphology[word_id]['words'][key]
+                        print(f"  {word_id}: {subtoken.get('word', '')} [{subtoken.get('morphology', '')}] "
+                              f"(Verse {index.word_to_verse.get(word_id)})")
+                    if len(matches) > 10:
+                        print(f"  ... and {len(matches) - 10} more")
+                else:
+                    print(f"No subtokens match '{expr}'")
+            
             elif cmd.startswith('sura '):
                 try:
                     parts = cmd[5:].split(':')
@@ -855,7 +1257,7 @@ def main():
     
     # Build index
     index = QuranUnifiedIndex(data_dir)
-    index.load_all_data()
+    index.load_with_snapshot()
     
     # Run interactive test
     interactive_test(index)
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Quran Columnar Word Store
+Packs per-word data (text, translation, verse, roots, morphology) into
+flat columns in one file that is opened read-only with mmap, so several
+server processes share a single copy of the pages
+
+Morphology tags are packed: the most frequent tag parts (STEM, M, GEN,
+POS:N, ...) are bits in one 64-bit word per subtoken, and only the rest
+of the tag, with empty slots where those parts were, is interned
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+STORE_MAGIC = b'QWSTORE1'
+STORE_VERSION = 3
+STORE_FILE = 'quran_words.store'
+
+# Header: magic, format version, length of the JSON table of contents
+_HEADER = struct.Struct('<8sII')
+_ALIGN = 8
+
+# Per-word flag bits
+HAS_WORD = 1
+HAS_TRANSLATION = 2
+HAS_MORPHOLOGY = 4
+
+# Subtoken keys kept by the store (the fields written by arabic-corpus.py)
+SUBTOKEN_FIELDS = ('word', 'pos', 'root', 'lemma', 'morphology')
+
+# Up to 64 morphology tag parts get a bit in the packed feature column
+MAX_FEATURES = 64
+# Set on s_tag codes holding the whole tag (one that the bits can't rebuild)
+_VERBATIM_TAG = 1 << 31
+
+
+class _StringColumn:
+    """Accumulates strings into a UTF-8 blob plus an offsets array"""
+
+    def __init__(self):
+        self.offsets = array('I', [0])
+        self.blob = bytearray()
+
+    def append(self, text: Optional[str]):
+        if text:
+            self.blob += text.encode('utf-8')
+        self.offsets.append(len(self.blob))
+
+
+class _Interner:
+    """Maps repeated strings (POS, roots, lemmas, tags) to small codes; 0 is None"""
+
+    def __init__(self):
+        self.codes = {}
+        self.strings = _StringColumn()
+        self.strings.append(None)
+
+    def code(self, text: Optional[str]) -> int:
+        if text is None:
+            return 0
+        code = self.codes.get(text)
+        if code is None:
+            code = len(self.codes) + 1
+            self.codes[text] = code
+            self.strings.append(text)
+        return code
+
+
+def _pack_tag(tag: Optional[str], feature_bits: Dict[str, int]) -> Tuple[int, Optional[str]]:
+    """Feature bits of a tag, and the tag with those parts left empty"""
+    if tag is None:
+        return 0, None
+    bits = 0
+    rest = []
+    for part in tag.split('|'):
+        bit = feature_bits.get(part, 0)
+        bits |= bit
+        rest.append('' if bit else part)
+    return bits, '|'.join(rest)
+
+
+def _unpack_tag(rest: Optional[str], bits: int, features: Sequence[str]) -> Optional[str]:
+    """Fill the empty slots of a packed tag with its feature parts, in bit order"""
+    if rest is None or not bits:
+        return rest
+    parts = iter([part for i, part in enumerate(features) if bits >> i & 1])
+    return '|'.join(slot or next(parts, '') for slot in rest.split('|'))
+
+
+def build_word_store(index, path: str):
+    """Write the word-level data of a loaded QuranUnifiedIndex to a store file"""
+    word_ids = list(index.morphology.keys())
+    for key in index.words.keys():
+        try:
+            word_ids.append(int(key))
+        except ValueError:
+            # Same rule as the JSON loaders: skip non-integer keys
+            print(f"   Warning: Non-integer key in words: {key}")
+    n = max(word_ids, default=0) + 1
+
+    # The most frequent tag parts get feature bits, ordered by where they
+    # usually sit in a tag so that filling the slots in bit order rebuilds it
+    part_counts = Counter()
+    part_positions = Counter()
+    for morph_data in index.morphology.values():
+        for subtoken in morph_data.get('words', {}).values():
+            tag = subtoken.get('morphology')
+            for position, part in enumerate(tag.split('|') if tag else ()):
+                part_counts[part] += 1
+                part_positions[part] += position
+    features = sorted((part for part, _ in part_counts.most_common(MAX_FEATURES + 1) if part),
+                      key=lambda part: part_positions[part] / part_counts[part])[:MAX_FEATURES]
+    feature_bits = {part: 1 << i for i, part in enumerate(features)}
+
+    interner = _Interner()
+    flags = array('B', bytes(n))
+    verse = array('I', bytes(4 * n))
+    text = _StringColumn()
+    trans = _StringColumn()
+    morph_id = _StringColumn()
+    sub_start = array('I', [0])
+    root_start = array('I', [0])
+    root_codes = array('I')
+
+    sub_key = _StringColumn()
+    sub_word = _StringColumn()
+    sub_pos = array('I')
+    sub_root = array('I')
+    sub_lemma = array('I')
+    sub_tag = array('I')
+    sub_feat = array('Q')
+
+    for word_id in range(n):
+        key = str(word_id)
+        flag = 0
+
+        arabic = index.words.get(key)
+        if arabic is not None:
+            flag |= HAS_WORD
+        text.append(arabic)
+
+        translation = index.word_translations.get(key)
+        if translation is not None:
+            flag |= HAS_TRANSLATION
+        trans.append(translation)
+
+        morph_data = index.morphology.get(word_id)
+        if morph_data is not None:
+            flag |= HAS_MORPHOLOGY
+            morph_id.append(morph_data.get('id'))
+            for subtoken_key, subtoken in morph_data.get('words', {}).items():
+                sub_key.append(subtoken_key)
+                sub_word.append(subtoken.get('word'))
+                sub_pos.append(interner.code(subtoken.get('pos')))
+                sub_root.append(interner.code(subtoken.get('root')))
+                sub_lemma.append(interner.code(subtoken.get('lemma')))
+                tag = subtoken.get('morphology')
+                bits, rest = _pack_tag(tag, feature_bits)
+                if _unpack_tag(rest, bits, features) == tag:
+                    sub_tag.append(interner.code(rest))
+                else:
+                    # Parts out of the usual order, repeated or empty
+                    sub_tag.append(interner.code(tag) | _VERBATIM_TAG)
+                sub_feat.append(bits)
+        else:
+            morph_id.append(None)
+        sub_start.append(len(sub_pos))
+
+        verse[word_id] = index.word_to_verse.get(word_id) or 0
+        for root in index.word_roots.get(word_id, ()):
+            root_codes.append(interner.code(root))
+        root_start.append(len(root_codes))
+
+        flags[word_id] = flag
+
+    sections = {
+        'w_flags': flags,
+        'w_verse': verse,
+        'w_text_off': text.offsets, 'w_text': text.blob,
+        'w_trans_off': trans.offsets, 'w_trans': trans.blob,
+        'w_mid_off': morph_id.offsets, 'w_mid': morph_id.blob,
+        'w_sub_start': sub_start,
+        'w_root_start': root_start, 'w_roots': root_codes,
+        's_key_off': sub_key.offsets, 's_key': sub_key.blob,
+        's_word_off': sub_word.offsets, 's_word': sub_word.blob,
+        's_pos': sub_pos, 's_root': sub_root, 's_lemma': sub_lemma,
+        's_tag': sub_tag, 's_feat': sub_feat,
+        'str_off': interner.strings.offsets, 'str': interner.strings.blob,
+    }
+
+    # Lay sections out back to back, each aligned for zero-copy casts
+    toc = {
+        'byteorder': sys.byteorder,
+        'n_words': n,
+        'n_subtokens': len(sub_pos),
+        'features': features,
+        'counts': {
+            'words': sum(1 for f in flags if f & HAS_WORD),
+            'translations': sum(1 for f in flags if f & HAS_TRANSLATION),
+            'morphology': sum(1 for f in flags if f & HAS_MORPHOLOGY),
+        },
+        'sections': {},
+    }
+    offset = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else 'B'
+        size = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        offset = -(-offset // _ALIGN) * _ALIGN
+        toc['sections'][name] = [offset, typecode, size]
+        offset += size
+    toc_bytes = json.dumps(toc, ensure_ascii=False).encode('utf-8')
+    data_start = -(-(_HEADER.size + len(toc_bytes)) // _ALIGN) * _ALIGN
+
+    # Per-process temp name: several server workers may build at once
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(toc_bytes)))
+        f.write(toc_bytes)
+        for name, data in sections.items():
+            f.seek(data_start + toc['sections'][name][0])
+            f.write(data.tobytes() if isinstance(data, array) else bytes(data))
+    os.replace(tmp_path, path)
+
+
+def read_store_toc(path: str) -> Optional[Dict]:
+    """
+    The table of contents of a store this version can map, or None if the
+    file is missing, of another format version or built with the other
+    byte order
+    """
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, toc_len = _HEADER.unpack(header)
+            if magic != STORE_MAGIC or version != STORE_VERSION:
+                return None
+            toc = json.loads(f.read(toc_len).decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+    return toc if toc.get('byteorder') == sys.byteorder else None
+
+
+class WordStore:
+    """Read-only, memory-mapped view of a word store file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, toc_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError(f"{path} is not a version {STORE_VERSION} word store")
+
+        toc = json.loads(self._mm[_HEADER.size:_HEADER.size + toc_len].decode('utf-8'))
+        if toc['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path} was built on a {toc['byteorder']}-endian machine")
+
+        self.n_words = toc['n_words']
+        self.n_subtokens = toc['n_subtokens']
+        self.features = toc['features']
+        self.counts = toc['counts']
+
+        data_start = -(-(_HEADER.size + toc_len) // _ALIGN) * _ALIGN
+        buf = memoryview(self._mm)
+        for name, (offset, typecode, size) in toc['sections'].items():
+            start = data_start + offset
+            setattr(self, name, buf[start:start + size].cast(typecode))
+
+    def __reduce__(self):
+        # Pickle by path so snapshots re-open the mapping instead of copying it
+        return (WordStore, (self.path,))
+
+    # ----- column helpers -----
+
+    @staticmethod
+    def _string(offsets, blob, i: int) -> str:
+        return str(blob[offsets[i]:offsets[i + 1]], 'utf-8')
+
+    def interned(self, code: int) -> Optional[str]:
+        if code == 0:
+            return None
+        return self._string(self.str_off, self.str, code)
+
+    def _valid(self, word_id: int, flag: int) -> bool:
+        return 0 <= word_id < self.n_words and bool(self.w_flags[word_id] & flag)
+
+    def word_ids(self, flag: int = HAS_WORD) -> Iterator[int]:
+        flags = self.w_flags
+        return (i for i in range(self.n_words) if flags[i] & flag)
+
+    # ----- per-word accessors -----
+
+    def arabic(self, word_id: int) -> Optional[str]:
+        if not self._valid(word_id, HAS_WORD):
+            return None
+        return self._string(self.w_text_off, self.w_text, word_id)
+
+    def translation(self, word_id: int) -> Optional[str]:
+        if not self._valid(word_id, HAS_TRANSLATION):
+            return None
+        return self._string(self.w_trans_off, self.w_trans, word_id)
+
+    def verse_id(self, word_id: int) -> Optional[int]:
+        if not 0 <= word_id < self.n_words:
+            return None
+        return self.w_verse[word_id] or None
+
+    def roots(self, word_id: int) -> List[str]:
+        if not 0 <= word_id < self.n_words:
+            return []
+        start, end = self.w_root_start[word_id], self.w_root_start[word_id + 1]
+        return [self.interned(code) for code in self.w_roots[start:end]]
+
+    def subtoken_range(self, word_id: int) -> range:
+        if not 0 <= word_id < self.n_words:
+            return range(0)
+        return range(self.w_sub_start[word_id], self.w_sub_start[word_id + 1])
+
+    def subtoken(self, i: int) -> Dict:
+        """Rebuild one subtoken dict in the morphology.json shape"""
+        return {
+            'word': self._string(self.s_word_off, self.s_word, i),
+            'pos': self.interned(self.s_pos[i]),
+            'root': self.interned(self.s_root[i]),
+            'lemma': self.interned(self.s_lemma[i]),
+            'morphology': self.tag(i),
+        }
+
+    def tag(self, i: int) -> Optional[str]:
+        """Morphology tag of subtoken i, rebuilt from its interned rest and feature bits"""
+        code = self.s_tag[i]
+        if code & _VERBATIM_TAG:
+            return self.interned(code & ~_VERBATIM_TAG)
+        return _unpack_tag(self.interned(code), self.s_feat[i], self.features)
+
+    def morphology(self, word_id: int) -> Optional[Dict]:
+        """Rebuild a word's morphology.json entry from the columns"""
+        if not self._valid(word_id, HAS_MORPHOLOGY):
+            return None
+        mid_start, mid_end = self.w_mid_off[word_id], self.w_mid_off[word_id + 1]
+        return {
+            'id': str(self.w_mid[mid_start:mid_end], 'utf-8') if mid_end > mid_start else None,
+            'words': {
+                self._string(self.s_key_off, self.s_key, i): self.subtoken(i)
+                for i in self.subtoken_range(word_id)
+            }
+        }
+
+
+# ===== Mapping views used in place of the per-word dicts =====
+
+class _StoreView(Mapping):
+    """Base for dict-like views over a WordStore"""
+
+    def __init__(self, store: WordStore):
+        self.store = store
+
+
+class WordTextView(_StoreView):
+    """word_id (str) → Arabic text, like quran_words.json"""
+    flag = HAS_WORD
+    count_key = 'words'
+
+    def _lookup(self, word_id: int) -> Optional[str]:
+        return self.store.arabic(word_id)
+
+    def __getitem__(self, key):
+        try:
+            value = self._lookup(int(key))
+        except (ValueError, TypeError):
+            value = None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        try:
+            return self.store._valid(int(key), self.flag)
+        except (ValueError, TypeError):
+            return False
+
+    def __iter__(self):
+        return (str(i) for i in self.store.word_ids(self.flag))
+
+    def __len__(self):
+        return self.store.counts[self.count_key]
+
+
+class TranslationView(WordTextView):
+    """word_id (str) → English translation, like word_translations.json"""
+    flag = HAS_TRANSLATION
+    count_key = 'translations'
+
+    def _lookup(self, word_id: int) -> Optional[str]:
+        return self.store.translation(word_id)
+
+
+class MorphologyView(_StoreView):
+    """word_id (int) → morphology entry, built on access"""
+
+    def __getitem__(self, word_id):
+        value = self.store.morphology(word_id) if isinstance(word_id, int) else None
+        if value is None:
+            raise KeyError(word_id)
+        return value
+
+    def __contains__(self, word_id):
+        return isinstance(word_id, int) and self.store._valid(word_id, HAS_MORPHOLOGY)
+
+    def __iter__(self):
+        return self.store.word_ids(HAS_MORPHOLOGY)
+
+    def __len__(self):
+        return self.store.counts['morphology']
+
+
+class WordVerseView(_StoreView):
+    """word_id (int) → verse_id"""
+
+    def __getitem__(self, word_id):
+        value = self.store.verse_id(word_id) if isinstance(word_id, int) else None
+        if value is None:
+            raise KeyError(word_id)
+        return value
+
+    def __iter__(self):
+        verse = self.store.w_verse
+        return (i for i in range(self.store.n_words) if verse[i])
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class WordRootsView(_StoreView):
+    """word_id (int) → [roots]"""
+
+    def __getitem__(self, word_id):
+        roots = self.store.roots(word_id) if isinstance(word_id, int) else []
+        if not roots:
+            raise KeyError(word_id)
+        return roots
+
+    def __iter__(self):
+        starts = self.store.w_root_start
+        return (i for i in range(self.store.n_words) if starts[i + 1] > starts[i])
+
+    def __len__(self):
+        return sum(1 for _ in self)
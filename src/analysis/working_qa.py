@@ -6,6 +6,9 @@ Working Q&A Engine with direct search
 import re
 import json
 
+from ngram_index import NgramIndex
+from arabic_normalizer import normalize_arabic, build_normalized_forms
+
 class WorkingQAEngine:
     def __init__(self):
         self.load_data()
@@ -35,33 +38,36 @@ class WorkingQAEngine:
             except:
                 continue
         
+        # N-gram index over normalized forms so searches don't scan every
+        # word and ignore diacritics/spelling variants
+        self.search_index = NgramIndex.from_forms(build_normalized_forms(self.words))
+        
         print(f"Loaded {len(self.words)} words, {len(self.verses)} verses")
     
     def direct_search(self, arabic_term: str, limit: int = 10):
         """Direct search in words dictionary"""
         results = []
         
-        for word_id_str, arabic_word in self.words.items():
-            if arabic_term in arabic_word:
-                try:
-                    word_id = int(word_id_str)
-                    verse_id = self.word_to_verse.get(word_id)
+        for word_id in self.search_index.search(normalize_arabic(arabic_term)):
+            try:
+                arabic_word = self.words[str(word_id)]
+                verse_id = self.word_to_verse.get(word_id)
+                
+                if verse_id:
+                    verse_data = self.verses.get(str(verse_id), {})
                     
-                    if verse_id:
-                        verse_data = self.verses.get(str(verse_id), {})
-                        
-                        results.append({
-                            'word_id': word_id,
-                            'arabic': arabic_word,
-                            'verse_id': verse_id,
-                            'verse_arabic': verse_data.get('arabic', ''),
-                            'translation': verse_data.get('en', '')
-                        })
-                        
-                        if len(results) >= limit:
-                            break
-                except:
-                    continue
+                    results.append({
+                        'word_id': word_id,
+                        'arabic': arabic_word,
+                        'verse_id': verse_id,
+                        'verse_arabic': verse_data.get('arabic', ''),
+                        'translation': verse_data.get('en', '')
+                    })
+                    
+                    if len(results) >= limit:
+                        break
+            except:
+                continue
         
         return results
     
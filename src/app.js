@@ -11,6 +11,7 @@
 
   // Global Variables
   let suraData, combinedData, wordsData, morphology, enWords, paginationData;
+  let ensureVerses;
   let currentAudio = null;
   let showTranslation =
     localStorage.getItem("translate") === "en" ? true : false;
@@ -19,17 +20,11 @@
   let currentVerse = parseInt(localStorage.getItem("selectedVerse")) || 1;
   let isPageView = true; // We'll use page view by default
 
-  // Fetch all JSON data
-  Promise.all([
-    fetch("json/sura.json").then((response) => response.json()),
-    fetch("json/combined_quran.json").then((response) => response.json()),
-    fetch(WORDS_FILE).then((response) => response.json()),
-    fetch("json/quran_morphology.json").then((response) => response.json()),
-    fetch("json/en-word.json").then((response) => response.json()),
-    fetch("json/pagination_map.json").then((response) => response.json())
-  ])
+  // Fetch the JSON data (page by page when the shards are built, see js/shards.js)
+  QuranShards.reader({ wordsFile: WORDS_FILE })
     .then((data) => {
-      [suraData, combinedData, wordsData, morphology, enWords, paginationData] = data;
+      ({ suras: suraData, verses: combinedData, words: wordsData, morphology, enWords,
+         pages: paginationData, ensureVerses } = data);
       populateSuraSelector();
       loadSelections();
       updatePageButtons();
@@ -111,6 +106,21 @@
     const fromRef = parseRef(pageData.from);
     const toRef = parseRef(pageData.to);
 
+    // With shards, only the pages shown so far are loaded; load this one first
+    const firstVerseId = suraData[fromRef.sura].start + fromRef.verse - 1;
+    const lastVerseId = suraData[toRef.sura].start + toRef.verse - 1;
+    for (let id = firstVerseId; id <= lastVerseId; id++) {
+      if (!combinedData[id]) {
+        ensureVerses(firstVerseId, lastVerseId)
+          .then(() => displayPage(pageNumber, highlightSura, highlightVerse))
+          .catch((error) => {
+            console.error("Error loading page data:", error);
+            alert("Failed to load data. Please try refreshing the page.");
+          });
+        return;
+      }
+    }
+
     const container = document.getElementById("quran-container");
     container.className = "page";
     container.innerHTML = `<div class="page-header">Page ${pageNumber} (${pageData.word_count} words)</div>`;
@@ -714,6 +724,7 @@
 
   // Global Variables
   let suraData, combinedData, wordsData, morphology, enWords, paginationData;
+  let ensureVerses;
   let currentAudio = null;
   let showTranslation =
     localStorage.getItem("translate") === "en" ? true : false;
@@ -722,18 +733,11 @@
   let currentVerse = parseInt(localStorage.getItem("selectedVerse")) || 1;
   let isPageView = true; // We'll use page view by default
 
-  // Fetch all JSON data
-  Promise.all([
-    fetch("json/sura.json").then((response) => response.json()),
-    fetch("json/combined_quran.json").then((response) => response.json()),
-    fetch(wordsDataPath).then((response) => response.json()),
-    fetch("json/quran_morphology.json").then((response) => response.json()),
-    fetch("json/en-word.json").then((response) => response.json()),
-    fetch("json/pagination_map.json").then((response) => response.json())
-  ])
+  // Fetch the JSON data (page by page when the shards are built, see js/shards.js)
+  QuranShards.reader({ wordsFile: wordsDataPath })
     .then((data) => {
-      [suraData, combinedData, wordsData, morphology, enWords, paginationData] =
-        data;
+      ({ suras: suraData, verses: combinedData, words: wordsData, morphology, enWords,
+         pages: paginationData, ensureVerses } = data);
       populateSuraSelector();
       loadSelections();
       updatePageButtons();
@@ -817,6 +821,21 @@
     const fromRef = parseRef(pageData.from);
     const toRef = parseRef(pageData.to);
 
+    // With shards, only the pages shown so far are loaded; load this one first
+    const firstVerseId = suraData[fromRef.sura].start + fromRef.verse - 1;
+    const lastVerseId = suraData[toRef.sura].start + toRef.verse - 1;
+    for (let id = firstVerseId; id <= lastVerseId; id++) {
+      if (!combinedData[id]) {
+        ensureVerses(firstVerseId, lastVerseId)
+          .then(() => displayPage(pageNumber, highlightSura, highlightVerse))
+          .catch((error) => {
+            console.error("Error loading page data:", error);
+            alert("Failed to load data. Please try refreshing the page.");
+          });
+        return;
+      }
+    }
+
     const container = document.getElementById("quran-container");
     container.className = "page";
     container.innerHTML = `<div class="page-header">Page ${pageNumber} (${pageData.word_count} words)</div>`;
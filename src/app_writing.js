@@ -6,20 +6,16 @@
 
   // Global Variables
   let suraData, combinedData, wordsData, morphology;
+  let ensureVerses;
   let currentAudio = null;
   let showTranslation =
     localStorage.getItem("translate") === "en" ? true : false; // Load translation setting from local storage
 
-  // Fetch all JSON data
-  Promise.all([
-    fetch("json/sura.json").then((response) => response.json()),
-    fetch("json/combined_quran.json").then((response) => response.json()),
-    fetch("json/quran_words.json").then((response) => response.json()),
-    fetch("json/quran_morphology.json").then((response) => response.json()),
-    fetch("json/en-word.json").then((response) => response.json()),
-  ])
+  // Fetch the JSON data (sura by sura when the shards are built, see js/shards.js)
+  QuranShards.reader({ wordsFile: "json/quran_words.json", layout: "sura" })
     .then((data) => {
-      [suraData, combinedData, wordsData, morphology,enWords] = data;
+      ({ suras: suraData, verses: combinedData, words: wordsData, morphology, enWords,
+         ensureVerses } = data);
       populateSuraSelector();
       loadSelections();
     })
@@ -60,6 +56,19 @@
   // Display Sura
   function displaySura(suraNumber, targetVerse = null) {
     const sura = suraData[suraNumber];
+
+    // With shards, only the suras shown so far are loaded; load this one first
+    for (let id = sura.start; id <= sura.end; id++) {
+      if (!combinedData[id]) {
+        ensureVerses(sura.start, sura.end)
+          .then(() => displaySura(suraNumber, targetVerse))
+          .catch((error) => {
+            console.error("Error loading sura data:", error);
+            alert("Failed to load data. Please try refreshing the page.");
+          });
+        return;
+      }
+    }
     const container = document.getElementById("quran-container");
     container.className = "page";
     container.innerHTML = `<div class="arabic row">${suraNumber}. ${sura.name}</div>`;
@@ -216,7 +225,8 @@
         suraSelect.value = savedSura;
         populateVerseSelector();
 
-        if (savedVerse && combinedData[savedVerse]) {
+        const sura = suraData[savedSura];
+        if (savedVerse && savedVerse >= sura.start && savedVerse <= sura.end) {
           verseSelect.value = savedVerse;
         } else {
           verseSelect.selectedIndex = 0;
@@ -0,0 +1,208 @@
+// Loader for the sharded data built by scripts/shard_bundles.py.
+// Fetches json/shards/manifest.json once, then only the page or sura shards
+// that are shown, and merges them into objects shaped like the original
+// files (combined_quran.json, quran_words.json, quran_morphology.json, ...)
+// so existing lookups such as verses[id] or words["en-word"][i] keep working.
+const QuranShards = (() => {
+  async function open(base = "json/shards/") {
+    const manifest = await fetch(base + "manifest.json", { cache: "no-cache" }).then(
+      (response) => response.json()
+    );
+
+    const verses = {};
+    const words = {};
+    const morphology = {};
+    const loading = {}; // "layout/key" → Promise of the decoded shard
+
+    for (const column of manifest.word_columns) {
+      words[column] = {};
+    }
+
+    // Index of the shard in a layout containing the id (binary search)
+    function findShard(layout, field, id) {
+      const columns = manifest.layouts[layout];
+      const firsts = columns["first_" + field];
+      let lo = 0;
+      let hi = firsts.length - 1;
+      while (lo < hi) {
+        const mid = (lo + hi + 1) >> 1;
+        if (firsts[mid] <= id) lo = mid;
+        else hi = mid - 1;
+      }
+      if (id < firsts[lo] || id > columns["last_" + field][lo]) return -1;
+      return lo;
+    }
+
+    function merge(shard) {
+      const v = shard.verses;
+      for (let i = 0; i < v.sura.length; i++) {
+        const entry = {
+          arabic: v.arabic[i],
+          en: v.en[i],
+          start_word: v.start_word[i],
+          end_word: v.end_word[i],
+          sura: v.sura[i],
+          ayah: v.ayah[i],
+        };
+        if (v.arabic_harakat) entry.arabic_harakat = v.arabic_harakat[i];
+        verses[v.first + i] = entry;
+      }
+
+      for (const column of manifest.word_columns) {
+        const values = shard.words[column];
+        if (!values) continue;
+        for (let i = 0; i < values.length; i++) {
+          words[column][shard.words.first + i] = values[i];
+        }
+      }
+
+      const m = shard.morphology;
+      if (m) {
+        for (let i = 0; i < m.word_id.length; i++) {
+          const wordId = m.word_id[i];
+          const location = m.location[i];
+          const entry =
+            morphology[wordId] ||
+            (morphology[wordId] = {
+              id: location.split(":").slice(0, 3).join(":"),
+              words: {},
+            });
+          entry.words[location] = {
+            word: m.word[i],
+            pos: m.pos[i],
+            root: m.root[i],
+            lemma: m.lemma[i],
+            morphology: m.morphology[i],
+          };
+        }
+      }
+      return shard;
+    }
+
+    // Load (once) the shard with the given key, e.g. load("page", 12)
+    function load(layout, key) {
+      const columns = manifest.layouts[layout];
+      const index = columns.key.indexOf(key);
+      if (index < 0) return Promise.reject(new Error(`No ${layout} shard ${key}`));
+
+      const name = `${layout}/${key}`;
+      if (!loading[name]) {
+        // The hash changes with the content, so the URL can be cached forever
+        loading[name] = fetch(`${base}${name}.json?v=${columns.hash[index]}`)
+          .then((response) => response.json())
+          .then(merge)
+          .catch((error) => {
+            delete loading[name];
+            throw error;
+          });
+      }
+      return loading[name];
+    }
+
+    // Load the shard holding a global verse id
+    function loadVerse(layout, verseId) {
+      const index = findShard(layout, "verse", verseId);
+      if (index < 0) return Promise.reject(new Error(`Verse ${verseId} not in any ${layout} shard`));
+      return load(layout, manifest.layouts[layout].key[index]);
+    }
+
+    // Load every shard of a layout overlapping the verse ids first..last
+    function loadRange(layout, first, last) {
+      const columns = manifest.layouts[layout];
+      const loads = [];
+      for (let i = 0; i < columns.key.length; i++) {
+        if (columns.first_verse[i] <= last && columns.last_verse[i] >= first) {
+          loads.push(load(layout, columns.key[i]));
+        }
+      }
+      return Promise.all(loads);
+    }
+
+    return { manifest, verses, words, morphology, load, loadVerse, loadRange };
+  }
+
+  const opened = {}; // base → Promise of open(base), shared by every reader on a page
+
+  function fetchJson(url) {
+    return fetch(url).then((response) => response.json());
+  }
+
+  function requireVerses(verses, first, last) {
+    for (let id = first; id <= last; id++) {
+      if (!verses[id]) throw new Error(`Verse ${id} not found`);
+    }
+  }
+
+  // Data for the reader pages: sura.json, pagination_map.json and objects
+  // shaped like the verse, word, en-word and morphology files. When the
+  // shards are built, verses and words fill in as ensureVerses(first, last)
+  // loads the shards of the given layout; without them the full files are
+  // fetched up front and ensureVerses only checks the ids.
+  async function reader({
+    wordsFile = "json/quran_words.json",
+    versesFile = "json/combined_quran.json",
+    verseText = "arabic", // shard verse column used as .arabic
+    layout = "page",
+    base = "json/shards/",
+  } = {}) {
+    const [suras, pages] = await Promise.all([
+      fetchJson("json/sura.json"),
+      fetchJson("json/pagination_map.json"),
+    ]);
+    const column = wordsFile.split("/").pop().replace(/\.json$/, "");
+
+    let shards = null;
+    try {
+      shards = await (opened[base] || (opened[base] = open(base)));
+    } catch (error) {
+      delete opened[base];
+      console.log("No data shards, loading the full files:", error.message);
+    }
+
+    const manifest = shards && shards.manifest;
+    if (
+      !manifest ||
+      !manifest.word_columns.includes(column) ||
+      !manifest.word_columns.includes("en-word")
+    ) {
+      const [verses, words, enWords, morphology] = await Promise.all(
+        [versesFile, wordsFile, "json/en-word.json", "json/quran_morphology.json"].map(fetchJson)
+      );
+      return {
+        suras, pages, verses, words, enWords, morphology,
+        ensureVerses: async (first, last) => requireVerses(verses, first, last),
+      };
+    }
+
+    if (!manifest.layouts[layout]) layout = "sura";
+    const verses = {};
+    let morphology = shards.morphology;
+    if (!manifest.morphology) {
+      // Shards were built without the morphology file; fetch it alongside
+      morphology = {};
+      fetchJson("json/quran_morphology.json")
+        .then((data) => Object.assign(morphology, data))
+        .catch((error) => console.error("Error loading morphology:", error));
+    }
+
+    async function ensureVerses(first, last) {
+      await shards.loadRange(layout, first, last);
+      for (let id = first; id <= last; id++) {
+        const entry = shards.verses[id];
+        if (!entry) continue;
+        verses[id] = verseText === "arabic" ? entry : { ...entry, arabic: entry[verseText] };
+      }
+      requireVerses(verses, first, last);
+    }
+
+    return {
+      suras, pages, verses,
+      words: shards.words[column],
+      enWords: shards.words["en-word"],
+      morphology,
+      ensureVerses,
+    };
+  }
+
+  return { open, reader };
+})();